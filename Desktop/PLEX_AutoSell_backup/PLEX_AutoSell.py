@@ -26,15 +26,32 @@ import time
 import json
 import threading
 import os
+import socket
+import asyncio
+import contextvars
+import heapq
+import itertools
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait as futures_wait
+from concurrent.futures import TimeoutError as FutureTimeout
 from dataclasses import dataclass
 from decimal import Decimal, ROUND_DOWN
 
 # Third-party
 # Make sure to install dependencies:
-#   pip install web3 requests PyQt5 eth-abi
+#   pip install web3 requests PyQt5 eth-abi aiohttp
 import requests
-from web3 import Web3
+import aiohttp
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from web3 import Web3, AsyncWeb3
 from eth_account import Account
+# ОПТИМИЗАЦИЯ (необязательно): pip install orjson — быстрее разбор JSON-RPC ответов
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # -----------------------------
 # Constants & Minimal ABIs
@@ -86,6 +103,9 @@ PAIR_ADDRESS = Web3.to_checksum_address('0x41d9650faf3341cbf8947fd8063a1fc88dbf1
 # PancakeSwap V2 Router (BSC mainnet)
 PANCAKE_V2_ROUTER = Web3.to_checksum_address('0x10ED43C718714eb63d5aA57B78B54704E256024E')
 
+# Multicall3 (один и тот же адрес во всех EVM-сетях, включая BSC)
+MULTICALL3 = Web3.to_checksum_address('0xcA11bde05977b3631167028862bE2a173976CA11')
+
 # ===== БЕЗОПАСНОСТЬ: Whitelist адресов =====
 SAFETY_WHITELIST = {
     'PLEX': PLEX.lower(),
@@ -169,6 +189,7 @@ def fmt_price(d: Decimal, places: int = 6) -> str:
 class RpcMode:
     NODE = 'Node RPC'
     PROXY = 'Proxy (Scan API keys)'
+    HYBRID = 'Hybrid (dataseed + Node + Proxy)'
 
 @dataclass
 class BackendConfig:
@@ -177,57 +198,399 @@ class BackendConfig:
     proxy_base_url: str = 'https://api.bscscan.com/api'  # can be EnterScan-like
     proxy_api_keys: list = None
 
+# ===== ОПТИМИЗАЦИЯ: Общий пул keep-alive соединений =====
+HTTP_POOL_HOSTS = 16          # хостов в пуле: dataseed ×4, Node, *Scan и запас
+HTTP_POOL_PER_HOST = 16       # соединений на хост: хеджи + rpc-пул + рассылка
+HTTP_KEEPALIVE_IDLE_S = 30    # TCP keep-alive: первая проба после простоя, сек
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter с TCP keep-alive (и TCP_NODELAY из urllib3): соединения не «остывают» между сделками"""
+    def init_poolmanager(self, *args, **kwargs):
+        opts = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        if hasattr(socket, 'TCP_KEEPIDLE') and hasattr(socket, 'TCP_KEEPINTVL'):
+            opts += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, HTTP_KEEPALIVE_IDLE_S),
+                     (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)]
+        kwargs['socket_options'] = opts
+        super().init_poolmanager(*args, **kwargs)
+
+
+def make_http_session() -> requests.Session:
+    """Session с пулом keep-alive соединений — одна на ядро: Web3, JSON-RPC batch и *Scan"""
+    session = requests.Session()
+    adapter = KeepAliveAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_PER_HOST, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """
+    HTTPProvider поверх общей Session. Штатный web3 кэширует сессии по потоку,
+    поэтому каждый поток пула заново платил DNS/TCP/TLS — здесь пул соединений один на всех.
+    """
+    def __init__(self, endpoint_uri: str, session: requests.Session, timeout: float = 10):
+        super().__init__(endpoint_uri, request_kwargs={'timeout': timeout})
+        self._session = session
+
+    def make_request(self, method, params):
+        r = self._session.post(self.endpoint_uri, data=self.encode_rpc_request(method, params),
+                               **self.get_request_kwargs())
+        r.raise_for_status()
+        return self.decode_rpc_response(r.content)
+
+
+if orjson is not None:
+    _json_dumps, _json_loads = orjson.dumps, orjson.loads
+else:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+    _json_loads = json.loads
+
+
+class RpcError(RuntimeError):
+    """Ошибка из JSON-RPC ответа узла (текст как у web3: словарь code/message)"""
+    def __init__(self, error):
+        self.code = error.get('code') if isinstance(error, dict) else None
+        super().__init__(str(error))
+
+
+class RawRpcClient:
+    """
+    Минимальный JSON-RPC клиент для горячих методов: без middleware и форматтеров web3,
+    результат — сырой hex/dict как в ответе узла. Работает поверх общей keep-alive Session.
+    """
+    _HEADERS = {'Content-Type': 'application/json'}
+
+    def __init__(self, url: str, session: requests.Session | None = None, timeout: float = 10):
+        self.url = url
+        self.timeout = timeout
+        self._session = session or make_http_session()
+        self._ids = itertools.count(1)
+
+    def request(self, method: str, params: list):
+        body = _json_dumps({'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': params})
+        r = self._session.post(self.url, data=body, headers=self._HEADERS, timeout=self.timeout)
+        r.raise_for_status()
+        resp = _json_loads(r.content)
+        if resp.get('error') is not None:
+            raise RpcError(resp['error'])
+        return resp.get('result')
+
+    def eth_call(self, to: str, data: str, tag: str = 'latest') -> str:
+        return self.request('eth_call', [{'to': to, 'data': data}, tag])
+
+    def eth_blockNumber(self) -> int:
+        return int(self.request('eth_blockNumber', []), 16)
+
+    def eth_getBalance(self, address: str, tag: str = 'latest') -> int:
+        return int(self.request('eth_getBalance', [address, tag]), 16)
+
+    def eth_sendRawTransaction(self, raw_hex: str) -> str:
+        return self.request('eth_sendRawTransaction', [raw_hex])
+
+    def eth_getTransactionReceipt(self, tx_hash: str) -> dict | None:
+        """Сырая квитанция (hex-поля, как у *Scan proxy); None — ещё не в блоке"""
+        return self.request('eth_getTransactionReceipt', [tx_hash])
+
+    def eth_getTransactionByHash(self, tx_hash: str) -> dict | None:
+        """Сырая tx; None — узел её не знает (ни в мемпуле, ни в блоке)"""
+        return self.request('eth_getTransactionByHash', [tx_hash])
+
+# ===== ОПТИМИЗАЦИЯ: Лимит частоты *Scan API =====
+# Потолок запросов/с на один ключ по провайдеру (free-тарифы *Scan: 5 rps)
+PROXY_RATE_CEILINGS = {
+    'bscscan': 5.0,
+    'etherscan': 5.0,
+    'enterscan': 5.0,
+}
+PROXY_RATE_DEFAULT = 5.0
+THROTTLE_STATUSES = (429, 502, 503, 504)
+
+
+def scan_rate_limited(data) -> bool:
+    """Лимит *Scan приходит как HTTP 200: {"status":"0","message":"NOTOK","result":"Max rate limit reached"}"""
+    return (isinstance(data, dict) and data.get('status') == '0'
+            and 'rate limit' in str(data.get('result', '')).lower())
+
+
+def proxy_rate_ceiling(base_url: str) -> float:
+    host = (base_url or '').lower()
+    for name, rps in PROXY_RATE_CEILINGS.items():
+        if name in host:
+            return rps
+    return PROXY_RATE_DEFAULT
+
+
+class TokenBucket:
+    """
+    Token bucket с резервированием: reserve() сразу забирает токен (допускается долг)
+    и возвращает, сколько ждать до своего слота. Потокобезопасен; ожидание — на стороне
+    вызывающего (time.sleep или asyncio.sleep).
+    """
+    def __init__(self, rate: float, burst: float = 1.0):
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._ts = time.monotonic()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def reserve(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def wait_time(self) -> float:
+        """Сколько ждал бы reserve() сейчас (без резервирования)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+# ===== ОПТИМИЗАЦИЯ: Приоритеты RPC-запросов =====
+PRIO_CRITICAL = 0     # broadcast, nonce, receipt
+PRIO_TRADE = 1        # чтения для сделки (продажа, precheck, авто-поток)
+PRIO_BACKGROUND = 2   # обновление UI, трекеры head/Sync — сбрасывается, если квоты не хватает
+CRITICAL_ACTIONS = ('eth_sendRawTransaction', 'eth_getTransactionCount', 'eth_getTransactionReceipt',
+                    'eth_getTransactionByHash')
+
+_request_priority = contextvars.ContextVar('rpc_priority', default=PRIO_TRADE)
+
+
+@contextmanager
+def request_priority(prio: int):
+    """Класс приоритета для всех RPC внутри блока (в своём потоке / asyncio-задаче)"""
+    token = _request_priority.set(prio)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _request_priority.get()
+
+
+class RequestShed(RuntimeError):
+    """Фоновый запрос сброшен: квота ключей занята приоритетными"""
+
+
+class AimdLimiter:
+    """
+    Лимитер одного API-ключа: token bucket + AIMD. Старт — на потолке провайдера;
+    успех: +add rps (до потолка), 429/5xx: ×mult (не чаще раза в cooldown_s, не ниже floor).
+    Слоты выдаются по приоритету (PRIO_*), фоновые запросы сбрасываются, если
+    ожидание слота превысило бы shed_after_s.
+    """
+    def __init__(self, ceiling: float, floor: float = 0.5, add: float = 0.1,
+                 mult: float = 0.5, cooldown_s: float = 1.0, shed_after_s: float = 1.0):
+        self.ceiling = ceiling
+        self.floor = floor
+        self.add = add
+        self.mult = mult
+        self.cooldown_s = cooldown_s
+        self.shed_after_s = shed_after_s
+        self.bucket = TokenBucket(ceiling)
+        self._cut_ts = 0.0
+        self._cond = threading.Condition()
+        self._waiters = []    # куча (prio, seq)
+        self.async_waiting = 0  # asyncio-запросы, ждущие слот через try_acquire
+        self._seq = itertools.count()
+        self.ok = 0
+        self.throttled = 0
+        self.shed = 0
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def eta(self) -> float:
+        """Оценка ожидания слота для нового запроса (с учётом очереди)"""
+        return self.bucket.wait_time() + (len(self._waiters) + self.async_waiting) / self.bucket.rate
+
+    def _check_shed(self, prio: int):
+        """Под _cond: фоновый запрос не ждёт дольше shed_after_s"""
+        if prio < PRIO_BACKGROUND:
+            return
+        eta = self.eta()
+        if eta > self.shed_after_s:
+            self.shed += 1
+            raise RequestShed(f"фоновый запрос отложен: квота занята (≈{eta:.1f}с)")
+
+    def acquire(self, prio: int = PRIO_TRADE):
+        """Блокирует до своего слота; более приоритетные обслуживаются раньше"""
+        with self._cond:
+            self._check_shed(prio)
+            ticket = (prio, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            self._cond.notify_all()
+            try:
+                while True:
+                    if self._waiters[0] == ticket:
+                        wait = self.bucket.wait_time()
+                        if wait <= 0:
+                            self.bucket.reserve()
+                            return
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def try_acquire(self, prio: int = PRIO_TRADE) -> float:
+        """Неблокирующий вариант (asyncio): 0 — слот взят, иначе через сколько повторить"""
+        with self._cond:
+            self._check_shed(prio)
+            if self._waiters and self._waiters[0][0] <= prio:
+                return 1.0 / self.bucket.rate
+            wait = self.bucket.wait_time()
+            if wait <= 0:
+                self.bucket.reserve()
+                return 0.0
+            return wait
+
+    def on_success(self):
+        self.ok += 1
+        if self.bucket.rate < self.ceiling:
+            self.bucket.set_rate(min(self.ceiling, self.bucket.rate + self.add))
+
+    def on_throttle(self):
+        self.throttled += 1
+        now = time.time()
+        if now - self._cut_ts >= self.cooldown_s:
+            self._cut_ts = now
+            self.bucket.set_rate(max(self.floor, self.bucket.rate * self.mult))
+
+
+class ProxyKey:
+    """API-ключ *Scan в пуле: своя квота (AimdLimiter), здоровье и счётчики"""
+    def __init__(self, key: str | None, ceiling: float):
+        self.key = key
+        self.limiter = AimdLimiter(ceiling)
+        self.invalid = False      # "Invalid API Key" — ключ исключён до переподключения
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def label(self) -> str:
+        return f"…{self.key[-4:]}" if self.key else "без ключа"
+
+    def usage(self) -> dict:
+        return {'key': self.label, 'calls': self.calls, 'errors': self.errors,
+                'throttled': self.limiter.throttled, 'shed': self.limiter.shed,
+                'rate': self.limiter.rate, 'ok': not self.invalid}
+
+
 class ProxyClient:
     """
     Very small client for *Scan proxy API (module=proxy).
     Works with BscScan-compatible endpoints or EnterScan equivalents.
+    ОПТИМИЗАЦИЯ: все ключи работают параллельно — каждый запрос идёт на здоровый ключ
+    с ближайшим свободным слотом, так что пропускная способность растёт с числом ключей.
     """
-    def __init__(self, base_url: str, api_keys: list[str] | None):
+    def __init__(self, base_url: str, api_keys: list[str] | None, rate_ceiling: float | None = None,
+                 session: requests.Session | None = None):
         self.base_url = base_url.rstrip('/')
         self.api_keys = api_keys or []
-        self._idx = 0
-        # ОПТИМИЗАЦИЯ: Session и rate limiting
-        self._session = requests.Session()
-        self._rate_next_ts = 0.0
-        self._min_gap = 0.15  # не чаще 1 запроса / 150 мс
+        # ОПТИМИЗАЦИЯ: общая keep-alive Session и token bucket + AIMD на каждый ключ
+        self._session = session or make_http_session()
+        self.rate_ceiling = rate_ceiling or proxy_rate_ceiling(self.base_url)
+        self.keys = [ProxyKey(k, self.rate_ceiling) for k in dict.fromkeys(self.api_keys)] \
+            or [ProxyKey(None, self.rate_ceiling)]
+        self._pick_lock = threading.Lock()
+
+    def pick_key(self, exclude=()) -> ProxyKey | None:
+        """Здоровый ключ с ближайшим слотом (при равенстве — наименее загруженный)"""
+        with self._pick_lock:
+            alive = [k for k in self.keys if not k.invalid and k not in exclude]
+            if not alive:
+                return None
+            return min(alive, key=lambda k: (k.limiter.eta(), k.calls))
+
+    def limiter(self, key: str | None) -> AimdLimiter:
+        """Лимитер ключа (общий для sync/async клиентов)"""
+        for k in self.keys:
+            if k.key == key:
+                return k.limiter
+        return self.keys[0].limiter
+
+    def usage(self) -> list[dict]:
+        return [k.usage() for k in self.keys]
+
+    def _send(self, params: dict, pk: ProxyKey, prio: int):
+        """
+        Один GET по ключу pk с ожиданием своего (приоритетного) слота в bucket'е ключа.
+        Возвращает (response, json | None, throttled): throttled — 429/5xx или лимит *Scan в теле.
+        """
+        if pk.key:
+            params['apikey'] = pk.key
+        pk.limiter.acquire(prio)
+        pk.calls += 1
+        r = self._session.get(self.base_url, params=params, timeout=15)
+        data = r.json() if r.ok else None
+        throttled = r.status_code in THROTTLE_STATUSES or scan_rate_limited(data)
+        if throttled:
+            pk.limiter.on_throttle()
+        else:
+            pk.limiter.on_success()
+        return r, data, throttled
 
     def _get(self, params: dict) -> dict:
-        """GET запрос с session, rate limiting и ротацией ключей только при 429"""
-        # ОПТИМИЗАЦИЯ: Локальный ограничитель частоты
-        dt = self._min_gap - max(0, time.time() - self._rate_next_ts)
-        if dt > 0: 
-            time.sleep(dt)
-        self._rate_next_ts = time.time()
-
-        if self.api_keys:
-            params['apikey'] = self.api_keys[self._idx % len(self.api_keys)]
+        """GET запрос с session, rate limiting и переходом на другой ключ при 429/5xx/invalid key"""
+        # ОПТИМИЗАЦИЯ: отправка/nonce/квитанции — всегда вне очереди
+        prio = PRIO_CRITICAL if params.get('action') in CRITICAL_ACTIONS else current_priority()
         try:
-            r = self._session.get(self.base_url, params=params, timeout=15)
-            if r.status_code in (429, 502, 503, 504):   # ✚ добавили 5xx
-                self._idx = (self._idx + 1) % max(1, len(self.api_keys))
-                if self.api_keys:
-                    params['apikey'] = self.api_keys[self._idx]
-                r = self._session.get(self.base_url, params=params, timeout=15)
-            r.raise_for_status()
-            data = r.json()
-            # Форматы *Scan:
-            #  OK: {"jsonrpc":"2.0","id":1,"result":"0x..."} ИЛИ {"status":"1","result":"0x..."}
-            # BAD: {"status":"0","message":"NOTOK","result":"Invalid API Key ..."}
-            if isinstance(data, dict) and data.get("status") == "0":
-                res = str(data.get("result", "")).strip()
-                # Попробовать следующий ключ, если есть
-                if "invalid api key" in res.lower() and self.api_keys and len(self.api_keys) > 1:
-                    old = self._idx
-                    self._idx = (self._idx + 1) % len(self.api_keys)
-                    params['apikey'] = self.api_keys[self._idx]
-                    r = self._session.get(self.base_url, params=params, timeout=15)
-                    r.raise_for_status()
-                    data = r.json()
-                    if isinstance(data, dict) and data.get("status") == "0":
-                        raise RuntimeError(f"Proxy auth error: {data.get('result')}")
-                elif "invalid api key" in res.lower():
-                    raise RuntimeError(f"Proxy auth error: {res}")
-            return data
+            tried = []
+            retried = False
+            pk = self.pick_key(tried)
+            while True:
+                if pk is None:
+                    raise RuntimeError("Proxy auth error: нет рабочих API-ключей")
+                tried.append(pk)
+                r, data, throttled = self._send(params, pk, prio)
+                if throttled:   # ✚ 5xx и лимит *Scan в теле ответа — как 429
+                    pk.errors += 1
+                    if not retried:
+                        retried = True
+                        # один повтор: другим ключом, а если его нет — тем же (его limiter уже сбавил темп)
+                        pk = self.pick_key(tried) or pk
+                        continue
+                r.raise_for_status()
+                if scan_rate_limited(data):
+                    raise RuntimeError(f"429 rate limit: {data.get('result')}")
+                # Форматы *Scan:
+                #  OK: {"jsonrpc":"2.0","id":1,"result":"0x..."} ИЛИ {"status":"1","result":"0x..."}
+                # BAD: {"status":"0","message":"NOTOK","result":"Invalid API Key ..."}
+                if isinstance(data, dict) and data.get("status") == "0":
+                    res = str(data.get("result", "")).strip()
+                    if "invalid api key" in res.lower():
+                        pk.invalid = True
+                        pk.errors += 1
+                        # Попробовать следующий ключ, если есть
+                        pk = self.pick_key(tried)
+                        if pk is not None:
+                            continue
+                        raise RuntimeError(f"Proxy auth error: {res}")
+                return data
+        except RequestShed:
+            raise
         except Exception as e:
             raise RuntimeError(f'Proxy GET failed: {e}')
 
@@ -309,27 +672,86 @@ class ProxyClient:
             return data['result']
         return None
 
+    def eth_getTransactionByHash(self, tx_hash: str) -> dict:
+        """Транзакция по hash; None — сеть её не знает"""
+        data = self._get({'module':'proxy','action':'eth_getTransactionByHash','txhash':tx_hash})
+        if 'result' in data and data['result']:
+            return data['result']
+        return None
+
+    def eth_blockNumber(self) -> int:
+        data = self._get({'module':'proxy','action':'eth_blockNumber'})
+        res = data.get('result')
+        if isinstance(res, str) and res.startswith('0x'):
+            return int(res, 16)
+        if isinstance(res, str) and "Invalid API Key" in res:
+            raise RuntimeError(f"Proxy auth error: {res}")
+        raise RuntimeError(f'Proxy eth_blockNumber failed: {data}')
+
+    def get_logs(self, address: str, topic0: str, from_block: int, to_block: int) -> list[dict]:
+        """Логи контракта (module=logs, action=getLogs)"""
+        data = self._get({'module':'logs','action':'getLogs','address':address,'topic0':topic0,
+                          'fromBlock':from_block,'toBlock':to_block})
+        res = data.get('result')
+        if isinstance(res, list):
+            return res
+        # *Scan отдаёт status=0 и "No records found" на пустой диапазон
+        if data.get('status') == '0' and 'no records' in str(data.get('message', '')).lower():
+            return []
+        if isinstance(res, str) and "Invalid API Key" in res:
+            raise RuntimeError(f"Proxy auth error: {res}")
+        raise RuntimeError(f'Proxy getLogs failed: {data}')
+
 # -----------------------------
 # On-chain helpers (work in both modes)
 # -----------------------------
 
 def build_contract_encoder():
-    """A tiny encoder using Web3's ABI tools (offline)."""
+    """A tiny encoder using Web3's ABI tools (offline). Эталон для codec_self_check/--bench-codec."""
     w3 = Web3()  # offline instance for encodeABI usage
     erc20 = w3.eth.contract(address=PLEX, abi=ERC20_ABI)  # address not used for encoding itself
     router = w3.eth.contract(address=PANCAKE_V2_ROUTER, abi=ROUTER_ABI)
     return w3, erc20, router
 
-_w3_encoder, _erc20_encoder, _router_encoder = build_contract_encoder()
+# ===== ОПТИМИЗАЦИЯ: Предвычисленный кодек calldata/результатов =====
+# Селектор + готовые 32-байтовые слова: без contract()/encodeABI, keccak и строковых замен на вызов
+SEL_APPROVE         = '0x095ea7b3'  # approve(address,uint256)
+SEL_SWAP_SUPPORTING = '0x5c11d795'  # swapExactTokensForTokensSupportingFeeOnTransferTokens(uint256,uint256,address[],address,uint256)
+SEL_GETAMOUNTSOUT   = '0xd06ca61f'  # getAmountsOut(uint256,address[])
+_UINT256_MAX = (1 << 256) - 1
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+_ADDR_WORDS: dict[str, str] = {}       # адрес (как передан) -> слово из 64 hex
+_CHECKSUMMED: dict[str, str] = {}      # 40 hex (lower) -> checksum-адрес
+_PATH_TAILS: dict[tuple, str] = {}     # путь -> длина + слова адресов
+
+def _addr_word(address: str) -> str:
+    w = _ADDR_WORDS.get(address)
+    if w is None:
+        h = address[2:] if address[:2] in ('0x', '0X') else address
+        if len(h) != 40 or not _HEX_DIGITS.issuperset(h):
+            raise ValueError(f'Invalid address: {address!r}')
+        w = _ADDR_WORDS[address] = '0' * 24 + h.lower()
+    return w
+
+def _uint_word(value: int) -> str:
+    if not 0 <= value <= _UINT256_MAX:
+        raise ValueError(f'uint256 out of range: {value}')
+    return '%064x' % value
+
+def _path_tail(path) -> str:
+    key = tuple(path)
+    tail = _PATH_TAILS.get(key)
+    if tail is None:
+        tail = _PATH_TAILS[key] = _uint_word(len(key)) + ''.join(_addr_word(a) for a in key)
+    return tail
 
 def encode_approve(spender: str, amount: int) -> str:
-    return _w3_encoder.eth.contract(abi=ERC20_ABI).encodeABI(fn_name='approve', args=[spender, amount])
+    return SEL_APPROVE + _addr_word(spender) + _uint_word(amount)
 
 def encode_swap_exact_tokens_supporting(amount_in: int, amount_out_min: int, path: list[str], to: str, deadline: int) -> str:
-    return _w3_encoder.eth.contract(abi=ROUTER_ABI).encodeABI(
-        fn_name='swapExactTokensForTokensSupportingFeeOnTransferTokens',
-        args=[amount_in, amount_out_min, path, to, deadline]
-    )
+    # голова: amountIn, amountOutMin, offset(path)=5*32, to, deadline; хвост: len(path) + адреса
+    return (SEL_SWAP_SUPPORTING + _uint_word(amount_in) + _uint_word(amount_out_min) + '%064x' % 0xa0
+            + _addr_word(to) + _uint_word(deadline) + _path_tail(path))
 
 def encode_call_sig(sig4: str) -> str:
     # helper for simple constant calls with only selector
@@ -352,41 +774,219 @@ SEL_DECIMALS    = '0x313ce567'
 SEL_SYMBOL      = '0x95d89b41'
 SEL_BALANCEOF   = '0x70a08231'
 SEL_ALLOWANCE   = '0xdd62ed3e'
+# Multicall3
+SEL_AGGREGATE3     = '0x82ad56cb'  # aggregate3((address,bool,bytes)[])
+SEL_GETETHBALANCE  = '0x4d2301cc'  # getEthBalance(address)
+# UniswapV2Pair: Sync(uint112 reserve0, uint112 reserve1)
+TOPIC_SYNC = '0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1'
+
+# ---- calldata / декодеры (общие для одиночных eth_call и Multicall3) ----
+def calldata_balance_of(address: str) -> str:
+    return SEL_BALANCEOF + _addr_word(address)
+
+def calldata_allowance(owner: str, spender: str) -> str:
+    return SEL_ALLOWANCE + _addr_word(owner) + _addr_word(spender)
+
+def calldata_eth_balance(address: str) -> str:
+    return SEL_GETETHBALANCE + _addr_word(address)
+
+def calldata_get_amounts_out(amount_in: int, path: list[str]) -> str:
+    # amountIn, offset(path)=2*32, затем len(path) + адреса
+    return SEL_GETAMOUNTSOUT + _uint_word(amount_in) + '%064x' % 0x40 + _path_tail(path)
+
+def decode_uint(out: str, default: int = 0) -> int:
+    return int(out, 16) if out and out != '0x' else default
+
+def decode_reserves(out: str) -> tuple[int,int]:
+    if not out or len(out) < 130:
+        raise RuntimeError('getReserves call failed')
+    # три 32-байтовых слова; берём первые два прямо из hex, без bytes
+    return int(out[2:66], 16), int(out[66:130], 16)
+
+def decode_address(out: str) -> str:
+    # last 20 bytes; checksum (keccak) — один раз на адрес
+    h = out[-40:].lower()
+    addr = _CHECKSUMMED.get(h)
+    if addr is None:
+        addr = _CHECKSUMMED[h] = Web3.to_checksum_address('0x' + h)
+    return addr
+
+def decode_amounts_out(out: str) -> int:
+    # uint256[]: offset, length, элементы — нужен последний элемент, это последнее слово
+    if not out or len(out) < 2 + 64 * 3 or (len(out) - 2) % 64 or int(out[66:130], 16) == 0:
+        raise RuntimeError(f'getAmountsOut: unexpected result {out[:80]!r}')
+    return int(out[-64:], 16)
 
 def eth_call_balance_of(client_call, token: str, address: str) -> int:
-    data = SEL_BALANCEOF + pad32_hex(address.lower().replace('0x',''))
-    out = client_call(token, data)
-    return int(out, 16) if out and out != '0x' else 0
+    out = client_call(token, calldata_balance_of(address))
+    return decode_uint(out)
 
 def eth_call_decimals(client_call, token: str) -> int:
     try:
         out = client_call(token, SEL_DECIMALS)
-        return int(out, 16) if out and out != '0x' else 18
+        return decode_uint(out, 18)
     except:
         return 18
 
+def receipt_ok(receipt) -> bool:
+    """status квитанции: 1 — успех (raw JSON '0x1' или int из web3)"""
+    st = receipt.get('status') if receipt else None
+    if st is None:
+        return True
+    return (int(st, 16) if isinstance(st, str) else int(st)) == 1
+
 def eth_call_allowance(client_call, token: str, owner: str, spender: str) -> int:
-    data = SEL_ALLOWANCE + pad32_hex(owner.lower().replace('0x','')) + pad32_hex(spender.lower().replace('0x',''))
-    out = client_call(token, data)
-    return int(out, 16) if out and out != '0x' else 0
+    out = client_call(token, calldata_allowance(owner, spender))
+    return decode_uint(out)
 
 def eth_call_pair_reserves(client_call, pair: str) -> tuple[int,int]:
     out = client_call(pair, SEL_GETRESERVES)
-    if not out or out == '0x':
-        raise RuntimeError('getReserves call failed')
-    # decode three 32-byte words; take first two
-    data = bytes.fromhex(out[2:])
-    r0 = int.from_bytes(data[0:32], 'big')
-    r1 = int.from_bytes(data[32:64], 'big')
-    return r0, r1
+    return decode_reserves(out)
 
 def eth_call_pair_tokens(client_call, pair: str) -> tuple[str,str]:
     t0 = client_call(pair, SEL_TOKEN0)
     t1 = client_call(pair, SEL_TOKEN1)
-    # last 20 bytes each
-    a0 = '0x' + t0[-40:]
-    a1 = '0x' + t1[-40:]
-    return Web3.to_checksum_address(a0), Web3.to_checksum_address(a1)
+    return decode_address(t0), decode_address(t1)
+
+def multicall_aggregate3(client_call, calls: list[tuple[str,str]]) -> list:
+    """
+    Пакует несколько eth_call в ОДИН вызов Multicall3.aggregate3 (allowFailure=True).
+    calls: [(to, data_hex), ...]. Возвращает список hex-результатов;
+    None — для подвызовов, которые откатились.
+    """
+    out = client_call(MULTICALL3, calldata_aggregate3(calls))
+    return decode_aggregate3(out)
+
+def calldata_aggregate3(calls: list[tuple[str,str]]) -> str:
+    from eth_abi import encode as abi_encode
+    payload = [(Web3.to_checksum_address(to), True, bytes.fromhex(data[2:])) for to, data in calls]
+    return SEL_AGGREGATE3 + abi_encode(['(address,bool,bytes)[]'], [payload]).hex()
+
+def decode_aggregate3(out: str) -> list:
+    from eth_abi import decode as abi_decode
+    if not out or out == '0x':
+        raise RuntimeError('Multicall3 aggregate3 call failed')
+    (results,) = abi_decode(['(bool,bytes)[]'], bytes.fromhex(out[2:]))
+    return [('0x' + ret.hex()) if ok else None for ok, ret in results]
+
+class MulticallBatch:
+    """Сборщик READ-вызовов: add() копит подвызовы, execute() отправляет их одним eth_call"""
+    def __init__(self, client_call):
+        self._client_call = client_call
+        self._calls = []
+        self._decoders = []
+
+    def add(self, to: str, data: str, decoder=decode_uint) -> int:
+        """Добавляет подвызов, возвращает его индекс в результате execute()"""
+        self._calls.append((to, data))
+        self._decoders.append(decoder)
+        return len(self._calls) - 1
+
+    def execute(self) -> list:
+        """Один round-trip; None для откатившихся/нераскодированных подвызовов"""
+        if not self._calls:
+            return []
+        return self._decode(multicall_aggregate3(self._client_call, self._calls))
+
+    async def execute_async(self, acall) -> list:
+        """То же через асинхронный eth_call: await acall(to, data) -> hex"""
+        if not self._calls:
+            return []
+        out = await acall(MULTICALL3, calldata_aggregate3(self._calls))
+        return self._decode(decode_aggregate3(out))
+
+    def _decode(self, raw: list) -> list:
+        out = []
+        for res, dec in zip(raw, self._decoders):
+            if res is None:
+                out.append(None)
+                continue
+            try:
+                out.append(dec(res))
+            except Exception:
+                out.append(None)
+        return out
+
+def hex_to_int(res) -> int:
+    return int(res, 16) if isinstance(res, str) and res.startswith('0x') and res != '0x' else int(res or 0)
+
+class RpcBatchSlot:
+    """Ячейка результата одного вызова внутри JSON-RPC batch"""
+    __slots__ = ('method', 'params', 'decoder', 'value', 'error', 'done')
+
+    def __init__(self, method: str, params: list, decoder=None):
+        self.method = method
+        self.params = params
+        self.decoder = decoder
+        self.value = None
+        self.error = None
+        self.done = False
+
+    def result(self):
+        """Значение вызова; ошибку узла поднимает как RuntimeError"""
+        if not self.done:
+            raise RuntimeError(f'{self.method}: batch ещё не выполнен')
+        if self.error is not None:
+            raise RuntimeError(f'{self.method} failed: {self.error}')
+        return self.value
+
+    def get(self, default=None):
+        """Значение вызова или default при ошибке"""
+        try:
+            return self.result()
+        except Exception:
+            return default
+
+class JsonRpcBatch:
+    """
+    JSON-RPC batch (Node-режим): несколько вызовов уходят ОДНИМ HTTP POST
+    массивом запросов, ответы раскладываются по слотам по id.
+    """
+    def __init__(self, url: str, session: requests.Session | None = None, timeout: float = 10):
+        self.url = url
+        self.timeout = timeout
+        self._session = session or requests.Session()
+        self._slots: list[RpcBatchSlot] = []
+
+    def add(self, method: str, params: list, decoder=None) -> RpcBatchSlot:
+        slot = RpcBatchSlot(method, params, decoder)
+        self._slots.append(slot)
+        return slot
+
+    def call(self, to: str, data: str, decoder=decode_uint, tag: str = 'latest') -> RpcBatchSlot:
+        """eth_call внутри batch"""
+        return self.add('eth_call', [{'to': to, 'data': data}, tag], decoder)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def execute(self) -> list[RpcBatchSlot]:
+        """Один round-trip на все накопленные вызовы"""
+        if not self._slots:
+            return []
+        payload = [{'jsonrpc': '2.0', 'id': i, 'method': s.method, 'params': s.params}
+                   for i, s in enumerate(self._slots)]
+        r = self._session.post(self.url, json=payload, timeout=self.timeout)
+        r.raise_for_status()
+        data = r.json()
+        if not isinstance(data, list):
+            # узел не поддерживает batch и вернул одиночную ошибку
+            raise RuntimeError(f'JSON-RPC batch rejected: {data}')
+        by_id = {item.get('id'): item for item in data if isinstance(item, dict)}
+        for i, slot in enumerate(self._slots):
+            slot.done = True
+            item = by_id.get(i)
+            if item is None:
+                slot.error = 'no response'
+            elif item.get('error') is not None:
+                slot.error = item['error'].get('message') if isinstance(item['error'], dict) else item['error']
+            else:
+                try:
+                    res = item.get('result')
+                    slot.value = slot.decoder(res) if slot.decoder else res
+                except Exception as e:
+                    slot.error = str(e)
+        return self._slots
 
 def uni_v2_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int = 25) -> int:
     # Pancake V2 fee ~0.25% => 25 bps (0.0025), so multiplier is 10000 - 25 = 9975
@@ -396,19 +996,92 @@ def uni_v2_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps
     denominator = (reserve_in * 10000) + amount_in_with_fee
     return numerator // denominator if denominator > 0 else 0
 
+class QuoteEngine:
+    """
+    Локальные котировки Pancake V2: точная целочисленная формула роутера по
+    резервам, свежим на текущем блоке. getAmountsOut по RPC — только если
+    свежих резервов нет. verify=True — фоновая сверка с on-chain котировкой.
+    """
+    def __init__(self, core, fee_bps: int = 25, verify: bool = False):
+        self.core = core
+        self.fee_bps = fee_bps
+        self.verify = verify
+        self.mismatches = 0
+
+    def fresh_reserves(self):
+        """(r_plex, r_usdt) на текущем head или None"""
+        head = self.core.block_cache.current()
+        if head is None:
+            return None
+        tracker = self.core.reserve_tracker
+        snap = tracker.snapshot() if tracker else None
+        if snap and snap[2] == head:
+            return snap[0], snap[1]
+        # кэш резервов, записанный на этом же блоке (см. BlockCache)
+        return self.core._cache_get('reserves', ttl_s=2)
+
+    @staticmethod
+    def _direction(path: list):
+        """True: PLEX→USDT, False: USDT→PLEX, None: другой путь"""
+        p = [a.lower() for a in path]
+        if p == [PLEX.lower(), USDT.lower()]:
+            return True
+        if p == [USDT.lower(), PLEX.lower()]:
+            return False
+        return None
+
+    def local_quote(self, amount_in: int, path: list, reserves: tuple[int, int]) -> int:
+        r_plex, r_usdt = reserves
+        if self._direction(path):
+            return uni_v2_amount_out(amount_in, r_plex, r_usdt, self.fee_bps)
+        return uni_v2_amount_out(amount_in, r_usdt, r_plex, self.fee_bps)
+
+    def quote(self, amount_in: int, path: list) -> int:
+        reserves = self.fresh_reserves() if self._direction(path) is not None else None
+        if reserves is None:
+            self.core.stats['quote_rpc'] = self.core.stats.get('quote_rpc', 0) + 1
+            return rpc_get_amounts_out(self.core, amount_in, path)
+        self.core.stats['quote_local'] = self.core.stats.get('quote_local', 0) + 1
+        out = self.local_quote(amount_in, path, reserves)
+        if self.verify:
+            self.core._submit(self.self_check, amount_in, path)
+        return out
+
+    def self_check(self, amount_in: int, path: list) -> dict:
+        """Сравнивает локальную и on-chain котировку по резервам того же блока (один Multicall3)"""
+        batch = MulticallBatch(self.core._client_call)
+        i_res = batch.add(PAIR_ADDRESS, SEL_GETRESERVES, decode_reserves)
+        i_out = batch.add(PANCAKE_V2_ROUTER, calldata_get_amounts_out(amount_in, path), decode_amounts_out)
+        res = batch.execute()
+        r0, r1 = res[i_res]
+        is_t0 = self.core._cache_get('is_plex_token0')
+        if is_t0 is None:
+            t0, _ = eth_call_pair_tokens(self.core._client_call, PAIR_ADDRESS)
+            is_t0 = (t0.lower() == PLEX.lower())
+        local = self.local_quote(amount_in, path, (r0, r1) if is_t0 else (r1, r0))
+        onchain = res[i_out]
+        ok = onchain is not None and local == onchain
+        if not ok:
+            self.mismatches += 1
+            self.core.log(f"⚠️ QuoteEngine: локально {local} ≠ on-chain {onchain}")
+        return {'ok': ok, 'local': local, 'onchain': onchain}
+
+
+def rpc_get_amounts_out(core, amount_in: int, path: list) -> int:
+    """getAmountsOut по RPC (без фоллбэка)"""
+    if core.mode != RpcMode.PROXY:
+        # ОПТИМИЗАЦИЯ: Читаем через read-RPC/кэш вместо QuickNode
+        data = calldata_get_amounts_out(amount_in, path)
+        hexres = core._client_call(PANCAKE_V2_ROUTER, data)  # уйдет на read_w3 с кэшем
+        return decode_amounts_out(hexres)
+    # Proxy режим: eth_call через ABI-энкодер
+    return core.proxy_get_amounts_out(amount_in, path)
+
 def get_amounts_out(core, amount_in: int, path: list) -> int:
-    """Получает ожидаемый выход через getAmountsOut с фоллбэком на резервы"""
+    """Ожидаемый выход: локально по свежим резервам, иначе getAmountsOut; фоллбэк — резервы"""
     try:
-        if core.mode == RpcMode.NODE:
-            # ОПТИМИЗАЦИЯ: Читаем через read-RPC/кэш вместо QuickNode
-            data = _router_encoder.encodeABI(fn_name='getAmountsOut', args=[amount_in, path])
-            hexres = core._client_call(PANCAKE_V2_ROUTER, data)  # уйдет на read_w3 с кэшем
-            from eth_abi import decode as abi_decode
-            (amounts,) = abi_decode(['uint256[]'], bytes.fromhex(hexres[2:]))
-            return int(amounts[-1])
-        else:
-            # Proxy режим: eth_call через ABI-энкодер
-            return core.proxy_get_amounts_out(amount_in, path)
+        # ОПТИМИЗАЦИЯ: без сетевого хопа, если резервы актуальны на текущем блоке
+        return core.quotes.quote(amount_in, path)
     except Exception as e:
         # Фоллбэк на резервы (без safety-бонуса - он применится в safe_sell_now)
         core.log(f"⚠️ getAmountsOut недоступен, используем резервы: {e}")
@@ -425,12 +1098,482 @@ def get_amounts_out(core, amount_in: int, path: list) -> int:
 
 MAX_UINT256 = (1 << 256) - 1
 
+class BlockCache:
+    """
+    Кэш чтений по номеру блока: повтор внутри блока бесплатен, новый head
+    инвалидирует всё, кроме закреплённых (неизменяемых) ключей.
+    Пока head неизвестен или устарел — current() = None и вызывающий
+    откатывается на прежние TTL.
+    """
+    def __init__(self, head_max_age_s: float = 6.0):
+        self._lock = threading.Lock()
+        self.head = None
+        self._head_ts = 0.0
+        self.head_max_age_s = head_max_age_s
+        self._entries = {}   # key -> (value, block)
+        self._pinned = {}    # key -> value (навсегда)
+
+    def advance(self, block: int) -> bool:
+        """Сообщает head; True — если блок новый (кэш сброшен)"""
+        with self._lock:
+            self._head_ts = time.time()
+            if self.head is not None and block <= self.head:
+                return False
+            self.head = block
+            self._entries.clear()
+            return True
+
+    def current(self):
+        """Свежий head или None"""
+        if self.head is None or time.time() - self._head_ts > self.head_max_age_s:
+            return None
+        return self.head
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._pinned:
+                return self._pinned[key]
+        head = self.current()
+        if head is None:
+            return default
+        with self._lock:
+            e = self._entries.get(key)
+        return e[0] if e is not None and e[1] == head else default
+
+    def put(self, key, value, block) -> bool:
+        """
+        Сохраняет значение, прочитанное на блоке block (head, снятый ДО запроса).
+        Если head за время чтения сменился — значение не кэшируется.
+        """
+        head = self.current()
+        if head is None or block != head:
+            return False
+        with self._lock:
+            if self.head != block:
+                return False
+            self._entries[key] = (value, block)
+        return True
+
+    def pin(self, key, value):
+        with self._lock:
+            self._pinned[key] = value
+
+    def is_pinned(self, key) -> bool:
+        return key in self._pinned
+
+
+# Неизменяемые чтения: результат закрепляется навсегда
+PINNED_SELECTORS = (SEL_TOKEN0, SEL_TOKEN1, SEL_DECIMALS, SEL_SYMBOL)
+
+
+class CommandCancelled(Exception):
+    """Команда отменена пользователем"""
+
+
+class CancelToken:
+    """Флаг отмены фоновой команды (проверяется между сетевыми шагами)"""
+    def __init__(self):
+        self._evt = threading.Event()
+
+    def cancel(self):
+        self._evt.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._evt.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Пауза, прерываемая отменой; True — если отменено"""
+        return self._evt.wait(timeout)
+
+    def check(self):
+        if self._evt.is_set():
+            raise CommandCancelled("Операция отменена")
+
+
+class LatencyWindow:
+    """Скользящее окно задержек READ; threshold() — порог хеджирования по перцентилю"""
+    def __init__(self, size: int = 200, pct: float = 0.95, min_samples: int = 20,
+                 default_s: float = 0.5, floor_s: float = 0.05, cap_s: float = 2.0):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=size)
+        self.pct = pct
+        self.min_samples = min_samples
+        self.default_s = default_s
+        self.floor_s = floor_s
+        self.cap_s = cap_s
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def threshold(self) -> float:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.default_s
+            ordered = sorted(self._samples)
+        v = ordered[min(len(ordered) - 1, int(len(ordered) * self.pct))]
+        return min(self.cap_s, max(self.floor_s, v))
+
+
+class RpcEndpoint:
+    """Состояние одного READ-эндпоинта (постоянный провайдер + метрики)"""
+    def __init__(self, url: str, timeout: int = 10, session: requests.Session | None = None):
+        self.url = url
+        session = session or make_http_session()
+        self.w3 = Web3(PooledHTTPProvider(url, session, timeout=timeout))
+        self.rpc = RawRpcClient(url, session, timeout=timeout)   # горячие методы без web3
+        self.ewma_s = None       # EWMA задержки, сек
+        self.err_rate = 0.0      # EWMA доли ошибок (0..1)
+        self.fails = 0           # подряд идущие ошибки
+        self.head = None         # последний head, который отдал эндпоинт
+        self.open_until = 0.0    # circuit breaker: до какого момента исключён
+        self.open_s = 0.0        # текущая длительность исключения (растёт x2)
+
+    @property
+    def is_open(self) -> bool:
+        return self.open_until > 0.0
+
+
+class EndpointPool:
+    """
+    Пул READ-эндпоинтов (dataseed + Node URL) с постоянными провайдерами.
+    Каждому запросу — лучший здоровый по score (EWMA задержки × ошибки + отставание head).
+    После fail_threshold ошибок подряд эндпоинт исключается (circuit breaker) и
+    возвращается только после успешной фоновой пробы eth_blockNumber.
+    """
+    def __init__(self, urls: list[str], log_fn=print, alpha: float = 0.2, max_head_lag: int = 3,
+                 fail_threshold: int = 3, open_s: float = 15.0, max_open_s: float = 300.0,
+                 probe_interval_s: float = 10.0, session: requests.Session | None = None):
+        self._lock = threading.Lock()
+        self.log = log_fn
+        self.endpoints = [RpcEndpoint(u, session=session) for u in dict.fromkeys(u for u in urls if u)]
+        self.alpha = alpha
+        self.max_head_lag = max_head_lag
+        self.fail_threshold = fail_threshold
+        self.base_open_s = open_s
+        self.max_open_s = max_open_s
+        self.probe_interval_s = probe_interval_s
+        self.head = None         # лучший известный head (по всем источникам)
+        self._stop_evt = threading.Event()
+        self._probe_thread = None
+
+    def lag(self, ep: RpcEndpoint) -> int:
+        if self.head is None or ep.head is None:
+            return 0
+        return max(0, self.head - ep.head)
+
+    def score(self, ep: RpcEndpoint) -> float:
+        lat = ep.ewma_s if ep.ewma_s is not None else 0.3
+        return lat * (1.0 + 5.0 * ep.err_rate) + 0.2 * self.lag(ep)
+
+    def healthy(self, ep: RpcEndpoint) -> bool:
+        return not ep.is_open and self.lag(ep) <= self.max_head_lag
+
+    def best(self, exclude=()) -> RpcEndpoint | None:
+        """Лучший здоровый эндпоинт; если здоровых нет — лучший из неисключённых"""
+        with self._lock:
+            cands = [e for e in self.endpoints if e not in exclude]
+            pool = [e for e in cands if self.healthy(e)] or [e for e in cands if not e.is_open]
+            return min(pool, key=self.score) if pool else None
+
+    def record(self, ep: RpcEndpoint, ok: bool, latency_s: float = None):
+        with self._lock:
+            a = self.alpha
+            ep.err_rate = (1 - a) * ep.err_rate + a * (0.0 if ok else 1.0)
+            if ok:
+                ep.fails = 0
+                if latency_s is not None:
+                    ep.ewma_s = latency_s if ep.ewma_s is None else (1 - a) * ep.ewma_s + a * latency_s
+                return
+            ep.fails += 1
+            if ep.fails < self.fail_threshold or ep.is_open:
+                return
+            ep.open_s = min(self.max_open_s, ep.open_s * 2 if ep.open_s else self.base_open_s)
+            ep.open_until = time.time() + ep.open_s
+        self.log(f"⛔ RPC {ep.url} исключён на {ep.open_s:.0f}с ({ep.fails} ошибок подряд)")
+
+    def eject(self, ep: RpcEndpoint):
+        """Принудительно открыть breaker (например, при сетевой ошибке выше по стеку)"""
+        for _ in range(max(0, self.fail_threshold - ep.fails)):
+            self.record(ep, False)
+
+    def observe_head(self, block: int, ep: RpcEndpoint = None):
+        with self._lock:
+            if ep is not None and (ep.head is None or block > ep.head):
+                ep.head = block
+            if self.head is None or block > self.head:
+                self.head = block
+
+    def probe(self, ep: RpcEndpoint) -> bool:
+        """eth_blockNumber: обновляет задержку/head; закрывает breaker при успехе"""
+        t0 = time.time()
+        try:
+            block = ep.rpc.eth_blockNumber()
+        except Exception:
+            if ep.is_open:
+                with self._lock:
+                    ep.open_s = min(self.max_open_s, ep.open_s * 2)
+                    ep.open_until = time.time() + ep.open_s
+            else:
+                self.record(ep, False)
+            return False
+        was_open = ep.is_open
+        with self._lock:
+            ep.open_until = 0.0
+            ep.open_s = 0.0
+        self.record(ep, True, time.time() - t0)
+        self.observe_head(block, ep)
+        if was_open:
+            self.log(f"✅ RPC {ep.url} снова в пуле")
+        return True
+
+    def start_probe(self):
+        if self._probe_thread and self._probe_thread.is_alive():
+            return
+        self._stop_evt.clear()
+        self._probe_thread = threading.Thread(target=self._probe_loop, daemon=True, name='rpc-probe')
+        self._probe_thread.start()
+
+    def stop_probe(self):
+        self._stop_evt.set()
+
+    def _probe_loop(self):
+        last_full = 0.0
+        while not self._stop_evt.wait(1.0):
+            now = time.time()
+            full = now - last_full >= self.probe_interval_s
+            if full:
+                last_full = now
+            for ep in list(self.endpoints):
+                # исключённые — когда истёк срок; здоровые — раз в probe_interval_s (head lag, задержка)
+                if (ep.is_open and now >= ep.open_until) or (full and not ep.is_open):
+                    self.probe(ep)
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [{'url': e.url, 'ms': (e.ewma_s or 0.0) * 1000.0, 'err': e.err_rate,
+                     'lag': self.lag(e), 'open': e.is_open, 'score': self.score(e)} for e in self.endpoints]
+
+
+class HedgeBudget:
+    """Бюджет хеджей: каждый обычный запрос даёт ratio кредита, хедж тратит 1 (потолок burst)"""
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self._lock = threading.Lock()
+        self.ratio = ratio
+        self.burst = burst
+        self._credits = burst
+
+    def earn(self):
+        with self._lock:
+            self._credits = min(self.burst, self._credits + self.ratio)
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self._credits < 1.0:
+                return False
+            self._credits -= 1.0
+            return True
+
+
+# Ответы узлов, означающие «эта tx уже в мемпуле» — для fan-out это успех
+ALREADY_KNOWN_MARKERS = ('already known', 'known transaction', 'already imported', 'alreadyknown')
+
+
+class BroadcastUncertain(RuntimeError):
+    """Ни один канал не принял tx, но часть не ответила за таймаут — tx могла уйти (tx_hash — локальный)"""
+    def __init__(self, msg: str, tx_hash: str):
+        super().__init__(msg)
+        self.tx_hash = tx_hash
+
+
+class BroadcastMux:
+    """
+    Рассылка одной подписанной tx параллельно: Node RPC, dataseed-пул и *Scan proxy.
+    Первый полученный tx-hash — результат; «already known» — тоже успех (hash = keccak(raw)).
+    Один медленный/упавший эндпоинт больше не задерживает продажу.
+    """
+    def __init__(self, core, timeout_s: float = 15.0):
+        self.core = core
+        self.timeout_s = timeout_s
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='bcast')
+        self._lock = threading.Lock()
+        self._dataseed = None    # лёгкие провайдеры dataseed, если пула READ нет (Proxy)
+        self._proxy = None       # proxy-клиент только для рассылки (Node + заданные ключи)
+        self.wins = {}           # имя цели -> сколько раз ответила первой
+        self.last_winner = None
+        self.last_ms = None
+
+    def _dataseed_endpoints(self) -> list:
+        pool = self.core.endpoints
+        if pool:
+            return list(pool.endpoints)
+        if self._dataseed is None:
+            self._dataseed = [RpcEndpoint(u, session=self.core._http) for u in self.core.rpc_urls]
+        return self._dataseed
+
+    def _proxy_client(self):
+        if self.core.proxy:
+            return self.core.proxy
+        cfg = self.core.cfg
+        if self._proxy is None and cfg.proxy_base_url and cfg.proxy_api_keys:
+            self._proxy = ProxyClient(cfg.proxy_base_url, cfg.proxy_api_keys, session=self.core._http)
+        return self._proxy
+
+    def targets(self) -> list[tuple[str, object]]:
+        """[(имя, send(raw_hex) -> hash)] — все доступные каналы отправки"""
+        out = []
+        node = self.core.node_rpc
+        node_url = self.core.cfg.node_http
+        if node is not None:
+            out.append(('node', self.core.node_rpc.eth_sendRawTransaction))
+        # БЕЗОПАСНОСТЬ: «Только оффлайн-подпись» — отправка исключительно через свой узел
+        if self.core.offline_only:
+            return out
+        for ep in self._dataseed_endpoints():
+            if ep.url == node_url or ep.is_open:
+                continue
+            out.append((ep.url.split('//')[-1], ep.rpc.eth_sendRawTransaction))
+        proxy = self._proxy_client()
+        if proxy is not None:
+            out.append(('proxy', proxy.eth_sendRawTransaction))
+        return out
+
+    @staticmethod
+    def _push(send, raw_hex: str, local_hash: str) -> str:
+        try:
+            return send(raw_hex)
+        except Exception as e:
+            if any(m in str(e).lower() for m in ALREADY_KNOWN_MARKERS):
+                return local_hash
+            raise
+
+    def send(self, signed: bytes) -> tuple[str, str]:
+        """
+        (tx_hash, победитель); если отказали все цели — RuntimeError со списком причин,
+        если кто-то не ответил за timeout_s — BroadcastUncertain (повторять тем же nonce нельзя).
+        """
+        raw_hex = Web3.to_hex(signed)
+        local_hash = Web3.to_hex(Web3.keccak(signed))
+        targets = self.targets()
+        if not targets:
+            raise RuntimeError("Нет доступных каналов отправки (Node/dataseed/proxy)")
+        t0 = time.time()
+        futs = {self._pool.submit(self._push, send, raw_hex, local_hash): name for name, send in targets}
+        pending = set(futs)
+        errors = []
+        deadline = t0 + self.timeout_s
+        while pending:
+            done, pending = futures_wait(pending, timeout=max(0.0, deadline - time.time()),
+                                         return_when=FIRST_COMPLETED)
+            if not done:
+                errors.append(f"нет ответа за {self.timeout_s:.0f}с: {', '.join(futs[f] for f in pending)}")
+                raise BroadcastUncertain("Broadcast not confirmed by any target: " + " | ".join(errors), local_hash)
+            for f in done:
+                name = futs[f]
+                if f.exception() is None:
+                    ms = (time.time() - t0) * 1000.0
+                    with self._lock:
+                        self.wins[name] = self.wins.get(name, 0) + 1
+                        self.last_winner, self.last_ms = name, ms
+                    self.core.log(f"📡 Broadcast: первым принял {name} за {ms:.0f} мс (каналов: {len(targets)})")
+                    return f.result(), name
+                errors.append(f"{name}: {f.exception()}")
+        raise RuntimeError("Broadcast failed on all targets: " + " | ".join(errors))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'winner': self.last_winner, 'ms': self.last_ms, 'wins': dict(self.wins)}
+
+
+# ===== ОПТИМИЗАЦИЯ: Гибридный режим — маршрут на каждый класс операций =====
+# Порядок предпочтения источников: бесплатные dataseed → платный узел → *Scan proxy
+ROUTE_PREFERENCE = {
+    'read':    ('dataseed', 'node', 'proxy'),   # eth_call/Multicall, балансы, логи, estimateGas
+    'gas':     ('dataseed', 'node', 'proxy'),
+    'receipt': ('dataseed', 'node', 'proxy'),
+    'nonce':   ('node', 'proxy'),               # nonce — только у «своего» узла, proxy — запасной
+}
+
+
+class RouteTable:
+    """
+    Маршруты HYBRID: для каждого класса операций источники упорядочены по score =
+    EWMA задержки × (1 + 5·доля ошибок) × penalty^(позиция в ROUTE_PREFERENCE).
+    Платный узел получает READ, только если dataseed заметно медленнее или сбоит;
+    ошибки со временем «забываются», так что просевший источник снова пробуется.
+    """
+    def __init__(self, sources, alpha: float = 0.2, penalty: float = 3.0, err_half_life_s: float = 30.0):
+        self._lock = threading.Lock()
+        self.sources = set(sources)
+        self.alpha = alpha
+        self.penalty = penalty
+        self.err_half_life_s = err_half_life_s
+        self._m = {}   # (класс, источник) -> {'ewma_s', 'err', 'ts', 'calls'}
+
+    def _score(self, cls: str, src: str, rank: int, now: float) -> float:
+        m = self._m.get((cls, src))
+        lat = m['ewma_s'] if m and m['ewma_s'] is not None else 0.3
+        err = m['err'] * 0.5 ** ((now - m['ts']) / self.err_half_life_s) if m else 0.0
+        return lat * (1.0 + 5.0 * err) * self.penalty ** rank
+
+    def order(self, cls: str) -> list[str]:
+        prefs = [s for s in ROUTE_PREFERENCE[cls] if s in self.sources]
+        now = time.time()
+        with self._lock:
+            return sorted(prefs, key=lambda s: self._score(cls, s, prefs.index(s), now))
+
+    def record(self, cls: str, src: str, ok: bool, latency_s: float = None):
+        now = time.time()
+        with self._lock:
+            m = self._m.setdefault((cls, src), {'ewma_s': None, 'err': 0.0, 'ts': now, 'calls': 0})
+            a = self.alpha
+            m['err'] = (1 - a) * m['err'] * 0.5 ** ((now - m['ts']) / self.err_half_life_s) + a * (0.0 if ok else 1.0)
+            m['ts'] = now
+            m['calls'] += 1
+            if ok and latency_s is not None:
+                m['ewma_s'] = latency_s if m['ewma_s'] is None else (1 - a) * m['ewma_s'] + a * latency_s
+
+    def run(self, cls: str, **fns):
+        """fns: источник -> fn(); источники по order(cls), первый успешный ответ — результат"""
+        error = None
+        for src in self.order(cls):
+            fn = fns.get(src)
+            if fn is None:
+                continue
+            t0 = time.time()
+            try:
+                res = fn()
+            except RequestShed:
+                raise
+            except Exception as e:
+                self.record(cls, src, False)
+                error = e
+                continue
+            self.record(cls, src, True, time.time() - t0)
+            return res
+        raise error or RuntimeError(f"Нет источника для операций '{cls}'")
+
+    def snapshot(self) -> dict:
+        """{класс: [{'src','ms','err','calls'}, ...] в порядке текущего маршрута}"""
+        out = {}
+        for cls in ROUTE_PREFERENCE:
+            rows = []
+            for src in self.order(cls):
+                with self._lock:
+                    m = dict(self._m.get((cls, src)) or {'ewma_s': None, 'err': 0.0, 'calls': 0})
+                rows.append({'src': src, 'ms': (m['ewma_s'] or 0.0) * 1000.0, 'err': m['err'], 'calls': m['calls']})
+            out[cls] = rows
+        return out
+
+
 class TradingCore:
     def __init__(self, cfg: BackendConfig, log_fn=print):
         self.cfg = cfg
         self.log = log_fn
         self.mode = cfg.mode
         self.node_w3 = None
+        self.node_rpc = None    # RawRpcClient к тому же узлу — горячие READ/WRITE без web3
         self.proxy = None
         
         # БЕЗОПАСНОСТЬ: Менеджеры
@@ -454,7 +1597,10 @@ class TradingCore:
         # БЕЗОПАСНОСТЬ: Получаем настройки Proxy из конфигурации
         self.proxy_base_url = self.cfg.proxy_base_url
         self.proxy_api_keys = self.cfg.proxy_api_keys[:] if self.cfg.proxy_api_keys else ["YourApiKeyToken"]
-        self.current_rpc_index = 0
+        # ОПТИМИЗАЦИЯ: пул READ-эндпоинтов с оценкой задержки (создаётся в connect для Node)
+        self.endpoints: EndpointPool | None = None
+        # ОПТИМИЗАЦИЯ: маршруты по классам операций (только HYBRID, создаётся в connect)
+        self.routes: RouteTable | None = None
         self.current_proxy_index = 0
         
         # ОПТИМИЗАЦИЯ: Кэш для снижения запросов к QuickNode
@@ -473,6 +1619,19 @@ class TradingCore:
         self._call_cache_max = 200  # ✚ мягкий потолок на размер кэша
         self._ttl_bnb_s = 10
         self._ttl_allowance_s = 10
+        # ОПТИМИЗАЦИЯ: кэш по номеру блока (TTL выше — только пока head неизвестен)
+        self.block_cache = BlockCache()
+        self._cache_block = {}  # key -> блок, для которого записано значение
+        self._read_src = threading.local()  # .lagged — чтения потока с отстающих по head эндпоинтов
+        # ОПТИМИЗАЦИЯ: single-flight — одинаковые eth_call в полёте ждут один Future
+        self._inflight = {}     # ((to.lower(), data), priority) -> Future
+        self._inflight_lock = threading.Lock()
+        # ОПТИМИЗАЦИЯ: хеджированные READ — дубль на второй dataseed, если первый медлит дольше p95
+        self.read_latency = LatencyWindow()
+        self.hedge_budget = HedgeBudget()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge')
+        # ОПТИМИЗАЦИЯ: общий пул keep-alive соединений (Web3-провайдеры, JSON-RPC batch, *Scan)
+        self._http = make_http_session()
         
         # ОПТИМИЗАЦИЯ: Статистика запросов (унифицированные ключи)
         self.stats = getattr(self, "stats", {}) or {}
@@ -485,16 +1644,33 @@ class TradingCore:
         self.stats.setdefault("gas", 0)       # вызовы gasPrice
         self.stats.setdefault("429", 0)       # лимиты
         self.stats.setdefault("5xx", 0)       # ошибки прокси
+        self.stats.setdefault("batch", 0)     # JSON-RPC batch запросы (HTTP POST)
+        self.stats.setdefault("batched", 0)   # вызовы, упакованные в batch
+        self.stats.setdefault("logs", 0)      # eth_getLogs (трекер резервов)
+        self.stats.setdefault("coalesced", 0) # eth_call, слитые с уже летящим запросом
+        self.stats.setdefault("hedged", 0)    # отправленные хеджи
+        self.stats.setdefault("hedge_won", 0) # хедж ответил первым
         self._last_stats_log = 0
-        # ---- P1 Adaptive proxy rate-limit ----
-        self.proxy_min_gap_ms = 150
-        self.proxy_max_gap_ms = 1000
-        self._proxy_last_call_ts = 0.0
-        self._proxy_error_window = []  # timestamps of recent 429/5xx
-        
+        # ---- P1 Adaptive proxy rate-limit: token bucket + AIMD на ключ внутри ProxyClient ----
+        # ОПТИМИЗАЦИЯ: пул для параллельных независимых READ (precheck)
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='rpc')
+        # ОПТИМИЗАЦИЯ: отправка tx параллельно во все каналы (см. BroadcastMux)
+        self.broadcaster = BroadcastMux(self)
+        self.ladder = None      # SwapLadder активной автопродажи (Interval), если есть
+
         # Газ-политика: минимальный "пол" газа (лесенка 0.1→0.2→0.1)
         self.gas_floor_wei = to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei'])
         self.offline_only = False  # управляется из UI
+        self.pipelined = False     # конвейер revoke/approve/swap одним блоком (управляется из UI)
+        self._swap_gas_hint = None # лимит газа последнего оценённого swap — для конвейера
+        # ОПТИМИЗАЦИЯ: локальные котировки по свежим резервам
+        self.quotes = QuoteEngine(self)
+        # ОПТИМИЗАЦИЯ: asyncio-ядро (см. AsyncTradingCore), создаётся по требованию
+        self.async_core = None
+        self._async_loop = None
+        # ОПТИМИЗАЦИЯ: head-блок и резервы из Sync-событий (см. HeadTracker/ReserveTracker)
+        self.head_tracker = None
+        self.reserve_tracker = None
 
     def _cache_get(self, key, ttl_s=None):
         """Получает значение из кэша с проверкой TTL"""
@@ -504,15 +1680,67 @@ class TradingCore:
         if ttl_s is None: 
             return v
         val, ts = v
+        # ОПТИМИЗАЦИЯ: при известном head значение валидно ровно в своём блоке
+        head = self.block_cache.current()
+        if head is not None:
+            return val if self._cache_block.get(key) == head else None
         return val if (time.time() - ts) < ttl_s else None
 
-    def _cache_set(self, key, value):
-        """Устанавливает значение в кэш с временной меткой"""
+    def _cache_set(self, key, value, block=None):
+        """
+        Устанавливает значение в кэш с временной меткой.
+        block — head, снятый до чтения; без него значение живёт только по TTL.
+        """
         if key in ('gas_price', 'reserves'):
             self._cache[key] = (value, time.time())
+            self._cache_block[key] = self._block_tag(block)
         else:
             self._cache[key] = value
 
+    def _map_cache_get(self, name: str, k, ttl_s: float):
+        """Значение из кэша-словаря (bnb_balance/allowance): по блоку, иначе по TTL"""
+        mp, _ = self._cache.get(name, ({}, 0))
+        e = mp.get(k)
+        if e is None:
+            return None
+        val, ts, block = e
+        head = self.block_cache.current()
+        if head is not None:
+            return val if block == head else None
+        return val if time.time() - ts < ttl_s else None
+
+    def _map_cache_set(self, name: str, k, value: int, block=None):
+        mp, _ = self._cache.get(name, ({}, 0))
+        now = time.time()
+        mp[k] = (int(value), now, self._block_tag(block))
+        self._cache[name] = (mp, now)
+
+    def _block_tag(self, block):
+        """Тег блока для кэша: block, только если он всё ещё head"""
+        if block is None or block != self.block_cache.current():
+            return None
+        return block
+
+    def _read_mark(self):
+        """Снимок перед чтением: (head, счётчик чтений с отстающих эндпоинтов в этом потоке)"""
+        return self.block_cache.current(), getattr(self._read_src, 'lagged', 0)
+
+    def _note_read_ep(self, ep):
+        """Учитывает, что чтение этого потока обслужил эндпоинт ep"""
+        if ep is not None and self.endpoints and self.endpoints.lag(ep) > 0:
+            self._read_src.lagged = getattr(self._read_src, 'lagged', 0) + 1
+
+    def _read_block(self, mark):
+        """Блок для тега кэша: head из mark, если с тех пор ни одно чтение не ушло на отстающий эндпоинт"""
+        block, lagged = mark
+        return block if getattr(self._read_src, 'lagged', 0) == lagged else None
+
+    def note_head(self, block: int):
+        """Новый head: кэш текущего блока сбрасывается"""
+        self.block_cache.advance(int(block))
+        if self.endpoints:
+            self.endpoints.observe_head(int(block))
+
     def _purge_call_cache(self):
         """Очищает протухшие ключи из коалесинг-кэша"""
         now = time.time()
@@ -542,84 +1770,284 @@ class TradingCore:
             )
             self._last_stats_log = now
 
-    # ---- P1 Adaptive proxy helpers ----
-    def _proxy_sleep_before_call(self):
-        gap = max(0, (self.proxy_min_gap_ms / 1000.0) - (time.time() - self._proxy_last_call_ts))
-        if gap > 0:
-            time.sleep(gap)
-        self._proxy_last_call_ts = time.time()
-
-    def _proxy_backoff(self, success: bool):
-        now = time.time()
-        # чистим окно старше 60с
-        self._proxy_error_window = [t for t in self._proxy_error_window if now - t < 60]
-        if success:
-            # плавное снижение раз в ~10 успешных вызовов
-            if self.proxy_min_gap_ms > 150:
-                self.proxy_min_gap_ms = max(150, int(self.proxy_min_gap_ms * 0.8))
-        else:
-            self._proxy_error_window.append(now)
-            if len(self._proxy_error_window) >= 3:
-                self.proxy_min_gap_ms = min(self.proxy_max_gap_ms, int(self.proxy_min_gap_ms * 1.5))
-
     def connect(self):
         if self.mode == RpcMode.NODE:
             if not self.cfg.node_http:
                 raise RuntimeError('Node RPC URL is empty')
-            self.node_w3 = Web3(Web3.HTTPProvider(self.cfg.node_http, request_kwargs={'timeout': 20}))
+            self.node_w3 = Web3(PooledHTTPProvider(self.cfg.node_http, self._http, timeout=20))
+            self.node_rpc = RawRpcClient(self.cfg.node_http, self._http, timeout=20)
             if not self.node_w3.is_connected():
                 raise RuntimeError('Failed to connect to Node RPC')
-            # ОПТИМИЗАЦИЯ: Легкий провайдер для READ операций (BSC dataseed)
-            self.read_w3 = Web3(Web3.HTTPProvider(self.rpc_urls[0], request_kwargs={'timeout': 10}))
+            # ОПТИМИЗАЦИЯ: READ — лучший по задержке/ошибкам/head эндпоинт из dataseed + Node
+            self.endpoints = EndpointPool(self.rpc_urls + [self.cfg.node_http], log_fn=self.log, session=self._http)
+            self.endpoints.start_probe()
+            self.read_w3 = self.endpoints.best().w3
             chain_id = self.node_w3.eth.chain_id
             if chain_id != BSC_CHAIN_ID:
                 self.log(f'⚠ Connected chainId={chain_id}, expected {BSC_CHAIN_ID}. Proceed with caution.')
             return 'Node'
+        elif self.mode == RpcMode.HYBRID:
+            if not self.cfg.node_http:
+                raise RuntimeError('Node RPC URL is empty')
+            self.node_w3 = Web3(PooledHTTPProvider(self.cfg.node_http, self._http, timeout=20))
+            self.node_rpc = RawRpcClient(self.cfg.node_http, self._http, timeout=20)
+            if not self.node_w3.is_connected():
+                raise RuntimeError('Failed to connect to Node RPC')
+            # ОПТИМИЗАЦИЯ: пул — только бесплатные dataseed; платный узел — отдельный маршрут (nonce/WRITE)
+            self.endpoints = EndpointPool(self.rpc_urls, log_fn=self.log, session=self._http)
+            self.endpoints.start_probe()
+            self.read_w3 = self.endpoints.best().w3
+            sources = ['dataseed', 'node']
+            # *Scan proxy — запасной источник, если заданы ключи
+            if self.cfg.proxy_base_url and self.cfg.proxy_api_keys:
+                self.proxy = ProxyClient(self.cfg.proxy_base_url, self.cfg.proxy_api_keys, session=self._http)
+                sources.append('proxy')
+            self.routes = RouteTable(sources)
+            chain_id = self.node_w3.eth.chain_id
+            if chain_id != BSC_CHAIN_ID:
+                self.log(f'⚠ Connected chainId={chain_id}, expected {BSC_CHAIN_ID}. Proceed with caution.')
+            return 'Hybrid'
         else:
             if not self.cfg.proxy_base_url:
                 raise RuntimeError('Proxy base URL is empty')
-            self.proxy = ProxyClient(self.cfg.proxy_base_url, self.cfg.proxy_api_keys or [])
+            self.proxy = ProxyClient(self.cfg.proxy_base_url, self.cfg.proxy_api_keys or [], session=self._http)
             # cheap ping
             _ = self.proxy.eth_gasPrice()
             return 'Proxy'
 
+    def warm_up(self, per_host: int = 2, timeout: float = 5.0) -> dict:
+        """
+        DNS + TCP + TLS ко всем эндпоинтам заранее и параллельно (по per_host соединений на хост),
+        чтобы первая проверка/продажа не платила за рукопожатия. Возвращает {url: мс | None}.
+        """
+        rpc_urls = [ep.url for ep in self.endpoints.endpoints] if self.endpoints else []
+        if self.cfg.node_http and self.mode != RpcMode.PROXY:
+            rpc_urls.append(self.cfg.node_http)
+        rpc_urls = list(dict.fromkeys(rpc_urls))
+        body = {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_chainId', 'params': []}
+
+        def hit(url: str, is_rpc: bool):
+            t0 = time.perf_counter()
+            try:
+                if is_rpc:
+                    self._http.post(url, json=body, timeout=timeout)
+                else:
+                    # *Scan: HEAD без ключа — соединение открыто, квота не тратится
+                    self._http.head(url, timeout=timeout)
+            except Exception:
+                return None
+            return (time.perf_counter() - t0) * 1000.0
+
+        jobs = [(u, True) for u in rpc_urls]
+        if self.proxy:
+            jobs.append((self.proxy.base_url, False))
+        if not jobs:
+            return {}
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(jobs) * per_host, thread_name_prefix='warmup') as ex:
+            futs = [(u, ex.submit(hit, u, rpc)) for u, rpc in jobs for _ in range(per_host)]
+            res = {}
+            for u, f in futs:
+                ms = f.result()
+                if ms is not None:
+                    res[u] = max(res.get(u) or 0.0, ms)
+                else:
+                    res.setdefault(u, None)
+        ok = sum(1 for v in res.values() if v is not None)
+        self.log(f"🔥 Соединения прогреты: {ok}/{len(res)} хостов за {(time.perf_counter() - t0) * 1000:.0f} мс")
+        return res
+
     # ---------- Common calls via abstract "client_call" ----------
     def _client_call(self, to: str, data: str) -> str:
         """READ операции с кэшированием и коалесингом"""
         # ОПТИМИЗАЦИЯ: Проверяем кэш для коалесинга одинаковых вызовов
         key = (to.lower(), data)
         now = time.time()
+        # ОПТИМИЗАЦИЯ: неизменяемые значения и повторы внутри блока
+        mark = self._read_mark()
+        hit = self.block_cache.get(key)
+        if hit is not None:
+            return hit
         cached = self._call_cache.get(key)
-        if cached and now - cached[1] < self._call_ttl_s:
+        if cached and self.block_cache.current() is None and now - cached[1] < self._call_ttl_s:
             return cached[0]
 
+        # ОПТИМИЗАЦИЯ: single-flight — такой же запрос уже летит (GUI + авто-поток), ждём его.
+        # Класс приоритета входит в ключ: чтение сделки не ждёт фоновый (и сбрасываемый) запрос
+        flight = (key, current_priority())
+        with self._inflight_lock:
+            fut = self._inflight.get(flight)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[flight] = Future()
+        if not leader:
+            self.stats['coalesced'] = self.stats.get('coalesced', 0) + 1
+            return fut.result()
+
+        try:
+            out = self._eth_call_uncached(to, data)
+            # ОПТИМИЗАЦИЯ: Кэшируем результат
+            if data[:10] in PINNED_SELECTORS and out and out != '0x':
+                self.block_cache.pin(key, out)
+            elif not self.block_cache.put(key, out, self._read_block(mark)):
+                self._call_cache[key] = (out, now)
+            fut.set_result(out)
+            return out
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(flight, None)
+
+    def _eth_call_uncached(self, to: str, data: str) -> str:
+        """eth_call в сеть без кэшей"""
         # считаем READ-вызовы в унифицированный счётчик
         self.stats['calls'] = self.stats.get('calls', 0) + 1
         
+        if self.mode == RpcMode.HYBRID:
+            return self.routes.run(
+                'read',
+                dataseed=lambda: self._hedged_read(lambda rpc: rpc.eth_call(to, data)),
+                node=lambda: self.node_rpc.eth_call(to, data),
+                proxy=self.proxy and (lambda: self.proxy.eth_call(to, data, 'latest')))
         # READ пытаемся через лёгкий провайдер (если есть), иначе основной
         try:
-            if self.mode == RpcMode.NODE and hasattr(self, 'read_w3') and self.read_w3 is not None:
-                res = self.read_w3.eth.call({'to': to, 'data': data}, 'latest')
-                out = res.hex()
+            if self.mode == RpcMode.NODE and (self.endpoints or getattr(self, 'read_w3', None) is not None):
+                # ОПТИМИЗАЦИЯ: сырой JSON-RPC — без middleware/форматтеров web3 и .hex()
+                return self._hedged_read(lambda rpc: rpc.eth_call(to, data))
             else:
                 raise RuntimeError("fallback to primary")
         except Exception:
             if self.mode == RpcMode.NODE:
-                out = self.node_w3.eth.call({'to': to, 'data': data}, 'latest').hex()
-            else:
-                out = self.proxy.eth_call(to, data, 'latest')
+                return self.node_rpc.eth_call(to, data)
+            return self.proxy.eth_call(to, data, 'latest')
 
-        # ОПТИМИЗАЦИЯ: Кэшируем результат
-        self._call_cache[key] = (out, now)
-        return out
+    def _timed_read(self, fn, ep, rpc):
+        """fn(rpc) с учётом задержки/ошибки в метриках эндпоинта (rpc — RawRpcClient)"""
+        t0 = time.time()
+        try:
+            res = fn(rpc)
+        except Exception:
+            if ep is not None:
+                self.endpoints.record(ep, False)
+            raise
+        if ep is not None:
+            self.endpoints.record(ep, True, time.time() - t0)
+        return res
+
+    def _hedged_read(self, fn):
+        """
+        fn(rpc) через лучший эндпоинт пула; если ответа нет дольше порога (p95 недавних задержек) —
+        тот же запрос на следующий по score эндпоинт, берём первый успешный ответ.
+        Хеджи ограничены HedgeBudget (~10% от потока запросов).
+        """
+        pool = self.endpoints
+        ep = pool.best() if pool else None
+        t0 = time.time()
+        primary = self._hedge_pool.submit(self._timed_read, fn, ep, ep.rpc if ep else self.node_rpc)
+        try:
+            res = primary.result(timeout=self.read_latency.threshold())
+            self.read_latency.add(time.time() - t0)
+            self.hedge_budget.earn()
+            self._note_read_ep(ep)
+            return res
+        except FutureTimeout:
+            pass
+        ep2 = pool.best(exclude=(ep,)) if pool else None
+        if ep2 is None or not self.hedge_budget.spend():
+            res = primary.result()
+            self.read_latency.add(time.time() - t0)
+            self._note_read_ep(ep)
+            return res
+        self.stats['hedged'] = self.stats.get('hedged', 0) + 1
+        pending = {primary, self._hedge_pool.submit(self._timed_read, fn, ep2, ep2.rpc)}
+        error = None
+        while pending:
+            done, pending = futures_wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is not primary:
+                        self.stats['hedge_won'] = self.stats.get('hedge_won', 0) + 1
+                    self.read_latency.add(time.time() - t0)
+                    self._note_read_ep(ep if f is primary else ep2)
+                    return f.result()
+                error = f.exception()
+        raise error
+
+    def _read_eth(self):
+        """web3.eth для READ: лучший эндпоинт пула / лёгкий провайдер, иначе основной узел"""
+        ep = self.endpoints.best() if self.endpoints else None
+        if ep is not None:
+            self._note_read_ep(ep)
+            return ep.w3.eth
+        if getattr(self, 'read_w3', None) is not None:
+            return self.read_w3.eth
+        return self.node_w3.eth
+
+    def _read_rpc(self) -> RawRpcClient:
+        """RawRpcClient для горячих READ: лучший эндпоинт пула, иначе основной узел"""
+        ep = self.endpoints.best() if self.endpoints else None
+        self._note_read_ep(ep)
+        return ep.rpc if ep is not None else self.node_rpc
+
+    def get_block_number(self) -> int:
+        """Номер последнего блока (head)"""
+        self.stats['calls'] = self.stats.get('calls', 0) + 1
+        if self.mode == RpcMode.NODE:
+            try:
+                head = self._pool_block_number()
+            except Exception:
+                head = self.node_rpc.eth_blockNumber()
+        elif self.mode == RpcMode.HYBRID:
+            head = int(self.routes.run('read', dataseed=self._pool_block_number,
+                                       node=self.node_rpc.eth_blockNumber,
+                                       proxy=self.proxy and self.proxy.eth_blockNumber))
+        else:
+            head = self.proxy.eth_blockNumber()
+        self.note_head(head)
+        return head
+
+    def _pool_block_number(self) -> int:
+        ep = self.endpoints.best() if self.endpoints else None
+        head = self._timed_read(lambda rpc: rpc.eth_blockNumber(), ep, ep.rpc if ep else self.node_rpc)
+        if ep is not None:
+            self.endpoints.observe_head(head, ep)
+        return head
+
+    def get_logs(self, address: str, topic0: str, from_block: int, to_block: int) -> list[dict]:
+        """eth_getLogs в обоих режимах; результат: [{'block','index','data'}] по возрастанию"""
+        self.stats['logs'] = self.stats.get('logs', 0) + 1
+        flt = {'address': address, 'topics': [topic0], 'fromBlock': from_block, 'toBlock': to_block}
+
+        def from_eth(eth):
+            return [{'block': int(l['blockNumber']), 'index': int(l['logIndex']),
+                     'data': '0x' + bytes(l['data']).hex()} for l in eth.get_logs(flt)]
+
+        def from_proxy():
+            return [{'block': decode_uint(l.get('blockNumber')), 'index': decode_uint(l.get('logIndex')),
+                     'data': l.get('data') or '0x'}
+                    for l in self.proxy.get_logs(address, topic0, from_block, to_block)]
+
+        if self.mode == RpcMode.NODE:
+            try:
+                logs = from_eth(self._read_eth())
+            except Exception:
+                logs = from_eth(self.node_w3.eth)
+        elif self.mode == RpcMode.HYBRID:
+            logs = self.routes.run('read', dataseed=lambda: from_eth(self._read_eth()),
+                                   node=lambda: from_eth(self.node_w3.eth),
+                                   proxy=self.proxy and from_proxy)
+        else:
+            logs = from_proxy()
+        logs.sort(key=lambda l: (l['block'], l['index']))
+        return logs
 
     def proxy_get_amounts_out(self, amount_in: int, path: list[str]) -> int:
         try:
-            data = _router_encoder.encodeABI(fn_name='getAmountsOut', args=[amount_in, path])
+            data = calldata_get_amounts_out(amount_in, path)
             hexres = self.proxy.eth_call(PANCAKE_V2_ROUTER, data)  # "0x..."
-            from eth_abi import decode as abi_decode
-            (amounts,) = abi_decode(['uint256[]'], bytes.fromhex(hexres[2:]))
-            return int(amounts[-1])  # финальное количество для последнего токена пути
+            return decode_amounts_out(hexres)  # финальное количество для последнего токена пути
         except Exception as e:
             self.log(f"⚠ getAmountsOut via proxy failed, fallback used: {e}")
             # мягкий фоллбэк на резервы пары (PLEX/USDT)
@@ -655,51 +2083,54 @@ class TradingCore:
     def get_bnb_balance(self, address: str) -> int:
         """Получает баланс BNB в wei с TTL кэшированием"""
         # ОПТИМИЗАЦИЯ: Проверяем TTL кэш для BNB баланса
-        mp, ts = self._cache.get('bnb_balance', ({}, 0))
-        if time.time() - ts < self._ttl_bnb_s and address in mp:
-            return mp[address]
+        cached = self._map_cache_get('bnb_balance', address, self._ttl_bnb_s)
+        if cached is not None:
+            return cached
             
         self.stats['balance'] += 1
+        mark = self._read_mark()
         try:
             if self.mode == RpcMode.NODE:
-                # ОПТИМИЗАЦИЯ: Сначала пробуем через read_w3 (BSC dataseed)
-                if hasattr(self, 'read_w3'):
-                    try:
-                        val = self.read_w3.eth.get_balance(address)
-                    except Exception:
-                        # Fallback на основной провайдер
-                        val = self.node_w3.eth.get_balance(address)
-                else:
-                    val = self.node_w3.eth.get_balance(address)
+                # ОПТИМИЗАЦИЯ: Сначала пробуем через READ-пул (BSC dataseed)
+                try:
+                    val = self._read_rpc().eth_getBalance(address)
+                except Exception:
+                    # Fallback на основной провайдер
+                    val = self.node_rpc.eth_getBalance(address)
+            elif self.mode == RpcMode.HYBRID:
+                val = self.routes.run('read', dataseed=lambda: self._read_rpc().eth_getBalance(address),
+                                      node=lambda: self.node_rpc.eth_getBalance(address),
+                                      proxy=self.proxy and (lambda: self._proxy_bnb_balance(address)))
             else:
-                # Для proxy режима используем eth_getBalance
-                params = {'module':'proxy','action':'eth_getBalance','address':address,'tag':'latest'}
-                data = self.proxy._get(params)
-                result = data.get('result')
-                if not result:
-                    val = 0
-                else:
-                    val = int(result, 16)
+                val = self._proxy_bnb_balance(address)
             
             # ОПТИМИЗАЦИЯ: Кэшируем результат
-            mp[address] = int(val)
-            self._cache['bnb_balance'] = (mp, time.time())
-            return mp[address]
+            self._map_cache_set('bnb_balance', address, val, self._read_block(mark))
+            return int(val)
         except Exception as e:
             self.log(f'⚠ Ошибка получения баланса BNB: {e}')
             return 0
 
+    def _proxy_bnb_balance(self, address: str) -> int:
+        # Для proxy режима используем eth_getBalance
+        params = {'module':'proxy','action':'eth_getBalance','address':address,'tag':'latest'}
+        data = self.proxy._get(params)
+        result = data.get('result')
+        if not result:
+            return 0
+        return int(result, 16)
+
     def get_allowance_cached(self, owner: str, spender: str) -> int:
         """Получает allowance с TTL кэшированием для UI-обновлений"""
         # ОПТИМИЗАЦИЯ: Проверяем TTL кэш для allowance
-        mp, ts = self._cache.get('allowance', ({}, 0))
         key = (owner.lower(), spender.lower())
-        if time.time() - ts < self._ttl_allowance_s and key in mp:
-            return mp[key]
+        cached = self._map_cache_get('allowance', key, self._ttl_allowance_s)
+        if cached is not None:
+            return cached
             
+        mark = self._read_mark()
         val = eth_call_allowance(self._client_call, PLEX, owner, spender)
-        mp[key] = val
-        self._cache['allowance'] = (mp, time.time())
+        self._map_cache_set('allowance', key, val, self._read_block(mark))
         return val
 
     def get_decimals(self, token_addr: str) -> int:
@@ -711,6 +2142,193 @@ class TradingCore:
             self.log(f"⚠️ Ошибка получения decimals для {token_addr}: {e}")
             return 18
 
+    def read_trade_state(self, owner: str, amount_in_raw: int = 0) -> dict:
+        """
+        Все READ-данные для префлайта одним round-trip через Multicall3:
+        balance_plex, allowance, bnb_balance, r_plex/r_usdt, token0/token1,
+        is_plex_token0, usdt_decimals, amounts_out (None — если недоступен).
+        При сбое Multicall3 — последовательный фоллбэк через _client_call.
+        """
+        # ОПТИМИЗАЦИЯ: 8–10 eth_call → 1 eth_call (особенно важно для Proxy/Scan API)
+        mark = self._read_mark()
+        try:
+            batch, idx = self._trade_state_batch(self._client_call, owner, amount_in_raw)
+            state, r0, r1 = self._trade_state_from(batch.execute(), idx)
+            if state['bnb_balance'] is None:
+                state['bnb_balance'] = self.get_bnb_balance(owner)
+        except Exception as e:
+            self.log(f"⚠️ Multicall3 недоступен, последовательное чтение: {e}")
+            t0, t1 = eth_call_pair_tokens(self._client_call, PAIR_ADDRESS)
+            r0, r1 = eth_call_pair_reserves(self._client_call, PAIR_ADDRESS)
+            amounts_out = 0
+            if amount_in_raw > 0:
+                try:
+                    amounts_out = decode_amounts_out(self._client_call(PANCAKE_V2_ROUTER, calldata_get_amounts_out(amount_in_raw, [PLEX, USDT])))
+                except Exception:
+                    amounts_out = None
+            state = {
+                'balance_plex': eth_call_balance_of(self._client_call, PLEX, owner),
+                'allowance': eth_call_allowance(self._client_call, PLEX, owner, PANCAKE_V2_ROUTER),
+                'bnb_balance': self.get_bnb_balance(owner),
+                'token0': t0,
+                'token1': t1,
+                'usdt_decimals': eth_call_decimals(self._client_call, USDT),
+                'amounts_out': amounts_out,
+            }
+        return self._finish_trade_state(owner, state, r0, r1, self._read_block(mark))
+
+    @staticmethod
+    def _trade_state_batch(client_call, owner: str, amount_in_raw: int):
+        """Multicall3-пакет для read_trade_state: (batch, индексы подвызовов)"""
+        batch = MulticallBatch(client_call)
+        idx = {
+            'bal':   batch.add(PLEX, calldata_balance_of(owner)),
+            'allow': batch.add(PLEX, calldata_allowance(owner, PANCAKE_V2_ROUTER)),
+            'bnb':   batch.add(MULTICALL3, calldata_eth_balance(owner)),
+            'res':   batch.add(PAIR_ADDRESS, SEL_GETRESERVES, decode_reserves),
+            't0':    batch.add(PAIR_ADDRESS, SEL_TOKEN0, decode_address),
+            't1':    batch.add(PAIR_ADDRESS, SEL_TOKEN1, decode_address),
+            'dec':   batch.add(USDT, SEL_DECIMALS),
+            'out':   None,
+        }
+        if amount_in_raw > 0:
+            idx['out'] = batch.add(PANCAKE_V2_ROUTER, calldata_get_amounts_out(amount_in_raw, [PLEX, USDT]), decode_amounts_out)
+        return batch, idx
+
+    @staticmethod
+    def _trade_state_from(res: list, idx: dict):
+        """Результаты пакета → (state, r0, r1); bnb_balance=None, если подвызов откатился"""
+        if res[idx['res']] is None or res[idx['t0']] is None or res[idx['t1']] is None:
+            raise RuntimeError('pair sub-calls reverted')
+        state = {
+            'balance_plex': res[idx['bal']] or 0,
+            'allowance': res[idx['allow']] or 0,
+            'bnb_balance': res[idx['bnb']],
+            'token0': res[idx['t0']],
+            'token1': res[idx['t1']],
+            'usdt_decimals': res[idx['dec']] or 18,
+            'amounts_out': res[idx['out']] if idx['out'] is not None else 0,
+        }
+        r0, r1 = res[idx['res']]
+        return state, r0, r1
+
+    def _finish_trade_state(self, owner: str, state: dict, r0: int, r1: int, block=None) -> dict:
+        is_plex_token0 = (state['token0'].lower() == PLEX.lower())
+        r_plex, r_usdt = (r0, r1) if is_plex_token0 else (r1, r0)
+        state.update({'r_plex': r_plex, 'r_usdt': r_usdt, 'is_plex_token0': is_plex_token0})
+
+        # ОПТИМИЗАЦИЯ: прогреваем существующие кэши — последующие одиночные чтения бесплатны
+        self._cache_set('is_plex_token0', is_plex_token0)
+        self._cache_set('usdt_decimals', state['usdt_decimals'])
+        self._cache_set('reserves', (r_plex, r_usdt), block)
+        self._map_cache_set('bnb_balance', owner, state['bnb_balance'], block)
+        self._map_cache_set('allowance', (owner.lower(), PANCAKE_V2_ROUTER.lower()), state['allowance'], block)
+        return state
+
+    def rpc_batch(self) -> JsonRpcBatch:
+        """Новый JSON-RPC batch к текущему READ-узлу (Node/Hybrid)"""
+        if self.mode == RpcMode.PROXY:
+            raise RuntimeError('JSON-RPC batch недоступен в Proxy-режиме')
+        ep = self.endpoints.best() if self.endpoints else None
+        self._note_read_ep(ep)
+        return JsonRpcBatch(ep.url if ep else self.rpc_urls[0], session=self._http)
+
+    def _run_batch(self, batch: JsonRpcBatch) -> list[RpcBatchSlot]:
+        """Выполняет batch с учётом статистики"""
+        self.stats['batch'] = self.stats.get('batch', 0) + 1
+        self.stats['batched'] = self.stats.get('batched', 0) + len(batch)
+        return batch.execute()
+
+    def get_account_snapshot(self, address: str) -> dict:
+        """
+        Балансы PLEX/USDT/BNB, nonce, gasPrice, резервы и allowance.
+        Node/Hybrid: один JSON-RPC batch (1 RTT вместо 4–6); Proxy: последовательно.
+        """
+        if self.mode != RpcMode.PROXY:
+            try:
+                return self._account_snapshot_batch(address)
+            except Exception as e:
+                self.log(f"⚠️ JSON-RPC batch недоступен, последовательное чтение: {e}")
+        return self._account_snapshot_sequential(address)
+
+    def _account_snapshot_batch(self, address: str) -> dict:
+        mark = self._read_mark()
+        b = self.rpc_batch()
+        s_plex  = b.call(PLEX, calldata_balance_of(address))
+        s_usdt  = b.call(USDT, calldata_balance_of(address))
+        s_bnb   = b.add('eth_getBalance', [address, 'latest'], hex_to_int)
+        s_nonce = b.add('eth_getTransactionCount', [address, 'pending'], hex_to_int)
+        s_gas   = b.add('eth_gasPrice', [], hex_to_int)
+        s_res   = b.call(PAIR_ADDRESS, SEL_GETRESERVES, decode_reserves)
+        s_allow = b.call(PLEX, calldata_allowance(address, PANCAKE_V2_ROUTER))
+        # неизменяемые значения берём из кэша, если уже известны
+        is_plex_token0 = self._cache_get('is_plex_token0')
+        usdt_dec = self._cache_get('usdt_decimals')
+        s_t0 = s_t1 = s_dec = None
+        if is_plex_token0 is None:
+            s_t0 = b.call(PAIR_ADDRESS, SEL_TOKEN0, decode_address)
+            s_t1 = b.call(PAIR_ADDRESS, SEL_TOKEN1, decode_address)
+        if usdt_dec is None:
+            s_dec = b.call(USDT, SEL_DECIMALS)
+        self._run_batch(b)
+        block = self._read_block(mark)
+
+        token0 = token1 = None
+        if s_t0 is not None:
+            token0, token1 = s_t0.result(), s_t1.result()
+            is_plex_token0 = (token0.lower() == PLEX.lower())
+            self._cache_set('is_plex_token0', is_plex_token0)
+        if s_dec is not None:
+            usdt_dec = s_dec.get(18)
+            self._cache_set('usdt_decimals', usdt_dec)
+        r0, r1 = s_res.result()
+        r_plex, r_usdt = (r0, r1) if is_plex_token0 else (r1, r0)
+        self._cache_set('reserves', (r_plex, r_usdt), block)
+        snap = {
+            'plex': s_plex.result(), 'usdt': s_usdt.result(),
+            'plex_decimals': 9, 'usdt_decimals': usdt_dec,
+            'bnb': s_bnb.result(), 'nonce': s_nonce.get(),
+            'gas_price': s_gas.get(), 'allowance': s_allow.get(),
+            'r_plex': r_plex, 'r_usdt': r_usdt, 'is_plex_token0': is_plex_token0,
+            'token0': token0, 'token1': token1,
+            'price': self._price_from_reserves(r_plex, r_usdt),
+        }
+        # ОПТИМИЗАЦИЯ: прогреваем TTL-кэши газа/BNB/allowance
+        if snap['gas_price'] is not None:
+            self.stats['gas'] = self.stats.get('gas', 0) + 1
+            self._cache_set('gas_price', int(snap['gas_price']), block)
+        self._map_cache_set('bnb_balance', address, snap['bnb'], block)
+        if snap['allowance'] is not None:
+            self._map_cache_set('allowance', (address.lower(), PANCAKE_V2_ROUTER.lower()), snap['allowance'], block)
+        return snap
+
+    def _account_snapshot_sequential(self, address: str) -> dict:
+        # ОПТИМИЗАЦИЯ: независимые чтения параллельно — в Proxy их разносит пул API-ключей
+        f_bal = self._submit(self.get_balances, address)
+        f_price = self._submit(self.get_price_and_reserves)
+        f_bnb = self._submit(self.get_bnb_balance, address)
+        f_allow = self._submit(self.get_allowance_cached, address, PANCAKE_V2_ROUTER)
+        plex_raw, usdt_raw, plex_dec, usdt_dec = f_bal.result()
+        price, r_plex, r_usdt, is_plex_token0 = f_price.result()
+        return {
+            'plex': plex_raw, 'usdt': usdt_raw,
+            'plex_decimals': plex_dec, 'usdt_decimals': usdt_dec,
+            'bnb': f_bnb.result(), 'nonce': None,
+            'gas_price': None, 'allowance': f_allow.result(),
+            'r_plex': r_plex, 'r_usdt': r_usdt, 'is_plex_token0': is_plex_token0,
+            'token0': None, 'token1': None,
+            'price': price,
+        }
+
+    @staticmethod
+    def _price_from_reserves(r_plex: int, r_usdt: int) -> Decimal:
+        """USDT за 1 PLEX с учётом decimals (PLEX=9, USDT=18)"""
+        if r_plex == 0:
+            return Decimal('0')
+        # Цена (USDT/PLEX) = (reserveUSDT / 10^18) / (reservePLEX / 10^9)
+        # Эквивалентно: reserveUSDT / reservePLEX * 10^(9-18)
+        return Decimal(r_usdt) / Decimal(r_plex) * Decimal(10) ** Decimal(-9)
+
     def get_price_and_reserves(self) -> tuple[Decimal, int, int, bool]:
         """Получает цену и резервы пары с offline-устойчивостью"""
         if self.is_offline:
@@ -734,22 +2352,24 @@ class TradingCore:
             is_plex_token0 = (t0.lower() == PLEX.lower())
             self._cache_set('is_plex_token0', is_plex_token0)
         
+        # ОПТИМИЗАЦИЯ: Свежий снимок из Sync-событий — без RPC
+        tracked = self.reserve_tracker.snapshot() if self.reserve_tracker else None
         # ОПТИМИЗАЦИЯ: Кэшируем резервы с TTL 2 секунды
         cached_reserves = self._cache_get('reserves', ttl_s=2)
-        if cached_reserves:
+        if tracked:
+            r_plex, r_usdt, _ = tracked
+        elif cached_reserves:
             r_plex, r_usdt = cached_reserves
         else:
+            mark = self._read_mark()
             r0, r1 = eth_call_pair_reserves(self._client_call, PAIR_ADDRESS)
             r_plex, r_usdt = (r0, r1) if is_plex_token0 else (r1, r0)
-            self._cache_set('reserves', (r_plex, r_usdt))
+            self._cache_set('reserves', (r_plex, r_usdt), self._read_block(mark))
         
         if r_plex == 0:
             return Decimal('0'), r_plex, r_usdt, is_plex_token0
         
-        # Нормализация цены с учетом decimals: PLEX=9, USDT=18
-        # Цена (USDT/PLEX) = (reserveUSDT / 10^18) / (reservePLEX / 10^9)
-        # Эквивалентно: reserveUSDT / reservePLEX * 10^(9-18) = reserveUSDT / reservePLEX * 10^(-9)
-        price = Decimal(r_usdt) / Decimal(r_plex) * Decimal(10) ** Decimal(-9)
+        price = self._price_from_reserves(r_plex, r_usdt)
         
         # ОПТИМИЗАЦИЯ: Логируем статистику
         self._log_stats()
@@ -760,7 +2380,7 @@ class TradingCore:
         """Получает текущую цену газа с учетом лимитов и кэшированием"""
         try:
             user_gas = default_wei
-            floor = max(self.gas_floor_wei, to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei']))
+            network_gas = None
             
             if use_network_gas:
                 # Кэшируем сетевой газ с TTL 15 секунд
@@ -770,37 +2390,28 @@ class TradingCore:
                     network_gas = cached_gas
                 else:
                     self.stats['gas'] = self.stats.get('gas', 0) + 1
+                    mark = self._read_mark()
                     if self.mode == RpcMode.NODE:
                         network_gas = int(self.node_w3.eth.gas_price)
+                    elif self.mode == RpcMode.HYBRID:
+                        network_gas = int(self.routes.run(
+                            'gas', dataseed=lambda: self._read_eth().gas_price,
+                            node=lambda: self.node_w3.eth.gas_price,
+                            proxy=self.proxy and self.proxy.eth_gasPrice))
                     else:
                         try:
-                            self._proxy_sleep_before_call()
                             network_gas = int(self.proxy.eth_gasPrice())
-                            self._proxy_backoff(success=True)
                         except Exception as e:
                             msg = str(e).lower()
                             if "429" in msg:
                                 self.stats["429"] = self.stats.get("429", 0) + 1
-                                self._proxy_backoff(success=False)
                             elif "50" in msg or "5xx" in msg:
                                 self.stats["5xx"] = self.stats.get("5xx", 0) + 1
-                                self._proxy_backoff(success=False)
                             raise
                     # кэш и для Node, и для Proxy
-                    self._cache_set('gas_price', network_gas)
-                
-                # Используем максимум из пользовательского, сетевого газа и пола
-                final_gas = max(user_gas, network_gas, floor)
-            else:
-                # Используем максимум из пользовательского газа и пола
-                final_gas = max(user_gas, floor)
+                    self._cache_set('gas_price', network_gas, self._read_block(mark))
             
-            # БЕЗОПАСНОСТЬ: Применяем лимиты газа
-            min_gas = to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei'])
-            max_gas = to_wei_gwei(DEFAULT_LIMITS['max_gas_gwei'])
-            
-            # Ограничиваем лимитами
-            final_gas = max(min_gas, min(final_gas, max_gas))
+            final_gas = self.apply_gas_policy(user_gas, network_gas)
             
             if final_gas != user_gas:
                 self.log(f"⛽ Газ скорректирован: {from_wei_gwei(user_gas):.3f} → {from_wei_gwei(final_gas):.3f} gwei")
@@ -811,24 +2422,68 @@ class TradingCore:
             self.log(f'⚠ Ошибка получения цены газа: {e}')
             return default_wei
     
+    def apply_gas_policy(self, user_wei: int, network_wei: int | None = None) -> int:
+        """Максимум из пользовательского, сетевого газа и пола, в пределах лимитов (без сети)"""
+        floor = max(self.gas_floor_wei, to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei']))
+        final_gas = max(user_wei, network_wei or 0, floor)
+        # БЕЗОПАСНОСТЬ: Применяем лимиты газа
+        min_gas = to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei'])
+        max_gas = to_wei_gwei(DEFAULT_LIMITS['max_gas_gwei'])
+        return max(min_gas, min(final_gas, max_gas))
+
+    def last_network_gas(self) -> int | None:
+        """Последний известный сетевой газ без проверки TTL (для локальных пересчётов)"""
+        val, _ = self._cache.get('gas_price') or (0, 0)
+        return val or None
+
     # (удалено) adjust_gas_for_replacement — не используется
 
     def get_nonce(self, address: str) -> int:
         if self.mode == RpcMode.NODE:
             return int(self.node_w3.eth.get_transaction_count(address, 'pending'))
+        elif self.mode == RpcMode.HYBRID:
+            return int(self.routes.run(
+                'nonce', node=lambda: self.node_w3.eth.get_transaction_count(address, 'pending'),
+                proxy=self.proxy and (lambda: self.proxy.eth_getTransactionCount(address, 'pending'))))
         else:
             return int(self.proxy.eth_getTransactionCount(address, 'pending'))
 
+    def get_transaction(self, tx_hash: str) -> dict | None:
+        """eth_getTransactionByHash; None — tx нет ни в мемпуле узла, ни в блоке"""
+        if self.mode == RpcMode.NODE:
+            return self.node_rpc.eth_getTransactionByHash(tx_hash)
+        elif self.mode == RpcMode.HYBRID:
+            return self.routes.run(
+                'receipt', dataseed=lambda: self._read_rpc().eth_getTransactionByHash(tx_hash),
+                node=lambda: self.node_rpc.eth_getTransactionByHash(tx_hash),
+                proxy=self.proxy and (lambda: self.proxy.eth_getTransactionByHash(tx_hash)))
+        return self.proxy.eth_getTransactionByHash(tx_hash)
+
     def estimate_gas(self, tx: dict, default: int=300000) -> int:
         try:
             if self.mode == RpcMode.NODE:
                 return int(self.node_w3.eth.estimate_gas(tx))
+            elif self.mode == RpcMode.HYBRID:
+                return int(self.routes.run('read', dataseed=lambda: self._read_eth().estimate_gas(tx),
+                                           node=lambda: self.node_w3.eth.estimate_gas(tx),
+                                           proxy=self.proxy and (lambda: self.proxy.eth_estimateGas(tx))))
             else:
                 return int(self.proxy.eth_estimateGas(tx))
         except Exception as e:
             self.log(f'⚠ Gas estimate failed, using default {default}: {e}')
             return default
 
+    def _submit(self, fn, *args, **kwargs):
+        """В пул чтений с контекстом вызывающего (приоритет запроса наследуется)"""
+        return self._pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    @staticmethod
+    def _timed(fn, *args, **kwargs):
+        """(результат, мс) — для отчёта по стадиям"""
+        t = time.perf_counter()
+        res = fn(*args, **kwargs)
+        return res, (time.perf_counter() - t) * 1000.0
+
     # ---------- ПРЕДВАРИТЕЛЬНАЯ ПРОВЕРКА (без симуляций) ----------
     def precheck_summary(self, owner: str, amount_in_raw: int, gas_price_wei: int,
                          user_slippage_pct: float, deadline_min: int, limits: dict) -> dict:
@@ -837,131 +2492,65 @@ class TradingCore:
         Возвращает словарь с ключами: network, balance_plex, allowance, bnb_gas,
         min_out, limits, pair_ok (+ полезные поля для UI).
         """
-        summary = {
-            "network": {"ok": not self.is_offline, "msg": "OK" if not self.is_offline else "Offline"},
-            "balance_plex": {"ok": False, "have": 0, "need": amount_in_raw, "msg": ""},
-            "allowance": {"ok": False, "have": 0, "need": amount_in_raw, "msg": ""},
-            "bnb_gas": {"ok": False, "have": 0, "need": 0, "est_units": 0, "msg": ""},
-            "min_out": {"ok": False, "expected": 0, "min_out": 0, "msg": ""},
-            "limits": {"ok": True, "msg": "OK"},
-            "pair_ok": {"ok": True, "msg": "OK"},
-            "impact": {"ok": True, "pct": 0.0, "msg": "OK"},
-            "reserves": {"ok": True, "plex": 0.0, "usdt": 0.0, "msg": "OK"},
-        }
-        try:
-            # Баланс PLEX
-            bal_plex = eth_call_balance_of(self._client_call, PLEX, owner)
-            summary["balance_plex"]["have"] = bal_plex
-            summary["balance_plex"]["ok"] = bal_plex >= amount_in_raw
-            summary["balance_plex"]["msg"] = "OK" if summary["balance_plex"]["ok"] else "Недостаточно PLEX"
-
-            # Allowance
-            allow = eth_call_allowance(self._client_call, PLEX, owner, PANCAKE_V2_ROUTER)
-            summary["allowance"]["have"] = allow
-            summary["allowance"]["ok"] = allow >= amount_in_raw
-            summary["allowance"]["msg"] = "OK" if summary["allowance"]["ok"] else "Потребуется approve"
-
-            # Резервы и ожидаемый выход (safe: публичный метод ядра)
-            price, rplex, rusdt, _ = self.get_price_and_reserves()
-            expected_out = get_amounts_out(self, amount_in_raw, [PLEX, USDT]) if amount_in_raw > 0 else 0
-            safety = DEFAULT_LIMITS['safety_slippage_bonus'] / 100.0
-            user = max(0.0, float(user_slippage_pct)) / 100.0
-            min_out = max(int(expected_out * (1 - user - safety)), 1) if expected_out > 0 else 0
-            summary["min_out"]["expected"] = expected_out
-            summary["min_out"]["min_out"] = min_out
-            summary["min_out"]["ok"] = expected_out > 0 and min_out > 0
-            summary["min_out"]["msg"] = "OK" if summary["min_out"]["ok"] else "Нет ликвидности/резервов"
-
-            # Динамические минимумы резервов
-            plex_res = float(from_units(rplex, 9))
-            usdt_res = float(from_units(rusdt, 18))
-            amt_in_plex = float(from_units(amount_in_raw, 9))
-            exp_out_usdt = float(from_units(expected_out, 18))
-            mult = float(DEFAULT_LIMITS['reserve_value_multiplier'])
-            min_plex_dyn = max(float(DEFAULT_LIMITS['min_pool_reserve_plex_abs']), amt_in_plex * mult)
-            min_usdt_dyn = max(float(DEFAULT_LIMITS['min_pool_reserve_usdt_abs']), exp_out_usdt * mult)
-            summary["reserves"].update({
-                "plex": plex_res, "usdt": usdt_res,
-                "min_plex": min_plex_dyn, "min_usdt": min_usdt_dyn
-            })
-            res_ok = (plex_res >= min_plex_dyn) and (usdt_res >= min_usdt_dyn)
-            summary["reserves"]["ok"] = res_ok
-            summary["reserves"]["msg"] = "OK" if res_ok else "Резервы ниже минимума"
-            # линейный теоретический выход без слippage:
-            theo_out = 0
-            if amount_in_raw > 0 and rplex > 0:
-                theo_out = int((amount_in_raw * rusdt) // rplex)
-            impact_pct = 0.0
-            if theo_out > 0 and expected_out > 0:
-                impact_pct = max(0.0, 100.0 * (1.0 - (expected_out / theo_out)))
-            summary["impact"]["pct"] = impact_pct
-            imp_ok = impact_pct <= float(DEFAULT_LIMITS['max_price_impact_pct'])
-            summary["impact"]["ok"] = imp_ok
-            summary["impact"]["msg"] = "OK" if imp_ok else f"Impact {impact_pct:.2f}% > {DEFAULT_LIMITS['max_price_impact_pct']}%"
-
-            # Gas budget (approve + swap, с буфером 20%)
-            deadline_ts = int(time.time()) + deadline_min * 60
-            gas_units = 0
-            # approve (если надо)
-            if allow < amount_in_raw:
-                approve_tx = {'to': PLEX, 'data': encode_approve(PANCAKE_V2_ROUTER, amount_in_raw), 'from': owner}
-                gas_units += self.estimate_gas(approve_tx, default=50000)
-            # swap (всегда оцениваем)
-            swap_tx = {'to': PANCAKE_V2_ROUTER,
-                       'data': encode_swap_exact_tokens_supporting(amount_in_raw, 0, [PLEX, USDT], owner, deadline_ts),
-                       'from': owner}
-            gas_units += self.estimate_gas(swap_tx, default=200000)
-            gas_units = int(gas_units * 1.2)
-            gas_need_wei = gas_units * max(gas_price_wei, to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei']))
-            bal_bnb = self.get_bnb_balance(owner)
-            summary["bnb_gas"].update({"have": bal_bnb, "need": gas_need_wei, "est_units": gas_units})
-            summary["bnb_gas"]["ok"] = bal_bnb >= gas_need_wei
-            summary["bnb_gas"]["msg"] = "OK" if summary["bnb_gas"]["ok"] else "Недостаточно BNB на газ"
-
-            # Лимиты
-            can_sell, reason = self.limits_manager.can_sell(
-                amount_plex=float(amount_in_raw) / (10 ** 9),
-                max_per_tx=limits.get('max_per_tx_plex', DEFAULT_LIMITS['max_per_tx_plex']),
-                max_daily=limits.get('max_daily_plex', DEFAULT_LIMITS['max_daily_plex']),
-                max_hourly=limits.get('max_sales_per_hour', DEFAULT_LIMITS['max_sales_per_hour'])
-            )
-            summary["limits"]["ok"] = bool(can_sell)
-            summary["limits"]["msg"] = "OK" if can_sell else reason
+        return PrecheckModel(self).update(
+            owner, refresh=True, amount=amount_in_raw, gas_price=gas_price_wei,
+            slippage=user_slippage_pct, deadline=deadline_min, limits=limits)
 
-            # Whitelist пары
-            t0, t1 = eth_call_pair_tokens(self._client_call, PAIR_ADDRESS)
-            pair_tokens = {t0.lower(), t1.lower()}
-            expected = {SAFETY_WHITELIST['PLEX'], SAFETY_WHITELIST['USDT']}
-            good = pair_tokens == expected
-            summary["pair_ok"]["ok"] = good
-            summary["pair_ok"]["msg"] = "OK" if good else "Неожиданные токены в паре"
-        except Exception as e:
-            summary["network"] = {"ok": False, "msg": str(e)}
-        return summary
+    def fetch_precheck_chain(self, owner: str, amount_in_raw: int, deadline_min: int) -> dict:
+        """Сетевая часть precheck: состояние пары/кошелька и оценки газа"""
+        if self.is_offline:
+            raise Exception(f"{ErrorCode.NETWORK}: Offline режим, нет соединения")
+        timings = {}
+        t_start = time.perf_counter()
+        block = self.block_cache.current()   # head на момент начала чтений
+        # ОПТИМИЗАЦИЯ: независимые запросы параллельно — время ≈ max, а не сумма RTT
+        deadline_ts = int(time.time()) + deadline_min * 60
+        swap_tx = {'to': PANCAKE_V2_ROUTER,
+                   'data': encode_swap_exact_tokens_supporting(amount_in_raw, 0, [PLEX, USDT], owner, deadline_ts),
+                   'from': owner}
+        approve_tx = {'to': PLEX, 'data': encode_approve(PANCAKE_V2_ROUTER, amount_in_raw), 'from': owner}
+        f_state = self._submit(self._timed, self.read_trade_state, owner, amount_in_raw)
+        f_swap = self._submit(self._timed, self.estimate_gas, swap_tx, default=200000)
+        # approve оцениваем заранее, если кэш allowance не говорит, что он не нужен
+        cached_allow = self._map_cache_get('allowance', (owner.lower(), PANCAKE_V2_ROUTER.lower()),
+                                           self._ttl_allowance_s)
+        f_approve = None
+        if cached_allow is None or cached_allow < amount_in_raw:
+            f_approve = self._submit(self._timed, self.estimate_gas, approve_tx, default=50000)
+        # все READ-данные одним Multicall3
+        st, timings["state_ms"] = f_state.result()
+        gas_approve = None
+        if st['allowance'] < amount_in_raw:
+            if f_approve is None:   # кэш allowance устарел — оцениваем сейчас
+                f_approve = self._submit(self._timed, self.estimate_gas, approve_tx, default=50000)
+            gas_approve, timings["gas_approve_ms"] = f_approve.result()
+        gas_swap, timings["gas_swap_ms"] = f_swap.result()
+        timings["total_ms"] = (time.perf_counter() - t_start) * 1000.0
+        return {'state': st, 'amount_in_raw': amount_in_raw, 'gas_swap': gas_swap,
+                'gas_approve': gas_approve, 'block': block,
+                'ts': time.time(), 'timings': timings}
 
     def send_raw(self, signed: bytes) -> str:
         """Отправляет транзакцию с учётом offline_only"""
-        if self.offline_only and self.mode != RpcMode.NODE:
+        if self.offline_only and self.mode == RpcMode.PROXY:
             raise RuntimeError("Режим 'Только оффлайн-подпись': отправка доступна только через Node RPC")
         try:
             # учитываем попытку отправки
             self.stats["send"] = self.stats.get("send", 0) + 1
-            if self.mode == RpcMode.NODE:
-                txh = self.node_w3.eth.send_raw_transaction(signed)
-                return txh.hex()
-            # Proxy
-            self._proxy_sleep_before_call()
-            h = self.proxy.eth_sendRawTransaction(Web3.to_hex(signed))
-            self._proxy_backoff(success=True)
-            return h
+            # ОПТИМИЗАЦИЯ: Node + dataseed + proxy одновременно, берём первый принятый hash
+            txh, _ = self.broadcaster.send(signed)
+            return txh
+        except BroadcastUncertain as e:
+            # БЕЗОПАСНОСТЬ: медленный канал мог принять tx — nonce занят ею, переподписывать нельзя
+            self.stats['send_uncertain'] = self.stats.get('send_uncertain', 0) + 1
+            self.log(f"⚠ {e} — считаем tx отправленной ({e.tx_hash}), ждём квитанцию")
+            return e.tx_hash
         except Exception as e:
             msg = str(e).lower()
             if "429" in msg:
                 self.stats["429"] = self.stats.get("429", 0) + 1
-                self._proxy_backoff(success=False)
             elif "50" in msg or "5xx" in msg:
                 self.stats["5xx"] = self.stats.get("5xx", 0) + 1
-                self._proxy_backoff(success=False)
             raise
 
     # Возвращает активный индекс ключа прокси (если есть)
@@ -970,6 +2559,10 @@ class TradingCore:
                getattr(self, "current_proxy_index",
                getattr(self, "_idx", None)))
 
+    def proxy_key_usage(self) -> list[dict]:
+        """Использование API-ключей пула (Proxy) — для RPC-статистики"""
+        return self.proxy.usage() if self.proxy else []
+
     # ---------- БЕЗОПАСНОСТЬ: Безопасный approve ----------
     def safe_approve(self, owner: str, pk: str, amount_needed: int, gas_price_wei: int) -> str:
         """Безопасный approve: 0 → amount → 0"""
@@ -1031,57 +2624,111 @@ class TradingCore:
     
     def _send_approve_tx(self, owner: str, pk: str, amount: int, gas_price_wei: int) -> str:
         """Вспомогательный метод для отправки approve транзакции"""
-        nonce = self.nonce_manager.reserve_nonce(self.nonce_manager.get_nonce(self, owner))
+        nonce = self.nonce_manager.reserve(self, owner)
+        ladder = self.ladder
         try:
-            data = encode_approve(PANCAKE_V2_ROUTER, amount)
-            tx = {
-                'to': PLEX,
-                'value': 0,
-                'data': data,
-                'chainId': BSC_CHAIN_ID,
-                'gasPrice': gas_price_wei,
-                'nonce': nonce
-            }
-            gas = self.estimate_gas({'from': owner, **tx})
-            tx['gas'] = gas
-            signed = Account.from_key(pk).sign_transaction(tx)
-            txh = self.send_raw(signed.rawTransaction)
-            self.nonce_manager.record_sent_tx(nonce, gas_price_wei, txh)
-            self.nonce_manager.release_nonce(True)
+            raw = ladder.take_approve(owner, amount, nonce, gas_price_wei) if ladder else None
+            if raw is None:
+                data = encode_approve(PANCAKE_V2_ROUTER, amount)
+                tx = {
+                    'to': PLEX,
+                    'value': 0,
+                    'data': data,
+                    'chainId': BSC_CHAIN_ID,
+                    'gasPrice': gas_price_wei,
+                    'nonce': nonce
+                }
+                gas = self.estimate_gas({'from': owner, **tx})
+                tx['gas'] = gas
+                raw = Account.from_key(pk).sign_transaction(tx).rawTransaction
+                if ladder and amount > 0 and ladder.owns(owner, amount):
+                    ladder.learn_gas('approve', gas)
+            else:
+                self.log(f"⚡ Approve из лестницы (nonce {nonce})")
+            txh = self.send_raw(raw)
+            self.nonce_manager.mark_sent(nonce, gas_price_wei, txh)
             self.log(f"✅ Approve tx sent: {txh}")
             return txh
         except Exception as e:
-            self.nonce_manager.release_nonce(False)
+            self.nonce_manager.release(nonce)
             self.log(f"❌ Approve broadcast failed: {e}")
             raise
     
+    def replace_nonce(self, owner: str, pk: str, nonce: int, tx: dict, gas_price_wei: int) -> tuple[str, int]:
+        """Переотправка tx тем же nonce (speed-up/cancel); газ — не ниже +10% к отправленной"""
+        slot = self.nonce_manager.slot(nonce)
+        last_gas = (slot or {}).get('gas_price')
+        if last_gas is None:
+            n, g, _ = self.nonce_manager.get_last_sent_data()
+            last_gas = g if n == nonce else None
+        if last_gas:
+            bumped = int(max(gas_price_wei, int(last_gas * 1.10)))
+        else:
+            # Бампаем до "пола" 0.2 gwei или +0.05 gwei для мягкого bump
+            bumped = int(max(gas_price_wei, to_wei_gwei(0.2), gas_price_wei + to_wei_gwei(0.05)))
+        gas_price = min(bumped, to_wei_gwei(DEFAULT_LIMITS['max_gas_gwei']))
+        tx = {'value': 0, 'data': '0x', 'chainId': BSC_CHAIN_ID, **tx, 'gasPrice': gas_price, 'nonce': nonce}
+        if 'gas' not in tx:
+            tx['gas'] = self.estimate_gas({'from': owner, **tx})
+        signed = Account.from_key(pk).sign_transaction(tx)
+        txh = self.send_raw(signed.rawTransaction)
+        self.nonce_manager.mark_replaced(nonce, gas_price, txh)
+        self.log(f"🔁 Nonce {nonce} переотправлен: {txh} ({from_wei_gwei(gas_price):.3f} gwei)")
+        return txh, gas_price
+
+    def cancel_nonce(self, owner: str, pk: str, nonce: int, gas_price_wei: int) -> tuple[str, int]:
+        """Отмена tx с этим nonce: 0 BNB самому себе с gas-bump"""
+        return self.replace_nonce(owner, pk, nonce, {'to': owner, 'gas': 21000}, gas_price_wei)
+
     def _get_w3(self):
         """Получает Web3 экземпляр для nonce manager"""
-        if self.mode == RpcMode.NODE:
+        if self.mode != RpcMode.PROXY:
             return self.node_w3
         else:
             # Для proxy режима создаем временный Web3
             return Web3()
     
-    def wait_receipt(self, tx_hash: str, timeout: int = 120) -> dict:
-        """Ждет подтверждения транзакции с экономным backoff"""
+    def wait_receipt(self, tx_hash: str, timeout: int = 120, cancel: CancelToken = None) -> dict:
+        """Ждет подтверждения транзакции с экономным backoff (cancel — прервать ожидание)"""
         t0 = time.time()
         backoff = 2.0
+        # ОПТИМИЗАЦИЯ: при работающем HeadTracker — один опрос на новый блок
+        tracker = self.head_tracker if (self.head_tracker and self.head_tracker.is_alive()) else None
+        seen_head = tracker.head if tracker else None
         
         while True:
+            if cancel is not None:
+                cancel.check()
             if time.time() - t0 > timeout:
                 raise TimeoutError(f"Таймаут ожидания подтверждения {tx_hash}")
             try:
                 self.stats['receipt'] = self.stats.get('receipt', 0) + 1   # ✚ считаем каждый опрос
                 if self.mode == RpcMode.NODE:
-                    receipt = self.node_w3.eth.get_transaction_receipt(tx_hash)
+                    receipt = self.node_rpc.eth_getTransactionReceipt(tx_hash)
+                elif self.mode == RpcMode.HYBRID:
+                    # «ещё не в блоке» (None) — нормальный ответ, а не сбой маршрута
+                    receipt = self.routes.run(
+                        'receipt', dataseed=lambda: self._read_rpc().eth_getTransactionReceipt(tx_hash),
+                        node=lambda: self.node_rpc.eth_getTransactionReceipt(tx_hash),
+                        proxy=self.proxy and (lambda: self.proxy.eth_getTransactionReceipt(tx_hash)))
                 else:
                     receipt = self.proxy.eth_getTransactionReceipt(tx_hash)
                 if receipt:
+                    self.nonce_manager.on_receipt(tx_hash)
                     return receipt
             except Exception as e:
                 self.log(f"⏳ Ожидание подтверждения {tx_hash}: {e}")
-            time.sleep(backoff)
+            # с токеном отмены ждём короткими отрезками, чтобы отмена срабатывала быстро
+            step = 1.0 if cancel is not None else 15.0
+            if tracker and tracker.is_alive():
+                head = tracker.wait_for_block(seen_head, timeout=min(step, max(0.1, timeout - (time.time() - t0))))
+                if head is not None:
+                    seen_head = head
+                continue
+            if cancel is not None:
+                cancel.wait(backoff)
+            else:
+                time.sleep(backoff)
             backoff = min(backoff * 1.7, 15.0)  # старт 2с → потолок 15с
     
     def _handle_network_error(self, error: Exception, operation: str) -> bool:
@@ -1110,19 +2757,21 @@ class TradingCore:
     def _rotate_connection(self):
         """Ротирует RPC/Proxy соединения"""
         try:
-            if self.mode == RpcMode.NODE:
-                self.current_rpc_index = (self.current_rpc_index + 1) % len(self.rpc_urls)
-                new_url = self.rpc_urls[self.current_rpc_index]
-                self.log(f"🔄 Ротация READ RPC (индекс {self.current_rpc_index}): {new_url}")
+            if self.mode != RpcMode.PROXY:
                 # ВАЖНО: node_w3 НЕ трогаем — это QuickNode для WRITE
-                # читаем через лёгкий провайдер
-                self.read_w3 = Web3(Web3.HTTPProvider(new_url, request_kwargs={'timeout': 10}))
+                # ОПТИМИЗАЦИЯ: провайдеры не пересоздаём — исключаем текущий лучший, пул выберет следующий
+                if self.endpoints:
+                    cur = self.endpoints.best()
+                    if cur is not None:
+                        self.endpoints.eject(cur)
+                    nxt = self.endpoints.best()
+                    if nxt is not None:
+                        self.read_w3 = nxt.w3
+                        self.log(f"🔄 Ротация READ RPC: {nxt.url}")
             else:
-                self.current_proxy_index = (self.current_proxy_index + 1) % len(self.proxy_api_keys)
-                new_key = self.proxy_api_keys[self.current_proxy_index]
-                self.log(f"🔄 Ротация Proxy ключа (индекс {self.current_proxy_index})")
-                # БЕЗОПАСНОСТЬ: Создаем ProxyClient с base_url и списком ключей
-                self.proxy = ProxyClient(self.proxy_base_url, [new_key])
+                # ОПТИМИЗАЦИЯ: ключи распределяет пул ProxyClient (квоты/здоровье на ключ) — клиент не пересоздаём
+                alive = sum(1 for k in self.proxy.keys if not k.invalid) if self.proxy else 0
+                self.log(f"🔄 Proxy: активных ключей {alive}/{len(self.proxy_api_keys)}")
         except Exception as e:
             self.log(f"❌ Ошибка ротации соединения: {e}")
     
@@ -1135,6 +2784,57 @@ class TradingCore:
             self.log("✅ Восстановлено соединение, выход из offline-режима")
     
     
+    def start_head_tracker(self, poll_s: float | None = None):
+        """
+        Запускает HeadTracker и подписанный на него ReserveTracker.
+        В Proxy-режиме head опрашивается не чаще раза в блок (квота API-ключей).
+        """
+        if self.head_tracker and self.head_tracker.is_alive():
+            return self.head_tracker
+        if poll_s is None:
+            poll_s = HEAD_POLL_PROXY_S if self.mode == RpcMode.PROXY else HEAD_POLL_S
+        self.head_tracker = HeadTracker(self, poll_s=poll_s)
+        self.reserve_tracker = ReserveTracker(self)
+        self.head_tracker.subscribe(self.reserve_tracker.on_head)
+        self.head_tracker.subscribe(self._reconcile_nonce)
+        self.head_tracker.start()
+        return self.head_tracker
+
+    def _reconcile_nonce(self, block: int):
+        """Новый блок — сверка локального nonce с сетью в пуле (поток трекера не блокируем)"""
+        if self.nonce_manager.reconcile_due() and not self.is_offline:
+            self._submit(self.nonce_manager.reconcile, self)
+
+    def stop_head_tracker(self):
+        if self.head_tracker:
+            self.head_tracker.stop()
+            self.head_tracker = None
+        self.reserve_tracker = None
+
+    def stop_endpoints(self):
+        if self.endpoints:
+            self.endpoints.stop_probe()
+
+    def start_async(self):
+        """Асинхронное ядро в собственном потоке цикла событий"""
+        if self.async_core is None:
+            self._async_loop = AsyncLoopThread()
+            self.async_core = AsyncTradingCore(self)
+        return self.async_core
+
+    def submit_async(self, coro):
+        """Запускает корутину в цикле async-ядра → concurrent.futures.Future"""
+        return self._async_loop.submit(coro)
+
+    def stop_async(self):
+        if self.async_core is not None:
+            try:
+                self.submit_async(self.async_core.close()).result(timeout=2)
+            except Exception:
+                pass
+            self._async_loop.stop()
+            self.async_core = None
+
     # (удалено) _encode_swap_data — заменено на encode_swap_exact_tokens_supporting()
     
     def _safe_network_call(self, operation_name: str, func, *args, **kwargs):
@@ -1152,9 +2852,19 @@ class TradingCore:
 
     def safe_sell_now(self, owner: str, pk: str, amount_in_raw: int, min_out_raw: int, 
                      gas_price_wei: int, limits: dict, deadline_min: int = 20) -> str:
-        """Безопасная продажа с политикой повторов (5 попыток, 5 сек пауза)"""
+        """Безопасная продажа с политикой повторов (5 попыток, короткая пауза — tx уже шла во все каналы)"""
         # БЕЗОПАСНОСТЬ: Общий префлайт (газ/лимиты/резервы/балансы/whitelist)
-        self._preflight_checks(owner, amount_in_raw, gas_price_wei, limits, deadline_min)
+        ladder = self.ladder
+        gas_units = (ladder.gas_budget() if ladder and ladder.ready(owner, amount_in_raw, gas_price_wei, min_out_raw)
+                     else None)
+        self._preflight_checks(owner, amount_in_raw, gas_price_wei, limits, deadline_min, gas_units=gas_units)
+
+        # ОПТИМИЗАЦИЯ: конвейер — все tx продажи подряд идущими nonce и одно ожидание
+        if self.pipelined:
+            txh = self._safe_sell_pipelined(owner, pk, amount_in_raw, min_out_raw, gas_price_wei, deadline_min)
+            if txh:
+                return txh
+            self.log("↩ Конвейер разослан не целиком — продолжаю по шагам")
             
         # 1) approve ровно на сумму (как у вас уже есть)
         self._safe_approve_exact(owner, pk, amount_in_raw, gas_price_wei)
@@ -1163,16 +2873,16 @@ class TradingCore:
         last_error = None
         while attempts < 5:
             attempts += 1
+            nonce = None
             try:
                 # 2) отправляем swap (если tx-hash вернулся — считаем, что ушла)
                 deadline_ts = int(time.time()) + deadline_min * 60
-                nonce = self.nonce_manager.reserve_nonce(self.nonce_manager.get_nonce(self, owner))
+                nonce = self.nonce_manager.reserve(self, owner)
                 txh = self._send_swap_tx(owner, pk, amount_in_raw, min_out_raw, deadline_ts, gas_price_wei, nonce)
                 self.log(f"✅ Swap tx sent (attempt {attempts}/5): {txh}")
 
-                # ЗАПИСАТЬ и ОСВОБОДИТЬ nonce (успешная отправка)
-                self.nonce_manager.record_sent_tx(nonce, gas_price_wei, txh)
-                self.nonce_manager.release_nonce(success=True)
+                # nonce занят отправленной tx
+                self.nonce_manager.mark_sent(nonce, gas_price_wei, txh)
 
                 # 3) ждём квитанцию (ВАЖНО: без gas-бампа)
                 try:
@@ -1193,15 +2903,16 @@ class TradingCore:
                     break
 
             except Exception as e:
-                # Ошибка отправки — tx НЕ ушла → можно повторить через 5 сек
+                # Ошибка отправки — tx НЕ ушла ни в один канал → можно повторить
                 last_error = e
                 self.log(f"❌ Broadcast failed (attempt {attempts}/5): {e}")
-                # На всякий случай убедимся, что nonce не зарезервирован
-                if hasattr(self, "nonce_manager") and self.nonce_manager.has_pending():
-                    self.nonce_manager.release_nonce(success=False)
+                # На всякий случай убедимся, что nonce не остался зарезервирован
+                if nonce is not None:
+                    self.nonce_manager.release(nonce)
                 if attempts < 5:
-                    self.log(f"🔁 Повтор отправки через 5 сек... (попытка {attempts}/5)")
-                    time.sleep(5)
+                    # ОПТИМИЗАЦИЯ: отказ одного эндпоинта уже перекрыт fan-out'ом — долгая пауза не нужна
+                    self.log(f"🔁 Повтор отправки через 1 сек... (попытка {attempts}/5)")
+                    time.sleep(1)
                     continue
                 else:
                     break
@@ -1220,6 +2931,113 @@ class TradingCore:
 
         raise RuntimeError(f"Sell loop failed after {attempts} attempts: {last_error}")
     
+    def _safe_sell_pipelined(self, owner: str, pk: str, amount_in_raw: int, min_out_raw: int,
+                             gas_price_wei: int, deadline_min: int = 20) -> str | None:
+        """
+        revoke(0) → approve(amount) → swap подписываются подряд идущими nonce и рассылаются
+        друг за другом без ожидания квитанций — попадают в один/соседние блоки.
+        None — swap не ушёл (отправленное уже подтверждено, продолжаем по шагам).
+        """
+        allowance = eth_call_allowance(self._client_call, PLEX, owner, PANCAKE_V2_ROUTER)
+        legs = []
+        if allowance != amount_in_raw:
+            if allowance > 0:
+                legs.append(('revoke', 0))
+            legs.append(('approve', amount_in_raw))
+        legs.append(('swap', amount_in_raw))
+
+        nonces = []
+        try:
+            for _ in legs:
+                nonces.append(self.nonce_manager.reserve(self, owner))
+        except Exception:
+            for n in nonces:
+                self.nonce_manager.release(n)
+            raise
+        nonces.sort()
+
+        # 1) подписываем всё заранее (ступени лестницы, если совпали nonce/газ/цена)
+        acct = Account.from_key(pk)
+        ladder = self.ladder
+        deadline_ts = int(time.time()) + deadline_min * 60
+        raws = []
+        try:
+            for (kind, amount), nonce in zip(legs, nonces):
+                raw = None
+                if ladder and kind == 'swap':
+                    raw = ladder.take_swap(owner, amount, nonce, gas_price_wei, min_out_raw)
+                elif ladder and kind == 'approve':
+                    raw = ladder.take_approve(owner, amount, nonce, gas_price_wei)
+                if raw is None:
+                    if kind == 'swap':
+                        tx = {'to': PANCAKE_V2_ROUTER,
+                              'data': encode_swap_exact_tokens_supporting(amount, min_out_raw, [PLEX, USDT],
+                                                                          owner, deadline_ts)}
+                    else:
+                        tx = {'to': PLEX, 'data': encode_approve(PANCAKE_V2_ROUTER, amount)}
+                    tx.update(value=0, chainId=BSC_CHAIN_ID, gasPrice=gas_price_wei, nonce=nonce)
+                    if kind != 'swap':
+                        tx['gas'] = self.estimate_gas({'from': owner, **tx}, default=50000)
+                    elif len(legs) == 1:
+                        tx['gas'] = self._swap_gas_hint = self.estimate_gas({'from': owner, **tx})
+                    else:
+                        # до approve оценка swap ревертится — берём последнюю реальную оценку
+                        tx['gas'] = self._swap_gas_hint or 300000
+                    raw = acct.sign_transaction(tx).rawTransaction
+                raws.append(raw)
+        except Exception:
+            for n in nonces:
+                self.nonce_manager.release(n)
+            raise
+
+        # 2) рассылка подряд, в порядке nonce
+        sent = []
+        for i, ((kind, amount), nonce, raw) in enumerate(zip(legs, nonces, raws)):
+            try:
+                txh = self.send_raw(raw)
+            except Exception as e:
+                self.log(f"❌ Конвейер: {kind} (nonce {nonce}) не разослан: {e}")
+                for n in nonces[i:]:
+                    self.nonce_manager.release(n)
+                break
+            self.nonce_manager.mark_sent(nonce, gas_price_wei, txh)
+            sent.append((kind, nonce, txh))
+            if kind == 'swap' and ladder and ladder.owns(owner, amount):
+                ladder.note_swap_sent(nonce)
+        self.log("🚚 Конвейер: " + ", ".join(f"{k}#{n} {h}" for k, n, h in sent))
+
+        if not sent or sent[-1][0] != 'swap':
+            # swap не ушёл: дожидаемся отправленного, дальше — обычный путь (allowance перечитается)
+            for kind, nonce, txh in sent:
+                self.wait_receipt(txh, timeout=60)
+            return None
+
+        # 3) одно ожидание: квитанция swap означает, что младшие nonce уже в блоках
+        swap_txh = sent[-1][2]
+        try:
+            receipt = self.wait_receipt(swap_txh, timeout=deadline_min * 60)
+        except TimeoutError as te:
+            # Повтор НЕ отправляем — nonce заняты. Уведомляем.
+            self.log(f"⏳ Конвейер: нет квитанции swap: {te}")
+            raise RuntimeError(f"Sell pipeline failed: {te}")
+        for kind, nonce, txh in sent[:-1]:
+            if not receipt_ok(self.wait_receipt(txh, timeout=60)):
+                self.log(f"⚠️ Конвейер: {kind} (nonce {nonce}) завершился revert: {txh}")
+        if not receipt_ok(receipt):
+            self.log(f"❌ Конвейер: swap revert: {swap_txh}")
+            try:
+                self._safe_revoke(owner, pk, gas_price_wei)
+            except Exception as rev_e:
+                self.log(f"⚠ Revoke after failures failed: {rev_e}")
+            raise RuntimeError(f"Sell pipeline failed: swap reverted ({swap_txh})")
+        self.log(f"✅ Swap confirmed (конвейер, tx: {len(sent)})")
+
+        # ✚ записываем факт продажи в лимиты (PLEX = 9 decimals)
+        self.limits_manager.record_sale(float(Decimal(amount_in_raw) / Decimal(10**9)))
+        # revoke(0) после успеха (как и было) — обычно allowance уже израсходован swap'ом
+        self._safe_revoke(owner, pk, gas_price_wei)
+        return swap_txh
+
     def _safe_approve_exact(self, owner: str, pk: str, amount_in_raw: int, gas_price_wei: int) -> str:
         """Алиас для safe_approve"""
         return self.safe_approve(owner, pk, amount_in_raw, gas_price_wei)
@@ -1228,60 +3046,71 @@ class TradingCore:
         """Алиас для safe_revoke"""
         return self.safe_revoke(owner, pk, gas_price_wei)
     
-    def _preflight_checks(self, owner: str, amount_in_raw: int, gas_price_wei: int, limits: dict, deadline_min: int = 20):
-        """Preflight проверки перед продажей"""
+    def _preflight_checks(self, owner: str, amount_in_raw: int, gas_price_wei: int, limits: dict, deadline_min: int = 20,
+                          gas_units: int = None):
+        """Preflight проверки перед продажей (gas_units — известный лимит газа продажи, без оценок)"""
         # БЕЗОПАСНОСТЬ: Вычисляем deadline_ts локально
         deadline_ts = int(time.time()) + deadline_min * 60
         
+        if self.is_offline:
+            raise Exception(f"{ErrorCode.NETWORK}: Offline режим, нет соединения")
+        # ОПТИМИЗАЦИЯ: баланс/allowance/BNB/резервы/токены пары — одним Multicall3
+        st = self._safe_network_call("read_trade_state", self.read_trade_state, owner)
+
         # 1. Проверка баланса PLEX
-        balance_plex = eth_call_balance_of(self._client_call, PLEX, owner)
+        balance_plex = st['balance_plex']
         if balance_plex < amount_in_raw:
             raise Exception(f"{ErrorCode.LIMIT}: Недостаточно PLEX: {balance_plex} < {amount_in_raw}")
         
         # 2. Проверка баланса BNB для газа
-        balance_bnb = self.get_bnb_balance(owner)
+        balance_bnb = st['bnb_balance']
         
         # БЕЗОПАСНОСТЬ: Точная оценка бюджета газа
         try:
             # Оцениваем газ для возможных операций: revoke(0) + approve(amount) + swap
             gas_estimate = 0
+            current_allowance = st['allowance']
+            if gas_units is not None:
+                # ОПТИМИЗАЦИЯ: ступени лестницы уже подписаны с известными лимитами — без estimateGas
+                gas_estimate = gas_units
+                if current_allowance > 0 and current_allowance != amount_in_raw:
+                    gas_estimate += 50000   # revoke
+            else:
+                # Проверяем, нужен ли revoke
+                if current_allowance > 0 and current_allowance != amount_in_raw:
+                    # Оцениваем газ для revoke
+                    revoke_tx = {
+                        'to': PLEX,
+                        'data': encode_approve(PANCAKE_V2_ROUTER, 0),
+                        'from': owner
+                    }
+                    try:
+                        gas_estimate += self.estimate_gas(revoke_tx)
+                    except:
+                        gas_estimate += 50000  # Fallback для revoke
             
-            # Проверяем, нужен ли revoke
-            current_allowance = eth_call_allowance(self._client_call, PLEX, owner, PANCAKE_V2_ROUTER)
-            if current_allowance > 0 and current_allowance != amount_in_raw:
-                # Оцениваем газ для revoke
-                revoke_tx = {
+                # Оцениваем газ для approve
+                approve_tx = {
                     'to': PLEX,
-                    'data': encode_approve(PANCAKE_V2_ROUTER, 0),
+                    'data': encode_approve(PANCAKE_V2_ROUTER, amount_in_raw),
                     'from': owner
                 }
                 try:
-                    gas_estimate += self.estimate_gas(revoke_tx)
+                    gas_estimate += self.estimate_gas(approve_tx)
                 except:
-                    gas_estimate += 50000  # Fallback для revoke
+                    gas_estimate += 50000  # Fallback для approve
             
-            # Оцениваем газ для approve
-            approve_tx = {
-                'to': PLEX,
-                'data': encode_approve(PANCAKE_V2_ROUTER, amount_in_raw),
-                'from': owner
-            }
-            try:
-                gas_estimate += self.estimate_gas(approve_tx)
-            except:
-                gas_estimate += 50000  # Fallback для approve
-            
-            # Оцениваем газ для swap
-            swap_tx = {
-                'to': PANCAKE_V2_ROUTER,
-                # используем готовый оффлайн-энкодер, как в реальном свопе
-                'data': encode_swap_exact_tokens_supporting(amount_in_raw, 0, [PLEX, USDT], owner, deadline_ts),
-                'from': owner
-            }
-            try:
-                gas_estimate += self.estimate_gas(swap_tx)
-            except:
-                gas_estimate += 200000  # Fallback для swap
+                # Оцениваем газ для swap
+                swap_tx = {
+                    'to': PANCAKE_V2_ROUTER,
+                    # используем готовый оффлайн-энкодер, как в реальном свопе
+                    'data': encode_swap_exact_tokens_supporting(amount_in_raw, 0, [PLEX, USDT], owner, deadline_ts),
+                    'from': owner
+                }
+                try:
+                    gas_estimate += self.estimate_gas(swap_tx)
+                except:
+                    gas_estimate += 200000  # Fallback для swap
             
             # Добавляем 20% буфер
             gas_estimate = int(gas_estimate * 1.2)
@@ -1305,7 +3134,7 @@ class TradingCore:
                 raise Exception(f"{ErrorCode.GAS}: Недостаточно BNB для газа: {from_units(balance_bnb, 18)} < {from_units(estimated_gas_cost, 18)}")
         
         # 3. Проверка резервов пула
-        price, r_plex, r_usdt, _ = self.get_price_and_reserves()
+        r_plex, r_usdt = st['r_plex'], st['r_usdt']
         if r_plex == 0 or r_usdt == 0:
             raise Exception(f"{ErrorCode.SAFETY}: Пустые резервы пула")
         
@@ -1321,7 +3150,7 @@ class TradingCore:
             raise Exception(f"{ErrorCode.LIMIT}: {reason}")
         
         # 5. Проверка whitelist адресов (без привязки к порядку)
-        t0, t1 = eth_call_pair_tokens(self._client_call, PAIR_ADDRESS)
+        t0, t1 = st['token0'], st['token1']
         pair_tokens = {t0.lower(), t1.lower()}
         expected_tokens = {SAFETY_WHITELIST['PLEX'], SAFETY_WHITELIST['USDT']}
         if pair_tokens != expected_tokens:
@@ -1332,23 +3161,154 @@ class TradingCore:
     def _send_swap_tx(self, owner: str, pk: str, amount_in_raw: int, min_out_raw: int, 
                      deadline_ts: int, gas_price_wei: int, nonce: int) -> str:
         """Отправка swap транзакции"""
-        path = [PLEX, USDT]
-        data = encode_swap_exact_tokens_supporting(amount_in_raw, min_out_raw, path, owner, deadline_ts)
-        tx = {
-            'to': PANCAKE_V2_ROUTER,
-            'value': 0,
-            'data': data,
-            'chainId': BSC_CHAIN_ID,
-            'gasPrice': gas_price_wei,
-            'nonce': nonce
-        }
-        gas = self.estimate_gas({'from': owner, **tx})
-        tx['gas'] = gas
-        signed = Account.from_key(pk).sign_transaction(tx)
-        txh = self.send_raw(signed.rawTransaction)
+        # ОПТИМИЗАЦИЯ: подписанная заранее ступень лестницы — сразу в рассылку
+        ladder = self.ladder
+        raw = ladder.take_swap(owner, amount_in_raw, nonce, gas_price_wei, min_out_raw) if ladder else None
+        if raw is None:
+            path = [PLEX, USDT]
+            data = encode_swap_exact_tokens_supporting(amount_in_raw, min_out_raw, path, owner, deadline_ts)
+            tx = {
+                'to': PANCAKE_V2_ROUTER,
+                'value': 0,
+                'data': data,
+                'chainId': BSC_CHAIN_ID,
+                'gasPrice': gas_price_wei,
+                'nonce': nonce
+            }
+            gas = self.estimate_gas({'from': owner, **tx})
+            tx['gas'] = gas
+            raw = Account.from_key(pk).sign_transaction(tx).rawTransaction
+            self._swap_gas_hint = gas
+            if ladder and ladder.owns(owner, amount_in_raw):
+                ladder.learn_gas('swap', gas)
+        else:
+            self.stats['ladder'] = self.stats.get('ladder', 0) + 1
+            self.log(f"⚡ Swap из лестницы (nonce {nonce})")
+        txh = self.send_raw(raw)
+        if ladder and ladder.owns(owner, amount_in_raw):
+            ladder.note_swap_sent(nonce)
         self.log(f"✅ Swap tx sent: {txh}")
         return txh
 
+# -----------------------------
+# Бенчмарки (CLI: --bench-rpc, --bench-codec)
+# -----------------------------
+
+def _codec_reference():
+    """Прежние реализации через web3/eth_abi — эталон для сверки и точка «до» для бенчмарка"""
+    from eth_abi import decode as abi_decode
+    w3, _, router = build_contract_encoder()
+    return {
+        'encode_approve': lambda spender, amount: w3.eth.contract(abi=ERC20_ABI).encodeABI(
+            fn_name='approve', args=[spender, amount]),
+        'encode_swap_exact_tokens_supporting': lambda a, m, path, to, dl: w3.eth.contract(abi=ROUTER_ABI).encodeABI(
+            fn_name='swapExactTokensForTokensSupportingFeeOnTransferTokens', args=[a, m, path, to, dl]),
+        'calldata_get_amounts_out': lambda a, path: router.encodeABI(fn_name='getAmountsOut', args=[a, path]),
+        'calldata_allowance': lambda o, sp: SEL_ALLOWANCE + pad32_hex(o.lower().replace('0x', ''))
+                                            + pad32_hex(sp.lower().replace('0x', '')),
+        'decode_address': lambda out: Web3.to_checksum_address('0x' + out[-40:]),
+        'decode_reserves': lambda out: tuple(abi_decode(['uint112', 'uint112', 'uint32'], bytes.fromhex(out[2:]))[:2]),
+        'decode_amounts_out': lambda out: int(abi_decode(['uint256[]'], bytes.fromhex(out[2:]))[0][-1]),
+    }
+
+
+def _codec_vectors() -> dict:
+    from eth_abi import encode as abi_encode
+    owner = '0x1111111111111111111111111111111111111111'
+    path2, path3 = [PLEX, USDT], [PLEX, '0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c', USDT]   # через WBNB
+    return {
+        'encode_approve': [(PANCAKE_V2_ROUTER, 0), (PANCAKE_V2_ROUTER, 123 * 10**9), (owner, _UINT256_MAX)],
+        'encode_swap_exact_tokens_supporting': [(10**9, 0, path2, owner, 1_700_000_000),
+                                                (_UINT256_MAX, 1, path3, PANCAKE_V2_ROUTER, 2**40)],
+        'calldata_get_amounts_out': [(10**9, path2), (1, path3)],
+        'calldata_allowance': [(owner, PANCAKE_V2_ROUTER), (owner.upper().replace('0X', '0x'), PLEX)],
+        'decode_address': [('0x' + abi_encode(['address'], [PLEX]).hex(),), ('0x' + abi_encode(['address'], [USDT]).hex(),)],
+        'decode_reserves': [('0x' + abi_encode(['uint112', 'uint112', 'uint32'], [10**13, 5 * 10**20, 7]).hex(),)],
+        'decode_amounts_out': [('0x' + abi_encode(['uint256[]'], [[10**9, 49 * 10**15]]).hex(),),
+                               ('0x' + abi_encode(['uint256[]'], [[1, 2, 3]]).hex(),)],
+    }
+
+
+def codec_self_check() -> dict:
+    """Сверка предвычисленного кодека с web3/eth_abi на наборе векторов"""
+    ref = _codec_reference()
+    fast = globals()
+    mismatch, checked = [], 0
+    for name, cases in _codec_vectors().items():
+        for args in cases:
+            checked += 1
+            want, got = ref[name](*args), fast[name](*args)
+            if want != got:
+                mismatch.append(f"{name}{args!r}: {got!r} != {want!r}")
+    return {'ok': not mismatch, 'checked': checked, 'mismatch': mismatch}
+
+
+def bench_codec(n: int = 20000) -> dict:
+    """мкс/вызов: прежняя реализация (web3 contract/eth_abi/keccak) против предвычисленного кодека"""
+    ref = _codec_reference()
+    fast = globals()
+    out = {}
+    for name, cases in _codec_vectors().items():
+        args = cases[0]
+        row = {}
+        for label, fn in (('before', ref[name]), ('after', fast[name])):
+            reps = max(1, n // 50) if label == 'before' and name.startswith('encode') else n
+            t0 = time.perf_counter()
+            for _ in range(reps):
+                fn(*args)
+            row[label + '_us'] = (time.perf_counter() - t0) / reps * 1e6
+        out[name] = row
+    return out
+
+class _CannedRpcAdapter(HTTPAdapter):
+    """Транспорт без сети: отвечает готовым result с тем же id — меряем только накладные клиента"""
+    def __init__(self, result: str):
+        super().__init__()
+        self.result = result
+
+    def send(self, request, **kwargs):
+        body = json.loads(request.body)
+        r = requests.Response()
+        r.status_code = 200
+        r._content = json.dumps({'jsonrpc': '2.0', 'id': body['id'], 'result': self.result}).encode()
+        r.headers['Content-Type'] = 'application/json'
+        r.url = request.url
+        r.request = request
+        return r
+
+
+def bench_rpc(url: str | None = None, n: int = 200) -> dict:
+    """
+    eth_call getReserves(): web3 (middleware + форматтеры + .hex()) против RawRpcClient.
+    url='offline' — без сети (только накладные клиента); иначе реальный узел, по умолчанию dataseed.
+    Клиенты чередуются на общей keep-alive Session, чтобы сеть влияла на оба одинаково.
+    """
+    session = make_http_session()
+    if url == 'offline':
+        url = 'http://bench.invalid'
+        session.mount('http://', _CannedRpcAdapter('0x' + '00' * 95 + '01'))
+    url = url or 'https://bsc-dataseed1.binance.org'
+    w3 = Web3(PooledHTTPProvider(url, session))
+    raw = RawRpcClient(url, session)
+    paths = {
+        'web3': lambda: w3.eth.call({'to': PAIR_ADDRESS, 'data': SEL_GETRESERVES}, 'latest').hex(),
+        'raw': lambda: raw.eth_call(PAIR_ADDRESS, SEL_GETRESERVES),
+    }
+    for fn in paths.values():
+        fn()   # прогрев соединения
+    samples = {name: [] for name in paths}
+    for i in range(n):
+        for name in (('web3', 'raw') if i % 2 == 0 else ('raw', 'web3')):
+            t0 = time.perf_counter()
+            paths[name]()
+            samples[name].append(time.perf_counter() - t0)
+    out = {'url': url, 'n': n, 'json': 'orjson' if orjson is not None else 'json'}
+    for name, xs in samples.items():
+        xs.sort()
+        out[name] = {'p50_ms': xs[len(xs) // 2] * 1000.0, 'p95_ms': xs[int(len(xs) * 0.95)] * 1000.0,
+                     'mean_ms': sum(xs) / len(xs) * 1000.0}
+    return out
+
 # -----------------------------
 # UI (PyQt5)
 # -----------------------------
@@ -1383,56 +3343,922 @@ QLabel[chip="true"][level="err"]  { background: #3d1414; border-color:#d33;    c
 QLabel[chip="true"][level="muted"]{ background: #1a1f2b; border-color:#2a3242; color:#9aa4b2; }
 """
 
+# ===== ОПТИМИЗАЦИЯ: Инкрементальный precheck =====
+class PrecheckModel:
+    """
+    Precheck как граф зависимостей: сетевые данные (chain) кэшируются,
+    каждый узел пересчитывается только при изменении своих входов.
+    Слиппедж/газ/дедлайн/количество меняют результат без RPC.
+    """
+    INPUTS = ('amount', 'slippage', 'gas_price', 'deadline', 'limits')
+    # узел -> зависимости (входы/узлы), в топологическом порядке
+    GRAPH = (
+        ('quote',        ('chain', 'amount')),
+        ('balance_plex', ('chain', 'amount')),
+        ('allowance',    ('chain', 'amount')),
+        ('min_out',      ('quote', 'slippage')),
+        ('reserves',     ('chain', 'amount', 'quote')),
+        ('impact',       ('chain', 'amount', 'quote')),
+        ('bnb_gas',      ('chain', 'amount', 'gas_price')),
+        ('limits',       ('amount', 'limits')),
+        ('pair_ok',      ('chain',)),
+    )
+    VOLATILE = ('limits',)   # зависят от локального состояния (LimitsManager) — всегда пересчёт
+
+    def __init__(self, core, max_age_s: float = 30.0):
+        self.core = core
+        self.max_age_s = max_age_s
+        self.owner = None
+        self.inputs = {}
+        self.chain = None
+        self.values = {}
+        self.last_recomputed = ()
+
+    def chain_stale(self) -> bool:
+        return self.chain is None or time.time() - self.chain['ts'] > self.max_age_s
+
+    def needs_network(self, owner: str, refresh: bool = False) -> bool:
+        return refresh or owner != self.owner or self.chain_stale()
+
+    def update(self, owner: str, refresh: bool = False, **inputs) -> dict:
+        """Применяет изменившиеся входы; сеть — только при refresh/смене кошелька/устаревании"""
+        changed = {k for k, v in inputs.items() if k not in self.inputs or self.inputs[k] != v}
+        self.inputs.update(inputs)
+        if self.needs_network(owner, refresh):
+            try:
+                self.chain = self.core.fetch_precheck_chain(owner, self.inputs['amount'], self.inputs['deadline'])
+                self.owner = owner
+            except Exception as e:
+                self.chain, self.values = None, {}
+                return self._failed(str(e))
+            changed.add('chain')
+        dirty = set(changed)
+        done = []
+        for node, deps in self.GRAPH:
+            if node not in self.values or node in self.VOLATILE or dirty.intersection(deps):
+                self.values[node] = getattr(self, '_n_' + node)()
+                dirty.add(node)
+                done.append(node)
+        self.last_recomputed = tuple(done)
+        return self.summary()
+
+    def summary(self) -> dict:
+        s = {"network": {"ok": True, "msg": "OK"}}
+        for node, _ in self.GRAPH:
+            if node != 'quote':
+                s[node] = dict(self.values[node])
+        s["timings"] = dict(self.chain['timings'])
+        s["recomputed"] = self.last_recomputed
+        return s
+
+    def _failed(self, msg: str) -> dict:
+        amount = self.inputs.get('amount', 0)
+        return {
+            "network": {"ok": False, "msg": msg},
+            "balance_plex": {"ok": False, "have": 0, "need": amount, "msg": ""},
+            "allowance": {"ok": False, "have": 0, "need": amount, "msg": ""},
+            "bnb_gas": {"ok": False, "have": 0, "need": 0, "est_units": 0, "msg": ""},
+            "min_out": {"ok": False, "expected": 0, "min_out": 0, "msg": ""},
+            "limits": {"ok": True, "msg": "OK"},
+            "pair_ok": {"ok": True, "msg": "OK"},
+            "impact": {"ok": True, "pct": 0.0, "msg": "OK"},
+            "reserves": {"ok": True, "plex": 0.0, "usdt": 0.0, "msg": "OK"},
+            "timings": {},
+            "recomputed": (),
+        }
+
+    # ---- узлы графа (чистые функции от chain + inputs) ----
+    def _n_quote(self) -> int:
+        st, amt = self.chain['state'], self.inputs['amount']
+        if amt <= 0:
+            return 0
+        if amt == self.chain['amount_in_raw'] and st['amounts_out'] is not None:
+            return st['amounts_out']
+        if amt == self.chain['amount_in_raw']:
+            self.core.log("⚠️ getAmountsOut недоступен, используем резервы")
+        # ОПТИМИЗАЦИЯ: та же формула роутера по кэшированным резервам — без RPC
+        return uni_v2_amount_out(amt, st['r_plex'], st['r_usdt'], 25)
+
+    def _n_balance_plex(self) -> dict:
+        have, need = self.chain['state']['balance_plex'], self.inputs['amount']
+        ok = have >= need
+        return {"ok": ok, "have": have, "need": need, "msg": "OK" if ok else "Недостаточно PLEX"}
+
+    def _n_allowance(self) -> dict:
+        have, need = self.chain['state']['allowance'], self.inputs['amount']
+        ok = have >= need
+        return {"ok": ok, "have": have, "need": need, "msg": "OK" if ok else "Потребуется approve"}
+
+    def _n_min_out(self) -> dict:
+        expected_out = self.values['quote']
+        safety = DEFAULT_LIMITS['safety_slippage_bonus'] / 100.0
+        user = max(0.0, float(self.inputs['slippage'])) / 100.0
+        min_out = max(int(expected_out * (1 - user - safety)), 1) if expected_out > 0 else 0
+        ok = expected_out > 0 and min_out > 0
+        return {"ok": ok, "expected": expected_out, "min_out": min_out,
+                "msg": "OK" if ok else "Нет ликвидности/резервов"}
+
+    def _n_reserves(self) -> dict:
+        # Динамические минимумы резервов
+        st = self.chain['state']
+        plex_res = float(from_units(st['r_plex'], 9))
+        usdt_res = float(from_units(st['r_usdt'], 18))
+        amt_in_plex = float(from_units(self.inputs['amount'], 9))
+        exp_out_usdt = float(from_units(self.values['quote'], 18))
+        mult = float(DEFAULT_LIMITS['reserve_value_multiplier'])
+        min_plex_dyn = max(float(DEFAULT_LIMITS['min_pool_reserve_plex_abs']), amt_in_plex * mult)
+        min_usdt_dyn = max(float(DEFAULT_LIMITS['min_pool_reserve_usdt_abs']), exp_out_usdt * mult)
+        ok = (plex_res >= min_plex_dyn) and (usdt_res >= min_usdt_dyn)
+        return {"ok": ok, "plex": plex_res, "usdt": usdt_res,
+                "min_plex": min_plex_dyn, "min_usdt": min_usdt_dyn,
+                "msg": "OK" if ok else "Резервы ниже минимума"}
+
+    def _n_impact(self) -> dict:
+        # линейный теоретический выход без слиппеджа
+        st, amt, expected_out = self.chain['state'], self.inputs['amount'], self.values['quote']
+        theo_out = 0
+        if amt > 0 and st['r_plex'] > 0:
+            theo_out = int((amt * st['r_usdt']) // st['r_plex'])
+        pct = 0.0
+        if theo_out > 0 and expected_out > 0:
+            pct = max(0.0, 100.0 * (1.0 - (expected_out / theo_out)))
+        ok = pct <= float(DEFAULT_LIMITS['max_price_impact_pct'])
+        return {"ok": ok, "pct": pct,
+                "msg": "OK" if ok else f"Impact {pct:.2f}% > {DEFAULT_LIMITS['max_price_impact_pct']}%"}
+
+    def _n_bnb_gas(self) -> dict:
+        # Gas budget (approve + swap, с буфером 20%)
+        st, amt = self.chain['state'], self.inputs['amount']
+        units = self.chain['gas_swap']
+        if st['allowance'] < amt:
+            approve = self.chain['gas_approve']
+            units += approve if approve is not None else 50000
+        units = int(units * 1.2)
+        need = units * max(self.inputs['gas_price'], to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei']))
+        have = st['bnb_balance']
+        ok = have >= need
+        return {"ok": ok, "have": have, "need": need, "est_units": units,
+                "msg": "OK" if ok else "Недостаточно BNB на газ"}
+
+    def _n_limits(self) -> dict:
+        limits = self.inputs.get('limits') or {}
+        can_sell, reason = self.core.limits_manager.can_sell(
+            amount_plex=float(self.inputs['amount']) / (10 ** 9),
+            max_per_tx=limits.get('max_per_tx_plex', DEFAULT_LIMITS['max_per_tx_plex']),
+            max_daily=limits.get('max_daily_plex', DEFAULT_LIMITS['max_daily_plex']),
+            max_hourly=limits.get('max_sales_per_hour', DEFAULT_LIMITS['max_sales_per_hour'])
+        )
+        return {"ok": bool(can_sell), "msg": "OK" if can_sell else reason}
+
+    def _n_pair_ok(self) -> dict:
+        # Whitelist пары
+        st = self.chain['state']
+        pair_tokens = {st['token0'].lower(), st['token1'].lower()}
+        good = pair_tokens == {SAFETY_WHITELIST['PLEX'], SAFETY_WHITELIST['USDT']}
+        return {"ok": good, "msg": "OK" if good else "Неожиданные токены в паре"}
+
+
+# ===== ОПТИМИЗАЦИЯ: Единый трекер head-блока =====
+HEAD_POLL_S = 1.0           # опрос head в Node/Hybrid, сек
+HEAD_POLL_PROXY_S = 3.0     # в Proxy — не чаще блока BSC: каждый опрос тратит квоту ключа
+
+
+class HeadTracker(threading.Thread):
+    """
+    Один дешёвый eth_blockNumber на интервал; подписчики получают fn(block)
+    ровно один раз на каждый новый head (из потока трекера).
+    Все запросы трекера и подписчиков идут с PRIO_BACKGROUND: в Proxy они
+    не отнимают квоту у сделки и сбрасываются первыми.
+    """
+    def __init__(self, core, poll_s: float = HEAD_POLL_S):
+        super().__init__(name='HeadTracker', daemon=True)
+        self.core = core
+        self.poll_s = poll_s
+        self.head = None
+        self._cond = threading.Condition()
+        self._stop_evt = threading.Event()
+        self._listeners = []
+
+    def subscribe(self, fn):
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn):
+        try:
+            self._listeners.remove(fn)
+        except ValueError:
+            pass
+
+    def wait_for_block(self, after, timeout: float):
+        """Ждёт head > after (None — любой известный); возвращает head или None по таймауту"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while not self._stop_evt.is_set():
+                if self.head is not None and (after is None or self.head > after):
+                    return self.head
+                left = deadline - time.time()
+                if left <= 0:
+                    return None
+                self._cond.wait(left)
+        return None
+
+    def stop(self):
+        self._stop_evt.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _publish(self, block: int):
+        with self._cond:
+            if self.head is not None and block <= self.head:
+                return
+            self.head = block
+            self._cond.notify_all()
+        for fn in list(self._listeners):
+            try:
+                fn(block)
+            except Exception as e:
+                self.core.log(f"⚠ HeadTracker listener: {e}")
+
+    def run(self):
+        with request_priority(PRIO_BACKGROUND):
+            self._run()
+
+    def _run(self):
+        while not self._stop_evt.is_set():
+            try:
+                if not self.core.is_offline:
+                    self._publish(self.core.get_block_number())
+            except RequestShed:
+                pass    # квота занята сделкой — следующий опрос по расписанию
+            except Exception as e:
+                self.core.log(f"⚠ HeadTracker: {e}")
+                self._stop_evt.wait(max(self.poll_s, 5))
+                continue
+            self._stop_evt.wait(self.poll_s)
+
+
+# ===== ОПТИМИЗАЦИЯ: Резервы пары по Sync-событиям =====
+class ReserveTracker:
+    """
+    Держит (r_plex, r_usdt) актуальными поблочно: на каждый новый head —
+    eth_getLogs по Sync на PAIR_ADDRESS. getReserves только при старте/разрыве.
+    """
+    MAX_RANGE = 500     # больше — ресинк через getReserves, а не длинный getLogs
+
+    def __init__(self, core, max_age_s: float = 10.0):
+        self.core = core
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._snap = None           # (r_plex, r_usdt, block)
+        self._cursor = None         # последний обработанный блок
+        self._ok_ts = 0.0           # время последнего успешного шага
+        self._listeners = []
+
+    def subscribe(self, fn):
+        """fn(r_plex, r_usdt, block) — вызывается из потока HeadTracker при изменении резервов"""
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn):
+        try:
+            self._listeners.remove(fn)
+        except ValueError:
+            pass
+
+    def snapshot(self):
+        """(r_plex, r_usdt, block) или None, если трекер отстал/не инициализирован"""
+        with self._lock:
+            if self._snap is None or time.time() - self._ok_ts > self.max_age_s:
+                return None
+            return self._snap
+
+    def _is_plex_token0(self) -> bool:
+        v = self.core._cache_get('is_plex_token0')
+        if v is None:
+            t0, _ = eth_call_pair_tokens(self.core._client_call, PAIR_ADDRESS)
+            v = (t0.lower() == PLEX.lower())
+            self.core._cache_set('is_plex_token0', v)
+        return v
+
+    def _publish(self, r0: int, r1: int, block: int, fresh: bool = True):
+        r_plex, r_usdt = (r0, r1) if self._is_plex_token0() else (r1, r0)
+        with self._lock:
+            changed = self._snap is None or self._snap[:2] != (r_plex, r_usdt)
+            self._snap = (r_plex, r_usdt, block)
+            self._ok_ts = time.time()
+        self.core._cache_set('reserves', (r_plex, r_usdt), block if fresh else None)
+        if changed:
+            for fn in list(self._listeners):
+                try:
+                    fn(r_plex, r_usdt, block)
+                except Exception:
+                    pass
+
+    def _resync(self, head: int):
+        mark = self.core._read_mark()
+        r0, r1 = eth_call_pair_reserves(self.core._client_call, PAIR_ADDRESS)
+        # в кэш по блоку — только если чтение действительно на head
+        self._publish(r0, r1, head, fresh=mark[0] == head and self.core._read_block(mark) is not None)
+        self._cursor = head
+
+    def on_head(self, head: int):
+        """Новый head → Sync-логи (cursor, head]"""
+        try:
+            if self._cursor is None or head < self._cursor or head - self._cursor > self.MAX_RANGE:
+                self._resync(head)   # старт, реорг или долгий простой
+                return
+            if head == self._cursor:
+                return
+            logs = self.core.get_logs(PAIR_ADDRESS, TOPIC_SYNC, self._cursor + 1, head)
+            if logs:
+                r0, r1 = decode_reserves(logs[-1]['data'])
+                self._publish(r0, r1, head)
+            else:
+                with self._lock:
+                    if self._snap is not None:
+                        self._snap = (self._snap[0], self._snap[1], head)
+                    self._ok_ts = time.time()
+            self._cursor = head
+        except RequestShed:
+            # квота занята сделкой — курсор сохраняем, следующий head дочитает (cursor, head]
+            return
+        except Exception as e:
+            # ресинк на следующем head
+            self._cursor = None
+            self.core.log(f"⚠ ReserveTracker: {e}")
+
+
+# ===== ОПТИМИЗАЦИЯ: Асинхронный backend (asyncio) =====
+class AsyncProxyClient:
+    """asyncio-версия ProxyClient (aiohttp): те же module=proxy действия и пул ключей"""
+    def __init__(self, base_url: str, api_keys: list[str] | None, key_pool: ProxyClient | None = None):
+        self.base_url = base_url.rstrip('/')
+        # пул ключей общий с синхронным ProxyClient — квоты и здоровье ключей едины
+        self.pool = key_pool or ProxyClient(base_url, api_keys)
+        self._session = None
+
+    async def _get(self, params: dict) -> dict:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15))
+        prio = PRIO_CRITICAL if params.get('action') in CRITICAL_ACTIONS else current_priority()
+        tried = []
+        retried = False
+        pk = self.pool.pick_key(tried)
+        while True:
+            if pk is None:
+                raise RuntimeError("Proxy auth error: нет рабочих API-ключей")
+            tried.append(pk)
+            if pk.key:
+                params['apikey'] = pk.key
+            pk.limiter.async_waiting += 1
+            try:
+                while True:
+                    delay = pk.limiter.try_acquire(prio)
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+            finally:
+                pk.limiter.async_waiting -= 1
+            pk.calls += 1
+            try:
+                async with self._session.get(self.base_url, params=params) as r:
+                    data = await r.json(content_type=None) if r.ok else None
+                    if r.status in THROTTLE_STATUSES or scan_rate_limited(data):
+                        pk.limiter.on_throttle()
+                        pk.errors += 1
+                        if not retried:
+                            # один повтор: другим ключом, иначе тем же через его limiter
+                            retried = True
+                            pk = self.pool.pick_key(tried) or pk
+                            continue
+                    else:
+                        pk.limiter.on_success()
+                    r.raise_for_status()
+                    if scan_rate_limited(data):
+                        raise RuntimeError(f"429 rate limit: {data.get('result')}")
+            except Exception as e:
+                raise RuntimeError(f'Proxy GET failed: {e}')
+            if isinstance(data, dict) and data.get("status") == "0" \
+                    and "invalid api key" in str(data.get("result", "")).lower():
+                pk.invalid = True
+                pk.errors += 1
+                pk = self.pool.pick_key(tried)
+                if pk is not None:
+                    continue
+                raise RuntimeError(f"Proxy auth error: {data.get('result')}")
+            return data
+
+    async def _hex(self, params: dict, what: str) -> str:
+        data = await self._get(params)
+        res = data.get('result')
+        if isinstance(res, str) and res.startswith('0x'):
+            return res
+        raise RuntimeError(f'Proxy {what} failed: {data}')
+
+    async def eth_call(self, to: str, data: str, tag: str = 'latest') -> str:
+        return await self._hex({'module':'proxy','action':'eth_call','to':to,'data':data,'tag':tag}, 'eth_call')
+
+    async def eth_gasPrice(self) -> int:
+        return int(await self._hex({'module':'proxy','action':'eth_gasPrice'}, 'eth_gasPrice'), 16)
+
+    async def eth_blockNumber(self) -> int:
+        return int(await self._hex({'module':'proxy','action':'eth_blockNumber'}, 'eth_blockNumber'), 16)
+
+    async def eth_getBalance(self, address: str) -> int:
+        data = await self._get({'module':'proxy','action':'eth_getBalance','address':address,'tag':'latest'})
+        return hex_to_int(data.get('result'))
+
+    async def eth_getTransactionCount(self, address: str, tag: str = 'pending') -> int:
+        return int(await self._hex({'module':'proxy','action':'eth_getTransactionCount',
+                                    'address':address,'tag':tag}, 'eth_getTransactionCount'), 16)
+
+    async def eth_estimateGas(self, tx: dict) -> int:
+        params = {'module':'proxy','action':'eth_estimateGas'}
+        for k in ('from', 'to', 'data'):
+            if k in tx: params[k] = tx[k]
+        if tx.get('value'): params['value'] = hex(tx['value'])
+        return int(await self._hex(params, 'eth_estimateGas'), 16)
+
+    async def eth_sendRawTransaction(self, raw_hex: str) -> str:
+        data = await self._get({'module':'proxy','action':'eth_sendRawTransaction','hex':raw_hex})
+        if isinstance(data.get('result'), str) and data['result'].startswith('0x'):
+            return data['result']
+        if 'error' in data:
+            raise RuntimeError(f"Broadcast error: {data['error']}")
+        raise RuntimeError(f"Broadcast failed: {data}")
+
+    async def eth_getTransactionReceipt(self, tx_hash: str):
+        data = await self._get({'module':'proxy','action':'eth_getTransactionReceipt','txhash':tx_hash})
+        return data.get('result') or None
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class AsyncTradingCore:
+    """
+    asyncio-ядро поверх TradingCore: те же READ/WRITE операции на AsyncWeb3
+    (Node) или AsyncProxyClient (Proxy). Кэши, статистика и политика газа —
+    общие с синхронным ядром. Работает в AsyncLoopThread.
+    """
+    def __init__(self, core):
+        self.core = core
+        # Hybrid в async-ядре: READ — dataseed, запасной и WRITE — узел (как Node)
+        self.mode = RpcMode.NODE if core.mode == RpcMode.HYBRID else core.mode
+        self.w3 = None          # WRITE/основной узел
+        self.read_w3 = None     # лёгкий READ-провайдер (dataseed)
+        self.proxy = None
+        if self.mode == RpcMode.NODE:
+            self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(core.cfg.node_http, request_kwargs={'timeout': 20}))
+            ep = core.endpoints.best() if core.endpoints else None
+            self.read_w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(
+                ep.url if ep else core.rpc_urls[0], request_kwargs={'timeout': 10}))
+        else:
+            self.proxy = AsyncProxyClient(core.cfg.proxy_base_url, core.cfg.proxy_api_keys or [],
+                                          key_pool=core.proxy)
+
+    # ---- READ ----
+    async def call(self, to: str, data: str) -> str:
+        """Асинхронный аналог _client_call (общий BlockCache)"""
+        key = (to.lower(), data)
+        hit = self.core.block_cache.get(key)
+        if hit is not None:
+            return hit
+        block = self.core.block_cache.current()
+        self.core.stats['calls'] = self.core.stats.get('calls', 0) + 1
+        if self.mode == RpcMode.NODE:
+            try:
+                out = (await self.read_w3.eth.call({'to': to, 'data': data}, 'latest')).hex()
+            except Exception:
+                out = (await self.w3.eth.call({'to': to, 'data': data}, 'latest')).hex()
+        else:
+            out = await self.proxy.eth_call(to, data)
+        if data[:10] in PINNED_SELECTORS and out and out != '0x':
+            self.core.block_cache.pin(key, out)
+        else:
+            self.core.block_cache.put(key, out, block)
+        return out
+
+    async def get_block_number(self) -> int:
+        if self.mode == RpcMode.NODE:
+            head = int(await self.read_w3.eth.block_number)
+        else:
+            head = await self.proxy.eth_blockNumber()
+        self.core.note_head(head)
+        return head
+
+    async def get_balances(self, address: str) -> tuple[int,int,int,int]:
+        self.core.stats['balance'] += 1
+        plex, usdt, dec = await asyncio.gather(
+            self.call(PLEX, calldata_balance_of(address)),
+            self.call(USDT, calldata_balance_of(address)),
+            self.call(USDT, SEL_DECIMALS))
+        return decode_uint(plex), decode_uint(usdt), 9, decode_uint(dec, 18)
+
+    async def get_bnb_balance(self, address: str) -> int:
+        cached = self.core._map_cache_get('bnb_balance', address, self.core._ttl_bnb_s)
+        if cached is not None:
+            return cached
+        block = self.core.block_cache.current()
+        if self.mode == RpcMode.NODE:
+            val = int(await self.read_w3.eth.get_balance(address))
+        else:
+            val = await self.proxy.eth_getBalance(address)
+        self.core._map_cache_set('bnb_balance', address, val, block)
+        return val
+
+    async def get_price_and_reserves(self) -> tuple[Decimal, int, int, bool]:
+        is_t0 = self.core._cache_get('is_plex_token0')
+        if is_t0 is None:
+            t0 = decode_address(await self.call(PAIR_ADDRESS, SEL_TOKEN0))
+            is_t0 = (t0.lower() == PLEX.lower())
+            self.core._cache_set('is_plex_token0', is_t0)
+        tracked = self.core.reserve_tracker.snapshot() if self.core.reserve_tracker else None
+        if tracked:
+            r_plex, r_usdt, _ = tracked
+        else:
+            block = self.core.block_cache.current()
+            r0, r1 = decode_reserves(await self.call(PAIR_ADDRESS, SEL_GETRESERVES))
+            r_plex, r_usdt = (r0, r1) if is_t0 else (r1, r0)
+            self.core._cache_set('reserves', (r_plex, r_usdt), block)
+        return self.core._price_from_reserves(r_plex, r_usdt), r_plex, r_usdt, is_t0
+
+    async def read_trade_state(self, owner: str, amount_in_raw: int = 0) -> dict:
+        """Как TradingCore.read_trade_state: один Multicall3"""
+        block = self.core.block_cache.current()
+        batch, idx = TradingCore._trade_state_batch(None, owner, amount_in_raw)
+        state, r0, r1 = TradingCore._trade_state_from(await batch.execute_async(self.call), idx)
+        if state['bnb_balance'] is None:
+            state['bnb_balance'] = await self.get_bnb_balance(owner)
+        return self.core._finish_trade_state(owner, state, r0, r1, block)
+
+    async def current_gas_price(self, default_wei: int, use_network_gas: bool = True) -> int:
+        network_gas = None
+        if use_network_gas:
+            network_gas = self.core._cache_get('gas_price', ttl_s=15)
+            if network_gas is None:
+                self.core.stats['gas'] = self.core.stats.get('gas', 0) + 1
+                block = self.core.block_cache.current()
+                if self.mode == RpcMode.NODE:
+                    network_gas = int(await self.w3.eth.gas_price)
+                else:
+                    network_gas = await self.proxy.eth_gasPrice()
+                self.core._cache_set('gas_price', network_gas, block)
+        return self.core.apply_gas_policy(default_wei, network_gas)
+
+    async def get_nonce(self, address: str) -> int:
+        if self.mode == RpcMode.NODE:
+            return int(await self.w3.eth.get_transaction_count(address, 'pending'))
+        return await self.proxy.eth_getTransactionCount(address, 'pending')
+
+    async def estimate_gas(self, tx: dict, default: int = 300000) -> int:
+        try:
+            if self.mode == RpcMode.NODE:
+                return int(await self.w3.eth.estimate_gas(tx))
+            return await self.proxy.eth_estimateGas(tx)
+        except Exception as e:
+            self.core.log(f'⚠ Gas estimate failed, using default {default}: {e}')
+            return default
+
+    # ---- WRITE ----
+    async def send_raw(self, signed: bytes) -> str:
+        if self.core.offline_only and self.mode == RpcMode.PROXY:
+            raise RuntimeError("Режим 'Только оффлайн-подпись': отправка доступна только через Node RPC")
+        self.core.stats["send"] = self.core.stats.get("send", 0) + 1
+        # ОПТИМИЗАЦИЯ: тот же fan-out, что и в sync-ядре (Node + dataseed + proxy)
+        try:
+            txh, _ = await asyncio.wrap_future(self.core._submit(self.core.broadcaster.send, signed))
+        except BroadcastUncertain as e:
+            # как в sync-ядре: tx могла уйти — nonce не освобождаем, ждём квитанцию
+            self.core.stats['send_uncertain'] = self.core.stats.get('send_uncertain', 0) + 1
+            self.core.log(f"⚠ {e} — считаем tx отправленной ({e.tx_hash}), ждём квитанцию")
+            return e.tx_hash
+        return txh
+
+    async def wait_receipt(self, tx_hash: str, timeout: int = 120) -> dict:
+        """Как TradingCore.wait_receipt, но без блокировки потока: один опрос на новый блок"""
+        t0 = time.time()
+        backoff = 2.0
+        tracker = self.core.head_tracker
+        seen_head = tracker.head if tracker else None
+        while True:
+            if time.time() - t0 > timeout:
+                raise TimeoutError(f"Таймаут ожидания подтверждения {tx_hash}")
+            self.core.stats['receipt'] = self.core.stats.get('receipt', 0) + 1
+            try:
+                if self.mode == RpcMode.NODE:
+                    receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+                else:
+                    receipt = await self.proxy.eth_getTransactionReceipt(tx_hash)
+                if receipt:
+                    self.core.nonce_manager.on_receipt(tx_hash)
+                    return receipt
+            except Exception:
+                pass   # TransactionNotFound — ещё не в блоке
+            if tracker and tracker.is_alive():
+                # ждём следующий head без блокировки цикла событий
+                while tracker.head == seen_head and time.time() - t0 <= timeout:
+                    await asyncio.sleep(0.2)
+                seen_head = tracker.head
+                continue
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 1.7, 15.0)
+
+    async def wait_receipts(self, tx_hashes: list[str], timeout: int = 120) -> list:
+        """Параллельное ожидание нескольких TX в одном потоке"""
+        return await asyncio.gather(*(self.wait_receipt(h, timeout) for h in tx_hashes),
+                                    return_exceptions=True)
+
+    async def close(self):
+        if self.proxy:
+            await self.proxy.close()
+
+
+class AsyncLoopThread(threading.Thread):
+    """Поток с собственным asyncio-циклом; submit() возвращает concurrent.futures.Future"""
+    def __init__(self):
+        super().__init__(name='AsyncLoop', daemon=True)
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        if not self.is_alive():
+            self.start()
+        self._ready.wait()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        if self.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
 def human(ts: int) -> str:
     return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
 
 
 # ===== БЕЗОПАСНОСТЬ: Менеджер nonce =====
+# ОПТИМИЗАЦИЯ: локальный счётчик — источник истины; сеть только для сверки в фоне
+NONCE_RECONCILE_S = 15      # сверка с сетью на новом блоке — не чаще, сек
+NONCE_GAP_CHECKS = 3        # столько сверок подряд (через NONCE_RECONCILE_S) сеть не видит наши tx
+NONCE_MAX_IN_FLIGHT = 4     # одновременно неподтверждённых tx на кошелёк
+
+
+class NonceState:
+    RESERVED = 'reserved'   # выдан, tx ещё не разослана
+    SENT = 'sent'           # принят хотя бы одним каналом рассылки
+    MINED = 'mined'         # есть квитанция (этой или более поздней tx)
+    DROPPED = 'dropped'     # рассылка не удалась / выпал из мемпула — «дыра», выдаётся повторно
+    REPLACED = 'replaced'   # переотправлен тем же nonce (speed-up/cancel)
+
+
+NONCE_IN_FLIGHT = (NonceState.RESERVED, NonceState.SENT, NonceState.REPLACED)
+
+
 class NonceManager:
-    def __init__(self):
+    def __init__(self, max_in_flight: int = NONCE_MAX_IN_FLIGHT):
         self._lock = threading.Lock()
-        self._current_nonce = None
-        self._pending_tx = None
+        self._current_nonce = None  # следующий свободный nonce
+        self._slots = {}            # nonce -> {'state', 'gas_price', 'tx_hash', 'ts', 'replaced'}
+        self.max_in_flight = max_in_flight
         self._last_sent_nonce = None
         self._last_sent_gas_price = None
         self._last_tx_hash = None
+        self._address = None        # кошелёк, для которого засеян счётчик
+        self._stale = True          # сверить при следующем запросе (после ошибки)
+        self._synced_ts = 0.0
+        self._version = 0           # меняется при каждом локальном сдвиге — сверка не затирает свежие
+        self._gap_checks = 0
+        self._syncing = False
+        self.gaps = 0               # сколько раз откатывались на сетевой nonce
         
     def get_nonce(self, core, address):
-        """Получает актуальный nonce с учетом pending транзакций"""
+        """Следующий свободный nonce (без резервирования)"""
         with self._lock:
-            try:
-                # Получаем nonce в зависимости от режима
-                if core.mode == RpcMode.NODE:
-                    network_nonce = core.node_w3.eth.get_transaction_count(address, 'pending')
+            return self._ensure(core, address)
+
+    def _ensure(self, core, address) -> int:
+        """Локальный nonce; сеть — только при первом запросе, смене кошелька или после ошибки"""
+        if (self._current_nonce is not None and not self._stale
+                and address.lower() == self._address):
+            return self._current_nonce
+        try:
+            # Получаем nonce в зависимости от режима (Hybrid — по маршруту 'nonce')
+            network_nonce = core.get_nonce(address)
+        except Exception as e:
+            raise Exception(f"Ошибка получения nonce: {e}")
+        self._apply_network(core, address, network_nonce)
+        return self._current_nonce
+
+    def _reserved(self) -> bool:
+        return any(s['state'] == NonceState.RESERVED for s in self._slots.values())
+
+    def _apply_network(self, core, address, network_nonce: int, live=None):
+        """
+        Сводит локальный счётчик с сетевым pending-nonce (под self._lock).
+        live — nonce отправленных tx, которые сеть ещё знает по hash; None — не проверялось,
+        и тогда разрыв только считается, но отправленные nonce не освобождаются.
+        """
+        address = address.lower()
+        local = self._current_nonce
+        if local is None or address != self._address:
+            self._current_nonce = network_nonce
+            self._slots.clear()
+            self._gap_checks = 0
+        elif network_nonce > local:
+            # tx ушли мимо бота (другой кошелёк/клиент) — догоняем сеть
+            core.log(f"⚠ Nonce: сеть впереди ({local} → {network_nonce}), внешние транзакции")
+            self._current_nonce = network_nonce
+            self._gap_checks = 0
+        elif network_nonce < local:
+            # наши tx [network_nonce, local) сеть не видит: ещё не дошли или выпали из мемпула
+            self._gap_checks += 1
+            if self._gap_checks == 1:
+                core.log(f"🕳 Nonce: разрыв {network_nonce}..{local - 1} — сеть не видит отправленные tx")
+            if self._gap_checks >= NONCE_GAP_CHECKS and live is not None and not self._reserved():
+                gone = [n for n, s in self._slots.items()
+                        if n >= network_nonce and s['state'] in NONCE_IN_FLIGHT and n not in live]
+                if live:
+                    # часть tx сеть ещё знает (медленный pending) — повторно выдаём только пропавшие
+                    if gone:
+                        core.log(f"🕳 Nonce: tx с nonce {', '.join(map(str, sorted(gone)))} пропали из сети")
+                        core.stats['nonce_gap'] = core.stats.get('nonce_gap', 0) + 1
+                        self.gaps += 1
+                        for n in gone:
+                            self._slots[n]['state'] = NonceState.DROPPED
                 else:
-                    network_nonce = core.proxy.eth_getTransactionCount(address, 'pending')
-                
-                if self._current_nonce is None or network_nonce > self._current_nonce:
+                    core.log(f"🕳 Nonce: разрыв не закрылся за {self._gap_checks} сверки — откат {local} → {network_nonce}")
+                    core.stats['nonce_gap'] = core.stats.get('nonce_gap', 0) + 1
+                    self.gaps += 1
+                    for n in gone:
+                        self._slots[n]['state'] = NonceState.DROPPED
                     self._current_nonce = network_nonce
-                return self._current_nonce
-            except Exception as e:
-                raise Exception(f"Ошибка получения nonce: {e}")
+                self._gap_checks = 0
+        else:
+            self._gap_checks = 0
+        # «дыры» ниже сетевого nonce уже кем-то заняты — повторно не выдаём
+        for n in [n for n, s in self._slots.items() if s['state'] == NonceState.DROPPED and n < network_nonce]:
+            del self._slots[n]
+        self._address = address
+        self._stale = False
+        self._synced_ts = time.time()
+        self._version += 1
+
+    def reconcile_due(self) -> bool:
+        """Пора ли сверяться с сетью (вызывается на каждом новом блоке)"""
+        with self._lock:
+            return (self._address is not None and not self._syncing
+                    and (self._stale or time.time() - self._synced_ts >= NONCE_RECONCILE_S))
+
+    def reconcile(self, core):
+        """Фоновая сверка: RPC без блокировки, применяем только если счётчик не двигался"""
+        with self._lock:
+            if self._address is None or self._syncing:
+                return
+            self._syncing = True
+            address, version = self._address, self._version
+        try:
+            network_nonce = core.get_nonce(Web3.to_checksum_address(address))
+            with self._lock:
+                suspects = self._gap_suspects(network_nonce)
+            live = None
+            if suspects is not None:
+                # перед освобождением nonce убеждаемся, что сеть действительно не знает эти tx
+                live = {n for n, hashes in suspects.items() if self._tx_known(core, hashes)}
+        except Exception as e:
+            core.log(f"⚠ Nonce: сверка не удалась: {e}")
+            return
+        finally:
+            with self._lock:
+                self._syncing = False
+        with self._lock:
+            if self._version == version and not self._reserved() and address == self._address:
+                self._apply_network(core, address, network_nonce, live)
+
+    def _gap_suspects(self, network_nonce: int):
+        """
+        Под self._lock: {nonce: [hash, ...]} отправленных tx выше сетевого nonce,
+        если эта сверка доведёт разрыв до NONCE_GAP_CHECKS; иначе None.
+        """
+        local = self._current_nonce
+        if local is None or network_nonce >= local or self._gap_checks + 1 < NONCE_GAP_CHECKS:
+            return None
+        return {n: [s['tx_hash'], *s.get('replaced', ())] for n, s in self._slots.items()
+                if n >= network_nonce and s['state'] in NONCE_IN_FLIGHT and s.get('tx_hash')}
+
+    @staticmethod
+    def _tx_known(core, hashes) -> bool:
+        """Сеть знает хотя бы одну из tx этого nonce; при ошибке запроса считаем, что знает"""
+        for h in hashes:
+            try:
+                if core.get_transaction(h):
+                    return True
+            except Exception:
+                return True
+        return False
+
+    def invalidate(self):
+        """Следующий get_nonce сверится с сетью"""
+        with self._lock:
+            self._stale = True
     
-    def reserve_nonce(self, nonce):
-        """Резервирует nonce для транзакции"""
+    def reserve(self, core, address) -> int:
+        """Выдаёт следующий nonce (сначала — выпавшие «дыры»); в полёте не больше max_in_flight"""
         with self._lock:
-            if self._pending_tx is not None:
-                raise Exception("Уже есть активная транзакция")
-            self._pending_tx = nonce
+            self._ensure(core, address)
+            busy = [n for n, s in self._slots.items() if s['state'] in NONCE_IN_FLIGHT]
+            if len(busy) >= self.max_in_flight:
+                raise Exception(f"Уже есть активные транзакции: {len(busy)}/{self.max_in_flight} "
+                                f"(nonce {', '.join(map(str, sorted(busy)))})")
+            holes = sorted(n for n, s in self._slots.items()
+                           if s['state'] == NonceState.DROPPED and n < self._current_nonce)
+            if holes:
+                nonce = holes[0]
+            else:
+                nonce = self._current_nonce
+                self._current_nonce += 1
+            self._slots[nonce] = {'state': NonceState.RESERVED, 'gas_price': None, 'tx_hash': None,
+                                  'ts': time.time(), 'replaced': []}
+            self._version += 1
             return nonce
-    
-    def release_nonce(self, success: bool = True):
-        """Освобождает зарезервированный nonce"""
+
+    def mark_sent(self, nonce: int, gas_price: int, tx_hash: str):
+        """Broadcast принят — nonce занят этой tx"""
+        with self._lock:
+            slot = self._slots.setdefault(nonce, {'replaced': []})
+            slot.update(state=NonceState.SENT, gas_price=gas_price, tx_hash=tx_hash, ts=time.time())
+            self._last_sent_nonce = nonce
+            self._last_sent_gas_price = gas_price
+            self._last_tx_hash = tx_hash
+
+    def release(self, nonce: int):
+        """Broadcast не удался: верхний nonce возвращается, из середины — становится «дырой»"""
+        with self._lock:
+            slot = self._slots.get(nonce)
+            if slot is None or slot['state'] != NonceState.RESERVED:
+                return
+            self._version += 1
+            # ошибка отправки — локальному счётчику больше не верим до сверки
+            self._stale = True
+            if nonce == self._current_nonce - 1:
+                del self._slots[nonce]
+                self._current_nonce = nonce
+            else:
+                slot['state'] = NonceState.DROPPED
+
+    def mark_replaced(self, nonce: int, gas_price: int, tx_hash: str):
+        """Тот же nonce переотправлен (speed-up/cancel): прежний hash — в историю слота"""
+        with self._lock:
+            slot = self._slots.setdefault(nonce, {'replaced': [], 'tx_hash': None})
+            if slot.get('tx_hash'):
+                slot['replaced'].append(slot['tx_hash'])
+            slot.update(state=NonceState.REPLACED, gas_price=gas_price, tx_hash=tx_hash, ts=time.time())
+            self._last_sent_nonce = nonce
+            self._last_sent_gas_price = gas_price
+            self._last_tx_hash = tx_hash
+
+    def on_receipt(self, tx_hash: str):
+        """Квитанция получена: nonce этой tx и все ниже него — в блоке"""
+        h = tx_hash.lower()
+        with self._lock:
+            mined = next((n for n, s in self._slots.items()
+                          if (s.get('tx_hash') or '').lower() == h
+                          or h in (x.lower() for x in s.get('replaced', ()))), None)
+            if mined is None:
+                return
+            for n, s in self._slots.items():
+                if n <= mined and s['state'] in (NonceState.SENT, NonceState.REPLACED):
+                    s['state'] = NonceState.MINED
+            self._prune()
+
+    def slot(self, nonce: int) -> dict | None:
+        with self._lock:
+            s = self._slots.get(nonce)
+            return dict(s) if s else None
+
+    def in_flight(self) -> list[int]:
+        """Nonce, ещё не попавшие в блок (зарезервированы / отправлены / заменены)"""
+        with self._lock:
+            return sorted(n for n, s in self._slots.items() if s['state'] in NONCE_IN_FLIGHT)
+
+    def snapshot(self) -> dict:
+        """{nonce: состояние} по всем известным слотам"""
         with self._lock:
-            self._pending_tx = None
-            # Инкрементируем локальный nonce только если транзакция реально отправлена
-            if success and self._current_nonce is not None:
-                self._current_nonce += 1
+            return {n: s['state'] for n, s in sorted(self._slots.items())}
+
+    def _prune(self, keep: int = 64):
+        done = sorted(n for n, s in self._slots.items() if s['state'] == NonceState.MINED)
+        for n in done[:-keep] if len(done) > keep else ():
+            del self._slots[n]
     
     def has_pending(self):
-        """Проверяет, есть ли активная транзакция"""
+        """Проверяет, есть ли транзакции в полёте"""
         with self._lock:
-            return self._pending_tx is not None
+            return any(s['state'] in NONCE_IN_FLIGHT for s in self._slots.values())
     
     def record_sent_tx(self, nonce, gas_price, tx_hash):
         """Записывает данные отправленной транзакции"""
@@ -1446,6 +4272,162 @@ class NonceManager:
         with self._lock:
             return self._last_sent_nonce, self._last_sent_gas_price, self._last_tx_hash
 
+# ===== ОПТИМИЗАЦИЯ: Лестница заранее подписанных swap (Interval) =====
+LADDER_DEPTH = 3                # сколько следующих продаж держать подписанными
+LADDER_DEADLINE_SLACK_S = 60    # допустимый сдвиг дедлайна относительно расписания, сек
+
+
+def sell_min_out(expected_out: int, slippage_pct: float) -> int:
+    """minOut продажи: слиппедж пользователя + safety_slippage_bonus (как в ручной продаже)"""
+    safety = Decimal(DEFAULT_LIMITS['safety_slippage_bonus']) / Decimal(100)
+    return max(int(Decimal(expected_out) * (Decimal(1) - Decimal(slippage_pct / 100) - safety)), 1)
+
+
+class SwapLadder:
+    """
+    Подписанные заранее approve(amount)+swap для следующих K продаж Interval-режима.
+    Ключ — предсказанный nonce (шаг = tx на продажу, уточняется по факту отправки).
+    Запись переподписывается лениво — только если её сделали неверной nonce, газ,
+    цена (minOut вне [пол слиппеджа, ожидаемый выход]) или сдвиг расписания;
+    в момент продажи остаётся одна рассылка.
+    """
+    def __init__(self, core, owner: str, pk: str, amount_in_raw: int,
+                 slippage_pct: float, deadline_min: int, depth: int = LADDER_DEPTH):
+        self.core = core
+        self.owner = owner
+        self.amount = int(amount_in_raw)
+        self.slippage_pct = slippage_pct
+        self.deadline_s = deadline_min * 60
+        self.depth = depth
+        self._acct = Account.from_key(pk)   # ОПТИМИЗАЦИЯ: from_key один раз, а не на каждую tx
+        self._lock = threading.Lock()
+        self._entries = {}       # nonce -> {'kind', 'raw', 'gas_price', 'min_out', 'deadline'}
+        self._gas = {}           # kind -> gas limit из последней реальной оценки
+        self._next = None        # nonce следующего swap
+        self._stride = 2         # approve + swap
+        self.hits = 0
+        self.misses = 0
+
+    def owns(self, owner: str, amount: int) -> bool:
+        """Tx этого кошелька на сумму лестницы"""
+        return owner.lower() == self.owner.lower() and amount == self.amount
+
+    def learn_gas(self, kind: str, gas: int):
+        """Лимит газа из оценки при обычной отправке — ладдер подписывает только с ним"""
+        with self._lock:
+            self._gas[kind] = int(gas)
+
+    def note_swap_sent(self, nonce: int):
+        """Swap ушёл с этим nonce: уточняем шаг и сбрасываем израсходованные ступени"""
+        with self._lock:
+            if self._next is not None and nonce > self._next - self._stride:
+                self._stride = max(1, nonce - (self._next - self._stride))
+            self._next = nonce + self._stride
+            for n in [n for n in self._entries if n <= nonce]:
+                del self._entries[n]
+
+    def _swap_ok(self, e: dict, gas_price: int, floor: int, ceil: int) -> bool:
+        return e['gas_price'] == gas_price and floor <= e['min_out'] <= ceil
+
+    def _sign(self, tx: dict) -> bytes:
+        return self._acct.sign_transaction(tx).rawTransaction
+
+    def refresh(self, expected_out: int, gas_price_wei: int, first_due_ts: int, interval_s: int,
+                count: int = None) -> int:
+        """Досоздаёт/переподписывает неверные ступени; возвращает число новых подписей"""
+        with self._lock:
+            if self._next is None or 'swap' not in self._gas:
+                return 0     # первая продажа идёт обычным путём и даёт nonce/газ
+            floor = sell_min_out(expected_out, self.slippage_pct)
+            depth = self.depth if count is None else max(0, min(self.depth, count))
+            signed = 0
+            wanted = set()
+            for i in range(depth):
+                nonce = self._next + i * self._stride
+                deadline = first_due_ts + i * interval_s + self.deadline_s
+                wanted.add(nonce)
+                e = self._entries.get(nonce)
+                if not (e and e['kind'] == 'swap' and self._swap_ok(e, gas_price_wei, floor, expected_out)
+                        and abs(e['deadline'] - deadline) <= LADDER_DEADLINE_SLACK_S):
+                    data = encode_swap_exact_tokens_supporting(self.amount, floor, [PLEX, USDT], self.owner, deadline)
+                    tx = {'to': PANCAKE_V2_ROUTER, 'value': 0, 'data': data, 'chainId': BSC_CHAIN_ID,
+                          'gasPrice': gas_price_wei, 'nonce': nonce, 'gas': self._gas['swap']}
+                    self._entries[nonce] = {'kind': 'swap', 'raw': self._sign(tx), 'gas_price': gas_price_wei,
+                                            'min_out': floor, 'deadline': deadline}
+                    signed += 1
+                # approve(amount) не зависит от цены — только от nonce и газа
+                if self._stride >= 2 and 'approve' in self._gas:
+                    wanted.add(nonce - 1)
+                    a = self._entries.get(nonce - 1)
+                    if not (a and a['kind'] == 'approve' and a['gas_price'] == gas_price_wei):
+                        tx = {'to': PLEX, 'value': 0, 'data': encode_approve(PANCAKE_V2_ROUTER, self.amount),
+                              'chainId': BSC_CHAIN_ID, 'gasPrice': gas_price_wei, 'nonce': nonce - 1,
+                              'gas': self._gas['approve']}
+                        self._entries[nonce - 1] = {'kind': 'approve', 'raw': self._sign(tx),
+                                                    'gas_price': gas_price_wei}
+                        signed += 1
+            for n in [n for n in self._entries if n not in wanted]:
+                del self._entries[n]
+            return signed
+
+    def _swap_usable(self, e, gas_price_wei: int, min_out_raw: int) -> bool:
+        """Под self._lock: ступень e годится для продажи с этим газом и minOut прямо сейчас"""
+        if not e or e['kind'] != 'swap':
+            return False
+        # верх полосы: ожидаемый выход, из которого получен текущий minOut
+        keep = Decimal(1) - Decimal(self.slippage_pct / 100) - Decimal(DEFAULT_LIMITS['safety_slippage_bonus']) / Decimal(100)
+        ceil = int(Decimal(min_out_raw) / keep) if keep > 0 else min_out_raw
+        left = e['deadline'] - time.time()
+        return (self._swap_ok(e, gas_price_wei, min_out_raw, ceil)
+                and self.deadline_s / 2 <= left <= self.deadline_s + LADDER_DEADLINE_SLACK_S)
+
+    def ready(self, owner: str, amount: int, gas_price_wei: int, min_out_raw: int) -> bool:
+        """Обе ступени следующей продажи (approve + swap) подписаны и годны — префлайту не нужны оценки газа"""
+        if not self.owns(owner, amount):
+            return False
+        with self._lock:
+            if self._next is None or not self._swap_usable(self._entries.get(self._next), gas_price_wei, min_out_raw):
+                return False
+            if self._stride < 2:
+                return True
+            a = self._entries.get(self._next - 1)
+            return bool(a and a['kind'] == 'approve' and a['gas_price'] == gas_price_wei)
+
+    def gas_budget(self) -> int:
+        """Лимит газа продажи по последним реальным оценкам (approve + swap)"""
+        with self._lock:
+            return self._gas.get('approve', 50000) * (1 if self._stride >= 2 else 0) + self._gas.get('swap', 200000)
+
+    def take_swap(self, owner: str, amount: int, nonce: int, gas_price_wei: int, min_out_raw: int):
+        """Подписанный swap для этого nonce или None (промах — подпишет обычный путь)"""
+        if not self.owns(owner, amount):
+            return None
+        with self._lock:
+            e = self._entries.pop(nonce, None)
+            ok = self._swap_usable(e, gas_price_wei, min_out_raw)
+            if ok:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return e['raw'] if ok else None
+
+    def take_approve(self, owner: str, amount: int, nonce: int, gas_price_wei: int):
+        """Подписанный approve(amount) для этого nonce или None"""
+        if not self.owns(owner, amount):
+            return None
+        with self._lock:
+            e = self._entries.pop(nonce, None)
+            if e and e['kind'] == 'approve' and e['gas_price'] == gas_price_wei:
+                return e['raw']
+            if e is not None:
+                self._entries[nonce] = e   # на этом nonce ждёт swap — не трогаем
+        return None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'next': self._next, 'stride': self._stride, 'ready': len(self._entries),
+                    'hits': self.hits, 'misses': self.misses}
+
 # ===== БЕЗОПАСНОСТЬ: Авто-поток с offline-устойчивостью =====
 class AutoSellerThread(QtCore.QThread):
     status = QtCore.pyqtSignal(str)
@@ -1491,6 +4473,12 @@ class AutoSellerThread(QtCore.QThread):
         # ---- P0 Autopause counters ----
         self._fail_streak = 0
         self._last_autopause_reason = ""
+        # ОПТИМИЗАЦИЯ: пробуждение по Sync-событию пары (Smart-режим)
+        self._wake = threading.Event()
+
+    def _on_reserves(self, r_plex: int, r_usdt: int, block: int):
+        """Резервы изменились — не ждём конца интервала опроса"""
+        self._wake.set()
 
     @QtCore.pyqtSlot()
     def resume(self):
@@ -1508,6 +4496,18 @@ class AutoSellerThread(QtCore.QThread):
         """Основной цикл авто-продажи с двумя режимами"""
         mode = "Smart (target price)" if self.use_target else "Interval"
         self.status.emit(f"▶ Автопродажа запущена в режиме {mode}. Проверка каждые {self.price_check_interval_sec} сек")
+        tracker = self.core.reserve_tracker if self.use_target else None
+        if tracker:
+            tracker.subscribe(self._on_reserves)
+        # ОПТИМИЗАЦИЯ: Interval — следующие продажи подписываются заранее, пока идёт ожидание
+        ladder = None
+        if not self.use_target and self.amount_per_sell > 0:
+            try:
+                ladder = SwapLadder(self.core, self.address, self.pk, to_units(self.amount_per_sell, 9),
+                                    self.slippage_pct, self.deadline_min)
+                self.core.ladder = ladder
+            except Exception as e:
+                self.status.emit(f"⚠ Лестница подписей недоступна: {e}")
         
         while not self._stop_flag:
             try:
@@ -1607,10 +4607,12 @@ class AutoSellerThread(QtCore.QThread):
                     # INTERVAL: продаём по таймеру
                     if self._should_sell_by_interval(now):
                         self.status.emit(f"⏰ Интервал достигнут, продаем {self.amount_per_sell} PLEX")
-                        self._execute_one_sell(self.amount_per_sell)
+                        self._execute_one_sell(self.amount_per_sell, reserves=(rplex, rusdt))
                     else:
                         next_sell = self._next_sell_ts - now if self._next_sell_ts > 0 else self.interval_sec
                         self.status.emit(f"⏳ Следующая продажа через {next_sell} сек")
+                        if ladder:
+                            self._refresh_ladder(ladder, rplex, rusdt)
                 
                 # лимит количества продаж
                 if self.max_sells > 0 and self._done >= self.max_sells:
@@ -1621,17 +4623,41 @@ class AutoSellerThread(QtCore.QThread):
                 base_poll = max(2, self.price_check_interval_sec)
                 # Используем настраиваемый интервал для медленного тика (из снимка)
                 slow = (self.slow_tick_interval if (not self.ui_active and not self.auto_on) else base_poll)
-                time.sleep(slow)
+                # ОПТИМИЗАЦИЯ: интервал — верхняя граница; Sync-событие будит раньше
+                self._wake.wait(slow)
+                self._wake.clear()
                 
             except Exception as e:
                 self.status.emit(f"❌ Auto error: {e}")
                 time.sleep(5)
         
+        if tracker:
+            tracker.unsubscribe(self._on_reserves)
+        if ladder is not None and self.core.ladder is ladder:
+            self.core.ladder = None
         self.status.emit("⏹ Автопродажа остановлена")
     
     def stop(self):
         """Останавливает авто-поток"""
         self._stop_flag = True
+        self._wake.set()
+
+    def _refresh_ladder(self, ladder, rplex: int, rusdt: int):
+        """Переподписывает ступени, ставшие неверными (локально: резервы тика + кэш газа)"""
+        try:
+            expected = uni_v2_amount_out(ladder.amount, rplex, rusdt, 25)
+            gas_price = self._ladder_gas_price()
+            left = self.max_sells - self._done if self.max_sells > 0 else None
+            ladder.refresh(expected, gas_price, self._next_sell_ts or int(time.time()) + self.interval_sec,
+                           self.interval_sec, count=left)
+        except Exception as e:
+            self.status.emit(f"⚠ ladder refresh: {e}")
+
+    def _ladder_gas_price(self) -> int:
+        """Газ для ступеней лестницы: политика газа по последнему известному сетевому (без RPC)"""
+        use_net = getattr(self, "use_network_gas", True)
+        return self.core.apply_gas_policy(to_wei_gwei(self.gas_gwei),
+                                          self.core.last_network_gas() if use_net else None)
 
     def _should_sell_by_interval(self, now: int) -> bool:
         """Проверяет, нужно ли продавать по интервалу"""
@@ -1649,8 +4675,8 @@ class AutoSellerThread(QtCore.QThread):
             return True
         return False
 
-    def _execute_one_sell(self, amount_plex: Decimal):
-        """Выполняет одну продажу с безопасными проверками"""
+    def _execute_one_sell(self, amount_plex: Decimal, reserves: tuple[int, int] = None):
+        """Выполняет одну продажу с безопасными проверками (reserves — резервы текущего тика)"""
         if amount_plex <= 0:
             self.status.emit("⚠ Skip: amount ≤ 0")
             return
@@ -1658,26 +4684,34 @@ class AutoSellerThread(QtCore.QThread):
         try:
             # 1) расчёт amount_in_raw
             plex_raw = to_units(amount_plex, 9)
-            
-            # 2) оценка выхода и minOut (через getAmountsOut, фоллбэк — резервы)
-            try:
-                expected_out = get_amounts_out(self.core, plex_raw, [PLEX, USDT])
-            except Exception as e:
-                self.status.emit(f"⚠ getAmountsOut fail, fallback: {e}")
-                price, rplex, rusdt, is_t0 = self.core.get_price_and_reserves()
-                expected_out = uni_v2_amount_out(plex_raw, rplex, rusdt, 25)
-            
-            # БЕЗОПАСНОСТЬ: Добавляем safety_slippage_bonus как в ручной продаже
-            safety = Decimal(DEFAULT_LIMITS['safety_slippage_bonus']) / Decimal(100)
-            final_min_out = max(int(Decimal(expected_out) * (Decimal(1) - Decimal(self.slippage_pct/100) - safety)), 1)
-            
-            # 3) дедлайн и газ
-            deadline = int(time.time()) + self.deadline_min * 60
-            use_net = getattr(self, "use_network_gas", True)  # Потокобезопасно из снимка
-            gas_price = self.core.current_gas_price(
-                to_wei_gwei(self.gas_gwei),
-                use_network_gas=use_net
-            )
+
+            # ОПТИМИЗАЦИЯ: ступени лестницы годны — minOut по резервам тика и газ из кэша,
+            # как при подписи (без getAmountsOut/eth_gasPrice); префлайт пропустит оценки газа
+            ladder = self.core.ladder
+            fast = False
+            if reserves and ladder:
+                expected_out = uni_v2_amount_out(plex_raw, reserves[0], reserves[1], 25)
+                final_min_out = sell_min_out(expected_out, self.slippage_pct)
+                gas_price = self._ladder_gas_price()
+                fast = ladder.ready(self.address, plex_raw, gas_price, final_min_out)
+            if not fast:
+                # 2) оценка выхода и minOut (через getAmountsOut, фоллбэк — резервы)
+                try:
+                    expected_out = get_amounts_out(self.core, plex_raw, [PLEX, USDT])
+                except Exception as e:
+                    self.status.emit(f"⚠ getAmountsOut fail, fallback: {e}")
+                    price, rplex, rusdt, is_t0 = self.core.get_price_and_reserves()
+                    expected_out = uni_v2_amount_out(plex_raw, rplex, rusdt, 25)
+
+                # БЕЗОПАСНОСТЬ: Добавляем safety_slippage_bonus как в ручной продаже
+                final_min_out = sell_min_out(expected_out, self.slippage_pct)
+
+                # 3) газ
+                use_net = getattr(self, "use_network_gas", True)  # Потокобезопасно из снимка
+                gas_price = self.core.current_gas_price(
+                    to_wei_gwei(self.gas_gwei),
+                    use_network_gas=use_net
+                )
             
             # Потокобезопасное обновление статус-бара через сигнал
             self.gas.emit(gas_price)
@@ -1728,6 +4762,120 @@ UI_SCALE_STEP = 0.1
 BREAKPOINT_WIDE = 1200  # Широкие экраны - две колонки
 BREAKPOINT_NARROW = 900  # Узкие экраны - табы и скроллы
 
+# ===== Мост HeadTracker → GUI-поток =====
+class HeadSignal(QtCore.QObject):
+    """Сигнал нового блока (emit из потока трекера, слот — в GUI-потоке)"""
+    new_block = QtCore.pyqtSignal(int)
+
+
+# ===== Мост asyncio → GUI-поток =====
+class QtAsyncBridge(QtCore.QObject):
+    """Корутина выполняется в цикле async-ядра, колбэк вызывается в GUI-потоке"""
+    _finished = QtCore.pyqtSignal(object, object, object)  # (on_result, on_error, future)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._finished.connect(self._deliver)
+
+    def submit(self, core, coro, on_result, on_error=None):
+        fut = core.submit_async(coro)
+        fut.add_done_callback(lambda f: self._finished.emit(on_result, on_error, f))
+        return fut
+
+    @QtCore.pyqtSlot(object, object, object)
+    def _deliver(self, on_result, on_error, fut):
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is None:
+            on_result(fut.result())
+        elif on_error:
+            on_error(exc)
+
+
+# ===== Фоновые команды GUI (QThreadPool) =====
+class _CommandSignals(QtCore.QObject):
+    """Сигналы одной команды; объект живёт в GUI-потоке, поэтому слоты вызываются там же"""
+    done = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object)
+    progress = QtCore.pyqtSignal(str)
+
+
+class _CommandRunnable(QtCore.QRunnable):
+    def __init__(self, work, token: CancelToken, signals: _CommandSignals):
+        super().__init__()
+        self.work = work
+        self.token = token
+        self.signals = signals
+        self.setAutoDelete(True)
+
+    def run(self):
+        try:
+            res = self.work(self.token, self.signals.progress.emit)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.done.emit(res)
+
+
+class CommandExecutor(QtCore.QObject):
+    """
+    Выполняет блокирующие вызовы TradingCore вне GUI-потока.
+    work(token, progress) работает в пуле и не трогает виджеты; on_done/on_error/on_progress
+    вызываются в GUI-потоке. Повторный запуск уже идущей команды игнорируется;
+    отменённая команда (CommandCancelled) сообщает о себе сигналом cancelled, а не on_error.
+    """
+    busy_changed = QtCore.pyqtSignal(bool)
+    cancelled = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None, max_threads: int = 4):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._running = {}   # name -> (CancelToken, _CommandSignals)
+
+    def submit(self, name: str, work, on_done=None, on_error=None, on_progress=None):
+        if name in self._running:
+            return None
+        token = CancelToken()
+        sig = _CommandSignals()
+        if on_progress:
+            sig.progress.connect(on_progress)
+        sig.done.connect(lambda res: self._finish(name, on_done, res))
+        sig.failed.connect(lambda exc: self._finish(name, on_error, exc))
+        self._running[name] = (token, sig)
+        if len(self._running) == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(_CommandRunnable(work, token, sig))
+        return token
+
+    def _finish(self, name: str, cb, arg):
+        self._running.pop(name, None)
+        if not self._running:
+            self.busy_changed.emit(False)
+        if isinstance(arg, CommandCancelled):
+            self.cancelled.emit(name)
+        elif cb:
+            cb(arg)
+
+    def is_running(self, name: str) -> bool:
+        return name in self._running
+
+    def cancel(self, name: str):
+        entry = self._running.get(name)
+        if entry:
+            entry[0].cancel()
+
+    def cancel_all(self):
+        for token, _ in list(self._running.values()):
+            token.cancel()
+
+    def shutdown(self, wait_ms: int = 3000):
+        """Отменяет команды и ждёт завершения пула (при закрытии окна)"""
+        self.cancel_all()
+        self.pool.waitForDone(wait_ms)
+
+
 # ===== ПОТОКОБЕЗОПАСНЫЙ ЛОГГЕР =====
 class UiLogger(QtCore.QObject):
     """Потокобезопасный логгер для UI"""
@@ -1840,6 +4988,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.compact_status = False
         # Последний результат предварительной проверки (для экспорта)
         self._last_precheck: dict | None = None
+        self._precheck_model: PrecheckModel | None = None
+        self._precheck_dirty = False
         
         # Настройка размера окна (80% экрана)
         screen = QtWidgets.QApplication.primaryScreen().availableGeometry()
@@ -1874,6 +5024,16 @@ class MainWindow(QtWidgets.QMainWindow):
         # Все логи в UI — только через сигнал:
         self.ui_logger.sig_log.connect(self._on_log_message)
         
+        # Результаты asyncio-ядра доставляются в GUI-поток
+        self._async_bridge = QtAsyncBridge(self)
+        # Блокирующие команды (подключение, отправка TX, проверки) — в пуле потоков
+        self.commands = CommandExecutor(self)
+        self.commands.busy_changed.connect(self.btn_cmd_cancel.setVisible)
+        self.commands.cancelled.connect(lambda name: self.ui_logger.write(f"⏹ Операция «{name}» отменена"))
+        # Новые блоки от HeadTracker
+        self._head_signal = HeadSignal(self)
+        self._head_signal.new_block.connect(self._on_new_block)
+        
         # Таймер для RPC-статистики
         self.rpc_timer = QtCore.QTimer(self)
         self.rpc_timer.timeout.connect(self._refresh_rpc_stats)
@@ -1946,8 +5106,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.mode_proxy = QtWidgets.QRadioButton("EnterScan (Multichain API)")
         self.mode_node.setToolTip("Прямое подключение к HTTP RPC узлу (WRITE/READ). READ-пулы дублируются через BSC dataseed.")
         self.mode_proxy.setToolTip("Прокси JSON-RPC через *Scan API (module=proxy): экономит WRITE, годится для READ и отправки raw TX.")
+        self.mode_hybrid = QtWidgets.QRadioButton("Гибрид")
+        self.mode_hybrid.setToolTip("READ — бесплатные BSC dataseed, nonce и отправка — Node RPC, EnterScan (если заданы ключи) — запасной.\n"
+                                    "Маршрут каждого класса операций выбирается по измеренной задержке и доле ошибок.")
         layout.addWidget(self.mode_node, 0, 0)
         layout.addWidget(self.mode_proxy, 0, 1)
+        layout.addWidget(self.mode_hybrid, 0, 2)
 
         self.node_url = QtWidgets.QLineEdit()
         self.node_url.setPlaceholderText("Node HTTP RPC URL (например, QuickNode HTTP)")
@@ -2190,6 +5354,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.catch_up.setChecked(False)
         self.catch_up.setToolTip("Если приложение было неактивно — «догонять» пропущенные продажи шагами интервала.")
         
+        # ОПТИМИЗАЦИЯ: конвейерная отправка revoke/approve/swap
+        self.pipelined_sell = QtWidgets.QCheckBox("Конвейер: approve + swap одним блоком")
+        self.pipelined_sell.setChecked(False)
+        self.pipelined_sell.setToolTip("Подписать revoke(0)/approve/swap подряд идущими nonce и разослать сразу, "
+                                       "ожидая одну квитанцию вместо трёх-четырёх.")
+        self.pipelined_sell.toggled.connect(self._on_pipelined_toggled)
+        
         # Добавляем поля в layout с objectName для надежного переключения режимов
         lbl_amount = QtWidgets.QLabel("Количество PLEX:"); lbl_amount.setObjectName("lbl_amount")
         layout.addWidget(lbl_amount, 0, 0)
@@ -2248,12 +5419,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self.info_max_sells.setObjectName("info_max_sells")
         layout.addWidget(self.info_max_sells, 13, 2)
         layout.addWidget(self.catch_up, 14, 0, 1, 2)
+        layout.addWidget(self.pipelined_sell, 15, 0, 1, 2)
+        layout.addWidget(self._info_button("Продажа без пошаговых подтверждений: tx уходят подряд и ложатся в один/соседние блоки. "
+                                           "Проверки перед продажей те же."), 15, 2)
 
         # ✚ Кнопка сброса параметров к безопасным значениям
         self.btn_trade_reset = QtWidgets.QPushButton("Сбросить параметры")
         self.btn_trade_reset.setToolTip("Вернуть безопасные значения: газ 0.1 gwei, слиппедж 1%, дедлайн 20 мин и т. п.")
         self.btn_trade_reset.clicked.connect(self._reset_trade_params_defaults)
-        layout.addWidget(self.btn_trade_reset, 15, 0, 1, 2)
+        layout.addWidget(self.btn_trade_reset, 16, 0, 1, 2)
         
         scroll_area.setWidget(trading_widget)
         self.trading_dock.setWidget(scroll_area)
@@ -2274,7 +5448,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # Кнопка проверки
         self.btn_precheck = QtWidgets.QPushButton("Проверить сделку")
         self.btn_precheck.setToolTip("READ-проверки: баланс, allowance, газ-бюджет, резервы, лимиты, пара")
-        self.btn_precheck.clicked.connect(self.on_precheck)
+        self.btn_precheck.clicked.connect(lambda: self.on_precheck())
         g.addWidget(self.btn_precheck, 0, 0, 1, 2)
         # ✚ Кнопка экспорта результата проверки в буфер
         self.btn_precheck_copy = QtWidgets.QPushButton("Скопировать результат")
@@ -2514,6 +5688,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status_gas = QtWidgets.QLabel("Газ: -- gwei");           self.status_gas.setProperty("chip", True);     self.status_gas.setProperty("level","muted");     self.status_gas.setToolTip("Текущая цена газа в gwei (с учётом лимитов).")
         self.status_price = QtWidgets.QLabel("Цена: -- USDT/PLEX");   self.status_price.setProperty("chip", True);   self.status_price.setProperty("level","muted");   self.status_price.setToolTip("USDT за 1 PLEX.")
         self.status_auto = QtWidgets.QLabel("Авто: ВЫКЛ");            self.status_auto.setProperty("chip", True);    self.status_auto.setProperty("level","muted");    self.status_auto.setToolTip("Состояние автопродажи.")
+        self.status_block = QtWidgets.QLabel("Блок: —");              self.status_block.setProperty("chip", True);   self.status_block.setProperty("level","muted");   self.status_block.setToolTip("Последний блок (HeadTracker).")
         
         # Кнопка "Продолжить авто" для возобновления после паузы
         self.btn_auto_resume = QtWidgets.QPushButton("Продолжить авто")
@@ -2525,6 +5700,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self.btn_auto_pause.clicked.connect(self._on_auto_pause_toggle)
         self.btn_auto_stop_after = QtWidgets.QPushButton("Стоп после следующей")
         self.btn_auto_stop_after.clicked.connect(self._on_auto_stop_after)
+        # Отмена фоновых команд (видна, пока что-то выполняется)
+        self.btn_cmd_cancel = QtWidgets.QPushButton("⏹ Отменить")
+        self.btn_cmd_cancel.setToolTip("Прервать выполняющиеся операции (ожидание квитанции, проверки)")
+        self.btn_cmd_cancel.setVisible(False)
+        self.btn_cmd_cancel.clicked.connect(lambda: self.commands.cancel_all())
         
         
         # Добавляем виджеты в статус-бар
@@ -2532,6 +5712,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status_bar.addPermanentWidget(self.status_gas)
         self.status_bar.addPermanentWidget(self.status_price)
         self.status_bar.addPermanentWidget(self.status_auto)
+        self.status_bar.addPermanentWidget(self.status_block)
         self.status_bar.addPermanentWidget(self.btn_auto_pause)
         self.status_bar.addPermanentWidget(self.btn_auto_stop_after)
         # Новый «чип» со статусом последней TX (кликабелен для копирования)
@@ -2543,6 +5724,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status_tx.rightClicked.connect(self._tx_context_menu)
         self.status_bar.addPermanentWidget(self.status_tx)
         self.status_bar.addPermanentWidget(self.btn_auto_resume)
+        self.status_bar.addPermanentWidget(self.btn_cmd_cancel)
         
         # Индикаторы статуса (уже созданы выше)
         # self.network_status, self.gas_status, self.price_status, self.auto_status уже добавлены
@@ -2704,6 +5886,18 @@ class MainWindow(QtWidgets.QMainWindow):
             self.status_auto.setText(self._fmt_status_auto())
             self.status_auto.setProperty("level", "ok" if auto else "muted"); _restyle(self.status_auto)
 
+    def _on_new_block(self, block: int):
+        """Новый head: номер блока и цена из снимка резервов (без RPC)"""
+        self._set_chip(self.status_block, f"🧱 {block}" if self.compact_status else f"Блок: {block}", "ok")
+        tracker = self.core.reserve_tracker if self.core else None
+        snap = tracker.snapshot() if tracker else None
+        if snap and not (self.autoseller and self.autoseller.isRunning()):
+            r_plex, r_usdt, _ = snap
+            price = self.core._price_from_reserves(r_plex, r_usdt)
+            self.price_label.setText(f"Цена: {fmt_price(price)} USDT / 1 PLEX")
+            self.reserves_label.setText(f"Резервы: PLEX={from_units(r_plex, 9)} USDT={from_units(r_usdt, 18)}")
+            self._update_status_bar(price=str(price))
+
     def _toggle_fullscreen(self):
         """Переключает полноэкранный режим"""
         if self.isFullScreen():
@@ -2851,7 +6045,8 @@ class MainWindow(QtWidgets.QMainWindow):
     # --------------- Event handlers ---------------
 
     def _cfg(self) -> BackendConfig:
-        mode = RpcMode.NODE if self.mode_node.isChecked() else RpcMode.PROXY
+        mode = (RpcMode.HYBRID if self.mode_hybrid.isChecked()
+                else RpcMode.NODE if self.mode_node.isChecked() else RpcMode.PROXY)
         keys = [k.strip() for k in self.proxy_keys.text().split(',') if k.strip()]
         return BackendConfig(
             mode=mode,
@@ -2905,7 +6100,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
             # Готовим конфиг и делаем мягкую проверку режима
             cfg = self._cfg()
-            if cfg.mode == RpcMode.NODE and not (cfg.node_http or "").strip():
+            if cfg.mode in (RpcMode.NODE, RpcMode.HYBRID) and not (cfg.node_http or "").strip():
                 # Node пуст. Разрешаем мягкий fallback только в Watch-only и только если задан Proxy URL
                 can_fallback_to_proxy = bool(self.proxy_url.text().strip())
                 if self.watch_only_cb.isChecked() and can_fallback_to_proxy:
@@ -2940,105 +6135,147 @@ class MainWindow(QtWidgets.QMainWindow):
                     return
 
             # Подключаемся с окончательным конфигом
-            self.core = TradingCore(cfg, log_fn=self.ui_logger.write)
-            mode_used = self.core.connect()
-            self.ui_logger.write(f"✅ Подключено через {mode_used}.")
-
-            # Проверка decimals токенов
-            plex_dec = self.core.get_decimals(PLEX)
-            usdt_dec = self.core.get_decimals(USDT)
-            if plex_dec != 9 or usdt_dec != 18:
-                raise RuntimeError(f"Неподдерживаемые decimals: PLEX={plex_dec}, USDT={usdt_dec}. Ожидалось 9/18.")
-            self.ui_logger.write(f"✅ Decimals проверены: PLEX={plex_dec}, USDT={usdt_dec}")
-
-            # Статусы/первый газ
-            self._update_status_bar(
-                net=mode_used,
-                gas_wei=self.core.current_gas_price(
-                    to_wei_gwei(float(self.gas_gwei.value())),
-                    use_network_gas=self.use_network_gas.isChecked()
-                ),
-                auto=self.autoseller is not None
-            )
-            # Стартовые проверки и первый батч обновлений
-            self._startup_safety_checks()
-            self.on_refresh_all_balances()
-            self._schedule_precheck(50)
-
-            # Watch-only: отключаем опасные действия
-            wo = self.watch_only_cb.isChecked() or (self.pk is None)
-            for w in (self.btn_sell, self.btn_approve, self.btn_revoke, self.btn_cancel_pending):
-                w.setEnabled(not wo)
+            if self.core:
+                self.core.stop_head_tracker()
+                self.core.stop_async()
+                self.core.stop_endpoints()
+                self.core = None
+            # Сеть — в пуле потоков; виджеты читаем здесь
+            addr = self.addr
+            user_gas = to_wei_gwei(float(self.gas_gwei.value()))
+            use_net = self.use_network_gas.isChecked()
+            pipelined = self.pipelined_sell.isChecked()
+            log = self.ui_logger.write
+
+            def work(token, progress):
+                progress("⏳ Подключение…")
+                core = TradingCore(cfg, log_fn=log)
+                core.pipelined = pipelined
+                mode_used = core.connect()
+                log(f"✅ Подключено через {mode_used}.")
+                # ОПТИМИЗАЦИЯ: рукопожатия ко всем эндпоинтам сейчас, а не на первой сделке
+                progress("⏳ Прогрев соединений…")
+                core.warm_up()
+                token.check()
+
+                # Проверка decimals токенов
+                plex_dec = core.get_decimals(PLEX)
+                usdt_dec = core.get_decimals(USDT)
+                if plex_dec != 9 or usdt_dec != 18:
+                    raise RuntimeError(f"Неподдерживаемые decimals: PLEX={plex_dec}, USDT={usdt_dec}. Ожидалось 9/18.")
+                log(f"✅ Decimals проверены: PLEX={plex_dec}, USDT={usdt_dec}")
+                token.check()
+
+                # Первый газ и стартовые проверки (снимок аккаунта пригодится и для балансов)
+                gas = core.current_gas_price(user_gas, use_network_gas=use_net)
+                progress("⏳ Стартовые проверки…")
+                snap, allowance_open = self._startup_safety_checks(core, addr, gas, user_gas)
+                return core, mode_used, gas, snap, allowance_open
+
+            def done(res):
+                core, mode_used, gas, snap, allowance_open = res
+                self.core = core
+                # Статусы/первый газ
+                self._update_status_bar(net=mode_used, gas_wei=gas, auto=self.autoseller is not None)
+                if allowance_open:
+                    # Делаем кнопку Revoke активной и выделенной
+                    self.btn_revoke.setStyleSheet("background-color: #ff4444; font-weight: bold;")
+                if snap:
+                    self._last_balances_ts = time.time()
+                    self._apply_balances(snap)
+                self._schedule_precheck(50)
+                # ОПТИМИЗАЦИЯ: один опрос head на блок; резервы по Sync-событиям
+                core.start_head_tracker()
+                core.head_tracker.subscribe(self._head_signal.new_block.emit)
+                # ОПТИМИЗАЦИЯ: asyncio-ядро для неблокирующих обновлений
+                core.start_async()
+
+                # Watch-only: отключаем опасные действия
+                wo = self.watch_only_cb.isChecked() or (self.pk is None)
+                for w in (self.btn_sell, self.btn_approve, self.btn_revoke, self.btn_cancel_pending):
+                    w.setEnabled(not wo)
+
+            self.commands.submit("connect", work, done, self._on_connect_failed, self._cmd_progress)
         except Exception as e:
-            msg = str(e)
-            # Дружелюбная подсветка при проблеме с Proxy-ключами/URL
-            if "Proxy auth error" in msg or "Invalid API Key" in msg:
-                try:
-                    self.proxy_keys.setStyleSheet("border:1px solid #d33;")
-                    self.proxy_url.setStyleSheet("border:1px solid #d33;")
-                except Exception:
-                    pass
-                self._show_small_modal(
-                    "Провайдер API ключей",
-                    "Похоже, ключи не подходят для выбранного API.\n\n"
-                    "• Для EnterScan укажите их API-URL и EnterScan-ключ.\n"
-                    "Можно ввести несколько ключей через запятую — клиент попробует следующий."
-                )
-            self.ui_logger.write(f"❌ Ошибка подключения: {msg}")
+            self._on_connect_failed(e)
+
+    def _on_connect_failed(self, e: Exception):
+        msg = str(e)
+        # Дружелюбная подсветка при проблеме с Proxy-ключами/URL
+        if "Proxy auth error" in msg or "Invalid API Key" in msg:
+            try:
+                self.proxy_keys.setStyleSheet("border:1px solid #d33;")
+                self.proxy_url.setStyleSheet("border:1px solid #d33;")
+            except Exception:
+                pass
+            self._show_small_modal(
+                "Провайдер API ключей",
+                "Похоже, ключи не подходят для выбранного API.\n\n"
+                "• Для EnterScan укажите их API-URL и EnterScan-ключ.\n"
+                "Можно ввести несколько ключей через запятую — клиент попробует следующий."
+            )
+        self.ui_logger.write(f"❌ Ошибка подключения: {msg}")
     
-    def _startup_safety_checks(self):
-        """Стартовые проверки безопасности"""
+    def _startup_safety_checks(self, core, addr: str, gas_price_wei: int, user_gas_wei: int):
+        """Стартовые проверки безопасности (фоновый поток: только чтения и лог) → (snapshot, allowance открыт)"""
+        log = self.ui_logger.write
+        snap, allowance_open = None, False
         try:
+            # ОПТИМИЗАЦИЯ: allowance, BNB, газ, nonce и токены пары — одним JSON-RPC batch
+            snap = core.get_account_snapshot(addr)
+            if snap.get('nonce') is not None:
+                log(f"ℹ Nonce (pending): {snap['nonce']}")
+
             # 1. Проверка allowance
-            allowance = eth_call_allowance(self.core._client_call, PLEX, self.addr, PANCAKE_V2_ROUTER)
+            allowance = snap['allowance']
+            if allowance is None:
+                allowance = eth_call_allowance(core._client_call, PLEX, addr, PANCAKE_V2_ROUTER)
             if allowance > 0:
-                self.ui_logger.write("🚨 ВНИМАНИЕ: Открыт allowance!")
-                self.ui_logger.write(f"🚨 Allowance: {from_units(allowance, 9)} PLEX")
-                self.ui_logger.write("🚨 Рекомендуется немедленно нажать 'Revoke Now'")
-                # Делаем кнопку Revoke активной и выделенной
-                self.btn_revoke.setStyleSheet("background-color: #ff4444; font-weight: bold;")
+                log("🚨 ВНИМАНИЕ: Открыт allowance!")
+                log(f"🚨 Allowance: {from_units(allowance, 9)} PLEX")
+                log("🚨 Рекомендуется немедленно нажать 'Revoke Now'")
+                allowance_open = True
             
             # 2. Проверка баланса BNB для газа
-            bnb_balance = self.core.get_bnb_balance(self.addr)
+            bnb_balance = snap['bnb']
             
             # БЕЗОПАСНОСТЬ: Точная оценка бюджета газа через current_gas_price
-            try:
-                gas_price_wei = self.core.current_gas_price(
-                    to_wei_gwei(float(self.gas_gwei.value())),
-                    use_network_gas=self.use_network_gas.isChecked()
-                )
+            if gas_price_wei:
                 # Оцениваем газ для базовых операций
                 gas_estimate = 50000 + 50000 + 200000  # revoke + approve + swap
                 gas_estimate = int(gas_estimate * 1.2)  # +20% буфер
                 estimated_gas_cost = gas_price_wei * gas_estimate
                 
                 if bnb_balance < estimated_gas_cost:
-                    self.ui_logger.write("⚠️ ВНИМАНИЕ: Недостаточно BNB для газа!")
-                    self.ui_logger.write(f"⚠️ BNB: {from_units(bnb_balance, 18)}")
-                    self.ui_logger.write(f"⚠️ Требуется: {from_units(estimated_gas_cost, 18)}")
-                    self.ui_logger.write(f"⚠️ Не хватает: {from_units(estimated_gas_cost - bnb_balance, 18)}")
-            except Exception as e:
+                    log("⚠️ ВНИМАНИЕ: Недостаточно BNB для газа!")
+                    log(f"⚠️ BNB: {from_units(bnb_balance, 18)}")
+                    log(f"⚠️ Требуется: {from_units(estimated_gas_cost, 18)}")
+                    log(f"⚠️ Не хватает: {from_units(estimated_gas_cost - bnb_balance, 18)}")
+            else:
                 # Fallback на константную оценку
-                estimated_gas_cost = to_wei_gwei(float(self.gas_gwei.value())) * 300000
+                estimated_gas_cost = user_gas_wei * 300000
                 if bnb_balance < estimated_gas_cost:
-                    self.ui_logger.write("⚠️ ВНИМАНИЕ: Недостаточно BNB для газа!")
-                    self.ui_logger.write(f"⚠️ BNB: {from_units(bnb_balance, 18)}")
-                    self.ui_logger.write(f"⚠️ Требуется: {from_units(estimated_gas_cost, 18)}")
+                    log("⚠️ ВНИМАНИЕ: Недостаточно BNB для газа!")
+                    log(f"⚠️ BNB: {from_units(bnb_balance, 18)}")
+                    log(f"⚠️ Требуется: {from_units(estimated_gas_cost, 18)}")
             
             # 3. Проверка whitelist пары
             try:
-                t0, t1 = eth_call_pair_tokens(self.core._client_call, PAIR_ADDRESS)
+                t0, t1 = snap.get('token0'), snap.get('token1')
+                if not t0 or not t1:
+                    t0, t1 = eth_call_pair_tokens(core._client_call, PAIR_ADDRESS)
                 pair_tokens = {t0.lower(), t1.lower()}
                 expected_tokens = {SAFETY_WHITELIST['PLEX'], SAFETY_WHITELIST['USDT']}
                 if pair_tokens != expected_tokens:
-                    self.ui_logger.write("🚨 КРИТИЧНО: Неверные токены в паре!")
-                    self.ui_logger.write(f"🚨 Токены: {t0}, {t1}")
-                    self.ui_logger.write("🚨 Ожидались: PLEX, USDT")
+                    log("🚨 КРИТИЧНО: Неверные токены в паре!")
+                    log(f"🚨 Токены: {t0}, {t1}")
+                    log("🚨 Ожидались: PLEX, USDT")
             except Exception as e:
-                self.ui_logger.write(f"⚠️ Не удалось проверить пару: {e}")
+                log(f"⚠️ Не удалось проверить пару: {e}")
                 
         except Exception as e:
-            self.ui_logger.write(f"⚠️ Ошибка проверок безопасности: {e}")
+            log(f"⚠️ Ошибка проверок безопасности: {e}")
+        return snap, allowance_open
 
     def on_refresh(self):
         # ОПТИМИЗАЦИЯ: Throttling 2 секунды для предотвращения дублей
@@ -3049,82 +6286,130 @@ class MainWindow(QtWidgets.QMainWindow):
             if not self.core or not self.addr:
                 self.ui_logger.write("ℹ Сначала подключитесь.")
                 return
-            plex_raw, usdt_raw, plex_dec, usdt_dec = self.core.get_balances(self.addr)
-            price, rplex, rusdt, is_t0 = self.core.get_price_and_reserves()
-            self.balance_plex.setText(f"PLEX: {from_units(plex_raw, plex_dec)}")
-            self.balance_usdt.setText(f"USDT: {from_units(usdt_raw, usdt_dec)}")
-            self.price_label.setText(f"Цена: {fmt_price(price)} USDT / 1 PLEX")
-            self.reserves_label.setText(f"Резервы: PLEX={from_units(rplex, 9)} USDT={from_units(rusdt, 18)}")
-            
-            # Обновляем статус-бар
-            self._update_status_bar(price=str(price))
+            if self.core.async_core is None:
+                core, addr = self.core, self.addr
+                def work(token, progress):
+                    with request_priority(PRIO_BACKGROUND):
+                        return core.get_balances(addr), core.get_price_and_reserves()
+                self.commands.submit("refresh", work, lambda res: self._apply_refresh(*res),
+                                     self._background_failed("обновления"))
+                return
+            # ОПТИМИЗАЦИЯ: балансы и цена параллельно в asyncio-ядре, GUI не блокируется
+            acore = self.core.async_core
+            async def _read(addr):
+                # ОПТИМИЗАЦИЯ: перерисовка — фоновый приоритет, не мешает продаже
+                with request_priority(PRIO_BACKGROUND):
+                    return await asyncio.gather(acore.get_balances(addr), acore.get_price_and_reserves())
+            self._async_bridge.submit(
+                self.core, _read(self.addr),
+                lambda res: self._apply_refresh(*res),
+                self._background_failed("обновления"))
         except Exception as e:
             self.ui_logger.write(f"❌ Ошибка обновления: {e}")
 
+    def _background_failed(self, what: str):
+        """Обработчик ошибки фонового обновления: сброс по квоте — не ошибка"""
+        def on_error(e):
+            if isinstance(e, RequestShed):
+                self.status_bar.showMessage(f"⏳ Пропуск {what}: квота API занята приоритетными запросами", 2000)
+            else:
+                self.ui_logger.write(f"❌ Ошибка {what}: {e}")
+        return on_error
+
+    def _apply_refresh(self, balances: tuple, price_reserves: tuple):
+        plex_raw, usdt_raw, plex_dec, usdt_dec = balances
+        price, rplex, rusdt, is_t0 = price_reserves
+        self.balance_plex.setText(f"PLEX: {from_units(plex_raw, plex_dec)}")
+        self.balance_usdt.setText(f"USDT: {from_units(usdt_raw, usdt_dec)}")
+        self.price_label.setText(f"Цена: {fmt_price(price)} USDT / 1 PLEX")
+        self.reserves_label.setText(f"Резервы: PLEX={from_units(rplex, 9)} USDT={from_units(rusdt, 18)}")
+        
+        # Обновляем статус-бар
+        self._update_status_bar(price=str(price))
+
+    def _cmd_progress(self, msg: str):
+        """Прогресс фоновой команды — в статус-бар"""
+        self.status_bar.showMessage(msg, 3000)
+
     def on_approve(self):
-        try:
-            if not self.core or not self.addr or not self.pk:
-                self.ui_logger.write("ℹ Сначала подключитесь.")
-                return
-            amt = Decimal(str(self.amount_plex.value()))
-            if amt <= 0:
-                self.ui_logger.write("⚠ Установите количество PLEX > 0")
-                return
-            plex_raw = to_units(amt, 9)
-            # БЕЗОПАСНОСТЬ: Применяем чекбокс "Использовать сетевой газ"
-            use_network_gas = self.use_network_gas.isChecked()
-            gas = self.core.current_gas_price(
-                to_wei_gwei(float(self.gas_gwei.value())), 
-                use_network_gas=use_network_gas
-            )
-            self._update_status_bar(gas_wei=gas)
-            
+        if not self.core or not self.addr or not self.pk:
+            self.ui_logger.write("ℹ Сначала подключитесь.")
+            return
+        amt = Decimal(str(self.amount_plex.value()))
+        if amt <= 0:
+            self.ui_logger.write("⚠ Установите количество PLEX > 0")
+            return
+        plex_raw = to_units(amt, 9)
+        # Виджеты читаем в GUI-потоке, сеть — в пуле
+        user_gas = to_wei_gwei(float(self.gas_gwei.value()))
+        use_network_gas = self.use_network_gas.isChecked()   # БЕЗОПАСНОСТЬ: чекбокс "Использовать сетевой газ"
+        core, addr, pk = self.core, self.addr, self.pk
+
+        def work(token, progress):
+            gas = core.current_gas_price(user_gas, use_network_gas=use_network_gas)
+            token.check()
+            progress("⏳ Approve: отправка и ожидание квитанции…")
             # БЕЗОПАСНОСТЬ: Используем safe_approve на точную сумму
-            txh = self.core.safe_approve(self.addr, self.pk, plex_raw, gas)
+            txh = core.safe_approve(addr, pk, plex_raw, gas)
+            price_reserves = None
+            if txh:
+                # UX: Обновляем цену после approve (из кэша/TTL)
+                try:
+                    price_reserves = core.get_price_and_reserves()
+                except Exception as e:
+                    core.log(f"⚠️ Ошибка обновления цены: {e}")
+            return gas, txh, price_reserves
+
+        def done(res):
+            gas, txh, price_reserves = res
+            self._update_status_bar(gas_wei=gas)
             if txh:
                 self.ui_logger.write(f"✅ Approve на {amt} PLEX отправлен: {txh}")
                 self._update_last_tx(txh)
                 self._note_tx_success()
                 # safe_approve() уже ожидает квитанцию; дополнительных ожиданий не требуется
-                
-                # UX: Обновляем цену после approve (из кэша/TTL)
-                try:
-                    price, rplex, rusdt, _ = self.core.get_price_and_reserves()
+                if price_reserves:
+                    price, rplex, rusdt, _ = price_reserves
                     self.price_label.setText(f"Цена: {fmt_price(price)} USDT / 1 PLEX")
                     self.reserves_label.setText(f"Резервы: PLEX={from_units(rplex, 9)} USDT={from_units(rusdt, 18)}")
                     self._update_status_bar(price=str(price))
-                except Exception as e:
-                    self.ui_logger.write(f"⚠️ Ошибка обновления цены: {e}")
             else:
                 self.ui_logger.write("ℹ Allowance уже достаточен")
-        except Exception as e:
+
+        def failed(e):
             self.ui_logger.write(f"❌ Ошибка approve: {e}")
             self._note_tx_fail()
 
-    def on_sell(self):
-        try:
-            if not self.core or not self.addr or not self.pk:
-                self.ui_logger.write("ℹ Сначала подключитесь.")
-                return
-            amt = Decimal(str(self.amount_plex.value()))
-            if amt <= 0:
-                self.ui_logger.write("⚠ Установите количество PLEX > 0")
-                return
-            
-            # БЕЗОПАСНОСТЬ: лимиты, amount и газ (нужны для префлайта)
-            limits = self._get_limits()
-            plex_raw = to_units(amt, 9)
-            use_network_gas = self.use_network_gas.isChecked()
-            gas = self.core.current_gas_price(to_wei_gwei(float(self.gas_gwei.value())), use_network_gas=use_network_gas)
-            self._update_status_bar(gas_wei=gas)
+        self.commands.submit("approve", work, done, failed, self._cmd_progress)
 
+    def on_sell(self):
+        if not self.core or not self.addr or not self.pk:
+            self.ui_logger.write("ℹ Сначала подключитесь.")
+            return
+        amt = Decimal(str(self.amount_plex.value()))
+        if amt <= 0:
+            self.ui_logger.write("⚠ Установите количество PLEX > 0")
+            return
+        
+        # БЕЗОПАСНОСТЬ: лимиты, amount и газ (нужны для префлайта) — снимаем с виджетов в GUI-потоке
+        limits = self._get_limits()
+        plex_raw = to_units(amt, 9)
+        user_gas = to_wei_gwei(float(self.gas_gwei.value()))
+        use_network_gas = self.use_network_gas.isChecked()
+        user_slip = float(self.slippage.value())
+        deadline_min = int(self.deadline_min.value())
+        core, addr, pk = self.core, self.addr, self.pk
+
+        def work(token, progress):
+            gas = core.current_gas_price(user_gas, use_network_gas=use_network_gas)
+            progress("⏳ Продажа: предварительная проверка…")
             # ✚ ПРЕДВАРИТЕЛЬНАЯ ПРОВЕРКА (READ-only, без симуляций)
-            pre = self.core.precheck_summary(
-                owner=self.addr,
+            pre = core.precheck_summary(
+                owner=addr,
                 amount_in_raw=plex_raw,
                 gas_price_wei=gas,
-                user_slippage_pct=float(self.slippage.value()),
-                deadline_min=int(self.deadline_min.value()),
+                user_slippage_pct=user_slip,
+                deadline_min=deadline_min,
                 limits=limits
             )
             blockers = []
@@ -3139,64 +6424,79 @@ class MainWindow(QtWidgets.QMainWindow):
                 blockers.append(f"Велик impact ({pre['impact']['pct']:.2f}%)")
             if not pre.get("reserves", {}).get("ok", True):
                 blockers.append("Резервы ниже минимума")
-            # Allowance — не блокер (safe_approve справится), но покажем предупреждение
-            warn_allow = (not pre["allowance"]["ok"])
             if blockers:
-                text = "Перед продажей устраните:\n• " + "\n• ".join(blockers)
-                if warn_allow:
-                    text += "\n\nДополнительно: потребуется Approve."
-                self._show_small_modal("Проверка не пройдена", text)
-                return
+                # Allowance — не блокер (safe_approve справится), но покажем предупреждение
+                return {'gas': gas, 'blockers': blockers, 'warn_allow': not pre["allowance"]["ok"]}
 
             # БЕЗОПАСНОСТЬ: используем рассчитанный minOut из префлайта
             expected_out = pre["min_out"]["expected"]
             safety = DEFAULT_LIMITS['safety_slippage_bonus'] / 100.0
-            user = float(self.slippage.value()) / 100.0
-            min_out = max(int(expected_out * (1 - user - safety)), 1)
+            min_out = max(int(expected_out * (1 - user_slip / 100.0 - safety)), 1)
             
+            token.check()   # последняя точка отмены до отправки
+            progress("⏳ Продажа: отправка транзакции…")
             # БЕЗОПАСНОСТЬ: Используем безопасную продажу с рассчитанным minOut
-            txh = self.core.safe_sell_now(self.addr, self.pk, plex_raw, min_out, gas, limits, int(self.deadline_min.value()))
+            txh = core.safe_sell_now(addr, pk, plex_raw, min_out, gas, limits, deadline_min)
+            res = {'gas': gas, 'txh': txh,
+                   'gas_updated': core.current_gas_price(user_gas, use_network_gas=use_network_gas)}
+            try:
+                res['price_reserves'] = core.get_price_and_reserves()
+            except Exception as e:
+                res['price_error'] = e
+            return res
+
+        def done(res):
+            self._update_status_bar(gas_wei=res['gas'])
+            if res.get('blockers'):
+                text = "Перед продажей устраните:\n• " + "\n• ".join(res['blockers'])
+                if res['warn_allow']:
+                    text += "\n\nДополнительно: потребуется Approve."
+                self._show_small_modal("Проверка не пройдена", text)
+                return
+            txh = res['txh']
             self.ui_logger.write(f"💸 Безопасная продажа отправлена: {txh}")
             self._update_last_tx(txh)
             self._note_tx_success()
             
             # UX: Обновляем статус газа и цены после успешной отправки
-            gas_updated = self.core.current_gas_price(
-                to_wei_gwei(float(self.gas_gwei.value())),
-                use_network_gas=self.use_network_gas.isChecked()
-            )
+            gas_updated = res['gas_updated']
             self._update_status_bar(gas_wei=gas_updated)
             
             # Краткий лог для операторов (газ и цена)
-            try:
-                price, rplex, rusdt, _ = self.core.get_price_and_reserves()
+            if 'price_reserves' in res:
+                price, rplex, rusdt, _ = res['price_reserves']
                 self._update_status_bar(price=str(price))
                 self.ui_logger.write(f"📊 Газ: {from_wei_gwei(gas_updated):.3f} gwei | Цена: {fmt_price(price)} USDT | Резервы: PLEX={rplex} USDT={rusdt}")
-            except Exception as e:
-                self.ui_logger.write(f"📊 Газ: {from_wei_gwei(gas_updated):.3f} gwei | Ошибка обновления цены: {e}")
-            
-        except Exception as e:
+            else:
+                self.ui_logger.write(f"📊 Газ: {from_wei_gwei(gas_updated):.3f} gwei | Ошибка обновления цены: {res['price_error']}")
+
+        def revoke_work(token, progress):
+            gas = core.current_gas_price(user_gas, use_network_gas=use_network_gas)
+            return core.safe_revoke(addr, pk, gas)
+
+        def revoke_done(txh):
+            if txh:
+                self.ui_logger.write(f"🔒 Revoke после неудачной продажи отправлен: {txh}")
+                self._update_last_tx(txh)
+
+        def revoke_failed(e):
+            self.ui_logger.write(f"⚠ Revoke после неудачной продажи не удался: {e}")
+
+        def failed(e):
             self.ui_logger.write(f"❌ Ошибка безопасной продажи: {e}")
             self._note_tx_fail()
+            # БЕЗОПАСНОСТЬ: При ошибке пытаемся revoke (в фоне — до модалки, она блокирует)
+            self.commands.submit("sell_revoke", revoke_work, revoke_done, revoke_failed)
             # UX: Контекстный текст модалки
             err = str(e)
             if "Sell loop failed after" in err:
-                self.ui_logger.write("🧯 Политика: без повышения газа; выполнено 5 попыток по 5 секунд.")
+                self.ui_logger.write("🧯 Политика: без повышения газа; выполнено 5 попыток с паузой 1 секунда.")
                 subtitle = "Сделка не прошла после 5 попыток.\nПроверьте соединение/газ и при необходимости отмените застрявшую TX."
             else:
                 subtitle = f"Ошибка: {err}\nПроверьте параметры сделки и баланс газа."
             self._show_small_modal("Продажа не выполнена", subtitle)
-            # БЕЗОПАСНОСТЬ: При ошибке пытаемся revoke
-            try:
-                if self.core and self.addr and self.pk:
-                    use_network_gas = self.use_network_gas.isChecked()
-                    gas = self.core.current_gas_price(
-                        to_wei_gwei(float(self.gas_gwei.value())), 
-                        use_network_gas=use_network_gas
-                    )
-                    self.core.safe_revoke(self.addr, self.pk, gas)
-            except:
-                pass
+
+        self.commands.submit("sell", work, done, failed, self._cmd_progress)
 
     def on_auto_start(self):
         try:
@@ -3348,20 +6648,24 @@ class MainWindow(QtWidgets.QMainWindow):
         self._last_balances_ts = now
         self._dirty_balances = False
             
+        if not self.core or not self.addr:
+            self.operator_log.appendPlainText("ℹ Сначала подключитесь к кошельку")
+            return
+        core, addr = self.core, self.addr
+        # ОПТИМИЗАЦИЯ: балансы, цена и резервы — один JSON-RPC batch (Node), вне GUI-потока, фоновый приоритет
+        def work(token, progress):
+            with request_priority(PRIO_BACKGROUND):
+                return core.get_account_snapshot(addr)
+        self.commands.submit("balances", work, self._apply_balances, self._background_failed("обновления балансов"))
+
+    def _apply_balances(self, snap: dict):
         try:
-            if not self.core or not self.addr:
-                self.operator_log.appendPlainText("ℹ Сначала подключитесь к кошельку")
-                return
-            
-            # Получаем балансы PLEX и USDT
-            plex_raw, usdt_raw, plex_dec, usdt_dec = self.core.get_balances(self.addr)
+            plex_raw, usdt_raw = snap['plex'], snap['usdt']
+            plex_dec, usdt_dec = snap['plex_decimals'], snap['usdt_decimals']
+            bnb_raw = snap['bnb']
             
-            # Получаем баланс BNB
-            bnb_raw = self.core.get_bnb_balance(self.addr)
-            
-            # ОПТИМИЗАЦИЯ: Получаем цену и резервы (через кэшируемый метод)
             try:
-                price, rplex, rusdt, is_t0 = self.core.get_price_and_reserves()
+                price, rplex, rusdt = snap['price'], snap['r_plex'], snap['r_usdt']
                 self.price_label.setText(f"Цена: {fmt_price(price)} USDT / 1 PLEX")
                 self.reserves_label.setText(f"Резервы: PLEX={from_units(rplex, 9)} USDT={from_units(rusdt, 18)}")
                 # UX: Обновляем цену в статус-баре при батч-обновлении
@@ -3406,110 +6710,108 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def on_revoke(self):
         """Ручной revoke allowance"""
-        try:
-            if not self.core or not self.addr or not self.pk:
-                self.ui_logger.write("⚠️ Сначала подключите кошелек")
-                return
-            
-            # БЕЗОПАСНОСТЬ: Применяем чекбокс "Использовать сетевой газ"
-            use_network_gas = self.use_network_gas.isChecked()
-            gas_price = self.core.current_gas_price(
-                to_wei_gwei(float(self.gas_gwei.value())), 
-                use_network_gas=use_network_gas
-            )
-            
-            txh = self.core.safe_revoke(self.addr, self.pk, gas_price)
+        if not self.core or not self.addr or not self.pk:
+            self.ui_logger.write("⚠️ Сначала подключите кошелек")
+            return
+        
+        # БЕЗОПАСНОСТЬ: Применяем чекбокс "Использовать сетевой газ"
+        user_gas = to_wei_gwei(float(self.gas_gwei.value()))
+        use_network_gas = self.use_network_gas.isChecked()
+        core, addr, pk = self.core, self.addr, self.pk
+
+        def work(token, progress):
+            gas_price = core.current_gas_price(user_gas, use_network_gas=use_network_gas)
+            token.check()
+            progress("⏳ Revoke: отправка транзакции…")
+            return gas_price, core.safe_revoke(addr, pk, gas_price)
+
+        def done(res):
+            gas_price, txh = res
             if txh:
                 self.ui_logger.write(f"🔒 Revoke транзакция отправлена: {txh}")
                 self._update_last_tx(txh)
                 self._note_tx_success()
             else:
                 self.ui_logger.write("ℹ️ Allowance уже нулевой")
-                
-        except Exception as e:
+            # UX: Обновляем статус газа и сети
+            self._update_status_bar(gas_wei=gas_price)
+
+        def failed(e):
             self.ui_logger.write(f"❌ Ошибка revoke: {e}")
             self._note_tx_fail()
-        
-        # UX: Обновляем статус газа и сети
-        self._update_status_bar(
-            gas_wei=self.core.current_gas_price(
-                to_wei_gwei(float(self.gas_gwei.value())),
-                use_network_gas=self.use_network_gas.isChecked()
-            )
-        )
+
+        self.commands.submit("revoke", work, done, failed, self._cmd_progress)
 
     def on_cancel_pending(self):
         """Отмена застрявшей транзакции"""
-        try:
-            if not self.core or not self.addr or not self.pk:
-                self.ui_logger.write("⚠️ Сначала подключите кошелек")
-                return
-            
-            # БЕЗОПАСНОСТЬ: Получаем данные последней отправленной транзакции
-            last_nonce, last_gas_price, last_tx_hash = self.core.nonce_manager.get_last_sent_data()
-            
-            if last_nonce is None:
-                self.ui_logger.write("⚠️ Нет данных о последней транзакции для отмены")
+        if not self.core or not self.addr or not self.pk:
+            self.ui_logger.write("⚠️ Сначала подключите кошелек")
+            return
+        
+        # БЕЗОПАСНОСТЬ: застревает самый нижний неподтверждённый nonce — замена верхнего его не продвинет
+        nm = self.core.nonce_manager
+        stuck = [(n, nm.slot(n)) for n in nm.in_flight()]
+        stuck = [(n, s) for n, s in stuck
+                 if s and s['state'] in (NonceState.SENT, NonceState.REPLACED) and s.get('tx_hash')]
+        if not stuck:
+            self.ui_logger.write("⚠️ Нет отправленных неподтверждённых транзакций для отмены")
+            return
+        if len(stuck) > 1:
+            items = [f"nonce {n} — {s['state']} — {s['tx_hash']}" for n, s in stuck]
+            choice, ok = QtWidgets.QInputDialog.getItem(
+                self, "Отмена транзакции", "Какой nonce отменить (нижний блокирует остальные):", items, 0, False)
+            if not ok:
                 return
-            
+            last_nonce, slot = stuck[items.index(choice)]
+        else:
+            last_nonce, slot = stuck[0]
+        last_tx_hash = slot['tx_hash']
+        
+        user_gas = to_wei_gwei(float(self.gas_gwei.value()))
+        use_network_gas = self.use_network_gas.isChecked()
+        core, addr, pk, log = self.core, self.addr, self.pk, self.ui_logger.write
+
+        def work(token, progress):
             # БЕЗОПАСНОСТЬ: Используем current_gas_price без повышения (политика "газ не повышаем")
-            base_gas = self.core.current_gas_price(
-                to_wei_gwei(float(self.gas_gwei.value())),
-                use_network_gas=self.use_network_gas.isChecked()
-            )
-            # минимальный bump для замены pending TX
-            max_gas_limit = to_wei_gwei(DEFAULT_LIMITS['max_gas_gwei'])
-            if last_gas_price:
-                bumped = int(max(base_gas, int(last_gas_price * 1.10)))
-            else:
-                # Бампаем до "пола" 0.2 gwei или +0.05 gwei для мягкого bump
-                floor_02 = to_wei_gwei(0.2)
-                bumped = int(max(base_gas, floor_02, base_gas + to_wei_gwei(0.05)))
-            gas_price = min(bumped, max_gas_limit)
-            
-            tx = {
-                'to': self.addr,  # Отправляем себе
-                'value': 0,
-                'data': '0x',
-                'chainId': BSC_CHAIN_ID,
-                'gasPrice': gas_price,
-                'nonce': last_nonce,  # Используем nonce последней транзакции
-                'gas': 21000
-            }
-            
-            signed = Account.from_key(self.pk).sign_transaction(tx)
-            txh = self.core.send_raw(signed.rawTransaction)
+            base_gas = core.current_gas_price(user_gas, use_network_gas=use_network_gas)
+            token.check()
+            # минимальный bump для замены pending TX; cancel фиксируется в очереди nonce
+            txh, gas_price = core.cancel_nonce(addr, pk, last_nonce, base_gas)
+            # UiLogger потокобезопасен — хэш виден сразу, не дожидаясь квитанции
+            log(f"❌ Cancel транзакция отправлена: {txh}")
+            log(f"⚠️ Заменяет транзакцию {last_tx_hash} с nonce {last_nonce}")
+            log(f"⚠️ Cancel отправлен тем же nonce {last_nonce} с газом {from_wei_gwei(gas_price):.3f} gwei (c bump)")
+            progress(f"⏳ Cancel {txh}: ожидание подтверждения…")
             
-            # ✚ зафиксировать cancel как «последнюю» tx в менеджере
-            self.core.nonce_manager.record_sent_tx(last_nonce, gas_price, txh)
-            
-            self.ui_logger.write(f"❌ Cancel транзакция отправлена: {txh}")
-            self.ui_logger.write(f"⚠️ Заменяет транзакцию {last_tx_hash} с nonce {last_nonce}")
-            self.ui_logger.write(f"⚠️ Cancel отправлен тем же nonce {last_nonce} с газом {from_wei_gwei(gas_price):.3f} gwei (c bump)")
-            self._update_last_tx(txh)
-            
-            # БЕЗОПАСНОСТЬ: Ждем подтверждения cancel
+            # БЕЗОПАСНОСТЬ: Ждем подтверждения cancel (прерывается кнопкой «Отменить»)
             try:
-                receipt = self.core.wait_receipt(txh, timeout=120)
+                core.wait_receipt(txh, timeout=120, cancel=token)
+                receipt_err = None
+            except CommandCancelled:
+                raise
+            except Exception as e:
+                receipt_err = e
+            return txh, gas_price, receipt_err
+
+        def done(res):
+            txh, gas_price, receipt_err = res
+            self._update_last_tx(txh)
+            if receipt_err is None:
                 self.ui_logger.write(f"✅ Cancel подтвержден — транзакция заменена")
                 self._note_tx_success()
                 # UX: Отключаем кнопку "Продолжить авто" после успешного cancel
                 self.btn_auto_resume.setEnabled(False)
-            except Exception as e:
-                self.ui_logger.write(f"⚠️ Ошибка подтверждения cancel: {e}")
+            else:
+                self.ui_logger.write(f"⚠️ Ошибка подтверждения cancel: {receipt_err}")
                 self._note_tx_fail()
-            
-        except Exception as e:
+            # UX: Обновляем статус газа и сети
+            self._update_status_bar(gas_wei=gas_price)
+
+        def failed(e):
             self.ui_logger.write(f"❌ Ошибка отмены транзакции: {e}")
             self._note_tx_fail()
-        
-        # UX: Обновляем статус газа и сети
-        self._update_status_bar(
-            gas_wei=self.core.current_gas_price(
-                to_wei_gwei(float(self.gas_gwei.value())),
-                use_network_gas=self.use_network_gas.isChecked()
-            )
-        )
+
+        self.commands.submit("cancel_pending", work, done, failed, self._cmd_progress)
 
     def _setup_mode_handlers(self):
         """Настраивает обработчики для переключения режимов автопродажи"""
@@ -3717,6 +7019,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.amount_per_sell.setValue(self.settings.value("amount_per_sell", 1.0, type=float))
             self.max_sells.setValue(self.settings.value("max_sells", 0, type=int))
             self.catch_up.setChecked(self.settings.value("catch_up", False, type=bool))
+            self.pipelined_sell.setChecked(self.settings.value("pipelined_sell", False, type=bool))
             
             # Подключаем сохранение при изменении
             self.use_network_gas.toggled.connect(lambda v: self.settings.setValue("use_network_gas", v))
@@ -3737,6 +7040,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.amount_per_sell.valueChanged.connect(lambda v: self.settings.setValue("amount_per_sell", float(v)))
             self.max_sells.valueChanged.connect(lambda v: self.settings.setValue("max_sells", v))
             self.catch_up.toggled.connect(lambda v: self.settings.setValue("catch_up", v))
+            self.pipelined_sell.toggled.connect(lambda v: self.settings.setValue("pipelined_sell", v))
             
         except Exception as e:
             self.ui_logger.write(f"⚠️ Ошибка восстановления настроек: {e}")
@@ -3761,6 +7065,7 @@ class MainWindow(QtWidgets.QMainWindow):
             "gas_gwei": float(self.gas_gwei.value()),
             "price_check_interval_sec": int(self.price_check_interval_sec.value()),
             "use_network_gas": self.use_network_gas.isChecked(),
+            "pipelined_sell": self.pipelined_sell.isChecked(),
         }
 
     def _apply_params(self, p: dict):
@@ -3776,6 +7081,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.gas_gwei.setValue(p.get("gas_gwei", 0.1))
         self.price_check_interval_sec.setValue(p.get("price_check_interval_sec", 5))
         self.use_network_gas.setChecked(p.get("use_network_gas", True))
+        self.pipelined_sell.setChecked(p.get("pipelined_sell", False))
 
     def _save_preset(self):
         """Сохраняет текущие параметры как пресет"""
@@ -3817,6 +7123,11 @@ class MainWindow(QtWidgets.QMainWindow):
     def _on_close_event(self, event):
         """Сохраняет настройки при закрытии приложения"""
         self.settings.setValue("slow_tick_interval", self.slow_tick_interval)
+        self.commands.shutdown()
+        if self.core:
+            self.core.stop_head_tracker()
+            self.core.stop_async()
+            self.core.stop_endpoints()
 
     # ---------- Авто-режим ----------
     def _on_auto_pause_toggle(self):
@@ -3841,6 +7152,10 @@ class MainWindow(QtWidgets.QMainWindow):
             self.core.gas_floor_wei = to_wei_gwei(0.2)
             self.status_bar.showMessage("⚠️ Проблемы с TX — следующий пол газа: 0.2 gwei", 1500)
 
+    def _on_pipelined_toggled(self, checked: bool):
+        if self.core:
+            self.core.pipelined = checked
+
     def _on_offline_only_toggled(self, checked: bool):
         if self.core:
             self.core.offline_only = checked
@@ -3932,16 +7247,23 @@ class MainWindow(QtWidgets.QMainWindow):
         self.lbl_5xx     = QtWidgets.QLabel("5xx: —");         self.lbl_5xx.setProperty("chip", True);     self.lbl_5xx.setProperty("level","muted")
         self.lbl_base    = QtWidgets.QLabel("База: —");        self.lbl_base.setProperty("chip", True);    self.lbl_base.setProperty("level","muted")
         self.lbl_key     = QtWidgets.QLabel("Ключ: —");        self.lbl_key.setProperty("chip", True);     self.lbl_key.setProperty("level","muted")
+        self.lbl_ep      = QtWidgets.QLabel("READ RPC: —");    self.lbl_ep.setProperty("chip", True);      self.lbl_ep.setProperty("level","muted")
+        self.lbl_bcast   = QtWidgets.QLabel("Broadcast: —");   self.lbl_bcast.setProperty("chip", True);   self.lbl_bcast.setProperty("level","muted")
+        self.lbl_routes  = QtWidgets.QLabel("Маршруты: —");    self.lbl_routes.setProperty("chip", True);  self.lbl_routes.setProperty("level","muted")
+        self.lbl_routes.setWordWrap(True)
         g.addWidget(self.lbl_calls,  0,0,1,2)
         g.addWidget(self.lbl_gasreq, 1,0,1,2)
         g.addWidget(self.lbl_429,    2,0,1,1); g.addWidget(self.lbl_5xx,2,1,1,1)
         g.addWidget(self.lbl_base,   3,0,1,2)
         g.addWidget(self.lbl_key,    4,0,1,2)
+        g.addWidget(self.lbl_ep,     5,0,1,2)
+        g.addWidget(self.lbl_bcast,  6,0,1,2)
+        g.addWidget(self.lbl_routes, 7,0,1,2)
         # Кнопка ручного обновления (для единообразия с «Предварительной проверкой»)
         self.btn_rpc_refresh = QtWidgets.QPushButton("Обновить сейчас")
         self.btn_rpc_refresh.setToolTip("Принудительно обновить значения RPC-метрик")
         self.btn_rpc_refresh.clicked.connect(self._refresh_rpc_stats)
-        g.addWidget(self.btn_rpc_refresh, 5,0,1,2)
+        g.addWidget(self.btn_rpc_refresh, 8,0,1,2)
         dock.setWidget(w)
         self.addDockWidget(QtCore.Qt.RightDockWidgetArea, dock)
         self.rpc_stats_dock = dock
@@ -3951,7 +7273,7 @@ class MainWindow(QtWidgets.QMainWindow):
             return
         st = getattr(self.core, "stats", {}) or {}
         # поддерживаем оба варианта ключа ('call' и 'calls') на всякий случай
-        self.lbl_calls.setText(f"Вызовы: {st.get('calls', st.get('call', '—'))}")
+        self.lbl_calls.setText(f"Вызовы: {st.get('calls', st.get('call', '—'))} (слито: {st.get('coalesced', 0)}, хеджей: {st.get('hedged', 0)})")
         self.lbl_gasreq.setText(f"gasPrice calls: {st.get('gas', '—')}")
         self.lbl_429.setText(f"429: {st.get('429','—')}")
         self.lbl_5xx.setText(f"5xx: {st.get('5xx','—')}")
@@ -3962,7 +7284,45 @@ class MainWindow(QtWidgets.QMainWindow):
             keyi = self.core.proxy_active_index()
         except Exception:
             keyi = getattr(self.core, 'proxy_key_index', None)
-        self.lbl_key.setText(f"Ключ: #{keyi if keyi is not None else '—'}")
+        usage = self.core.proxy_key_usage() if self.core.proxy else []
+        if usage:
+            alive = [u for u in usage if u['ok']]
+            self.lbl_key.setText(f"Ключи: {len(alive)}/{len(usage)} · {sum(u['rate'] for u in alive):.1f} rps")
+            self.lbl_key.setToolTip("\n".join(
+                f"{'✅' if u['ok'] else '⛔'} {u['key']}: {u['calls']} вызовов, 429/5xx {u['throttled']}, "
+                f"сброшено фоновых {u['shed']}, {u['rate']:.1f} rps"
+                for u in usage))
+        else:
+            self.lbl_key.setText(f"Ключ: #{keyi if keyi is not None else '—'}")
+        pool = getattr(self.core, 'endpoints', None)
+        best = pool.best() if pool else None
+        if best is None:
+            self.lbl_ep.setText("READ RPC: —")
+            self.lbl_ep.setToolTip("")
+        else:
+            self.lbl_ep.setText(f"READ RPC: {best.url.split('//')[-1]} ({(best.ewma_s or 0) * 1000:.0f} мс)")
+            self.lbl_ep.setToolTip("\n".join(
+                f"{'⛔' if e['open'] else '✅'} {e['url']} — {e['ms']:.0f} мс, ошибки {e['err'] * 100:.0f}%, отставание {e['lag']} бл."
+                for e in pool.snapshot()))
+        bc = self.core.broadcaster.snapshot()
+        if bc['winner'] is None:
+            self.lbl_bcast.setText("Broadcast: —")
+            self.lbl_bcast.setToolTip("")
+        else:
+            self.lbl_bcast.setText(f"Broadcast: {bc['winner']} ({bc['ms']:.0f} мс)")
+            self.lbl_bcast.setToolTip("Первым принял tx:\n" + "\n".join(
+                f"{name}: {n}" for name, n in sorted(bc['wins'].items(), key=lambda kv: -kv[1])))
+        routes = self.core.routes.snapshot() if self.core.routes else None
+        if not routes:
+            self.lbl_routes.setText("Маршруты: —")
+            self.lbl_routes.setToolTip("")
+        else:
+            # отправка не маршрутизируется — она идёт во все каналы (см. Broadcast)
+            self.lbl_routes.setText("Маршруты: " + " · ".join(f"{cls}→{rows[0]['src']}" for cls, rows in routes.items())
+                                    + " · send→все")
+            self.lbl_routes.setToolTip("\n".join(
+                f"{cls}: " + ", ".join(f"{r['src']} {r['ms']:.0f} мс/ош. {r['err'] * 100:.0f}%/{r['calls']}" for r in rows)
+                for cls, rows in routes.items()))
 
     def _save_layout(self):
         """Сохраняет текущую раскладку (единый namespace настроек)"""
@@ -4033,12 +7393,16 @@ class MainWindow(QtWidgets.QMainWindow):
         lbl.setProperty("level", level)
         lbl.style().unpolish(lbl); lbl.style().polish(lbl); lbl.update()
 
-    def on_precheck(self):
-        """Запуск READ-проверок на основе текущих полей UI"""
+    def on_precheck(self, refresh: bool = True):
+        """Запуск READ-проверок на основе текущих полей UI (refresh=False — локальный пересчёт)"""
         try:
             if not self.core or not self.addr:
                 self.ui_logger.write("⚠️ Сначала подключите кошелёк")
                 return
+            if self.commands.is_running("precheck"):
+                # входы изменились во время сетевого обновления — пересчитаем по его завершении
+                self._precheck_dirty = True
+                return
             # Считываем входы
             # Кол-во PLEX — берём из ручного поля, если 0 → из Interval-режима
             amt = Decimal(self.amount_plex.value())
@@ -4046,10 +7410,8 @@ class MainWindow(QtWidgets.QMainWindow):
                 amt = Decimal(self.amount_per_sell.value())
             amount_in_raw = int(amt * (10 ** 9))
 
-            gas_price_wei = self.core.current_gas_price(
-                to_wei_gwei(float(self.gas_gwei.value())),
-                use_network_gas=self.use_network_gas.isChecked()
-            )
+            user_gas_wei = to_wei_gwei(float(self.gas_gwei.value()))
+            use_net = self.use_network_gas.isChecked()
             limits = {
                 'max_per_tx_plex': float(self.max_per_tx_plex.value()),
                 'max_daily_plex': float(self.max_daily_plex.value()),
@@ -4058,36 +7420,70 @@ class MainWindow(QtWidgets.QMainWindow):
             user_slip = float(self.slippage.value())  # ручной слиппедж (%)
             deadline_min = int(self.deadline_min.value())
 
-            s = self.core.precheck_summary(self.addr, amount_in_raw, gas_price_wei, user_slip, deadline_min, limits)
-            # ✚ запоминаем последний результат и разрешаем экспорт
-            self._last_precheck = s
-            self.btn_precheck_copy.setEnabled(True)
-
-            # Обновляем чипы
-            self._set_chip(self.pf_net,   f"Сеть: {'OK' if s['network']['ok'] else s['network']['msg']}", "ok" if s['network']['ok'] else "err")
-            bal_text = f"PLEX: {from_units(s['balance_plex']['have'],9)} / нужно {from_units(s['balance_plex']['need'],9)}"
-            self._set_chip(self.pf_bal,   bal_text, "ok" if s['balance_plex']['ok'] else "err")
-            alw_text = f"Allowance: {from_units(s['allowance']['have'],9)} / нужно {from_units(s['allowance']['need'],9)}"
-            self._set_chip(self.pf_allow, alw_text, "ok" if s['allowance']['ok'] else "warn")
-            gas_need = s['bnb_gas']['need']; gas_have = s['bnb_gas']['have']
-            gas_text = f"BNB на газ: {gas_have / (10**18):.6f} / нужно {gas_need / (10**18):.6f} (≈{s['bnb_gas']['est_units']}u)"
-            self._set_chip(self.pf_gas,   gas_text, "ok" if s['bnb_gas']['ok'] else "err")
-            mo = s['min_out']['min_out']; exp = s['min_out']['expected']
-            self._set_chip(self.pf_min,   f"Мин.выход: {from_units(mo,18)} (ожид. {from_units(exp,18)})", "ok" if s['min_out']['ok'] else "warn")
-            self._set_chip(self.pf_lim,   f"Лимиты: {s['limits']['msg']}", "ok" if s['limits']['ok'] else "err")
-            self._set_chip(self.pf_pair,  f"Пара: {s['pair_ok']['msg']}", "ok" if s['pair_ok']['ok'] else "err")
-            # Резервы с показом динамических порогов
-            rs = s.get('reserves', {})
-            if rs:
-                res_text = (f"Резервы: PLEX={rs.get('plex',0):.6f} (min {rs.get('min_plex',0):.6f}) | "
-                            f"USDT={rs.get('usdt',0):.6f} (min {rs.get('min_usdt',0):.6f})")
-                self._set_chip(self.pf_res, res_text, "ok" if rs.get('ok') else "err")
-            # ✚ Обновляем подсказки у кнопок действий
-            self._update_action_hints(s)
+            # ОПТИМИЗАЦИЯ: инкрементальная модель — сеть только при refresh/устаревании
+            if self._precheck_model is None or self._precheck_model.core is not self.core:
+                self._precheck_model = PrecheckModel(self.core)
+            model, core, owner = self._precheck_model, self.core, self.addr
+            inputs = dict(amount=amount_in_raw, slippage=user_slip, deadline=deadline_min, limits=limits)
+            if not model.needs_network(owner, refresh):
+                # ОПТИМИЗАЦИЯ: газ из последнего известного сетевого значения — без RPC, прямо в GUI-потоке
+                gas_price_wei = core.apply_gas_policy(user_gas_wei, core.last_network_gas() if use_net else None)
+                self._apply_precheck(model.update(owner, gas_price=gas_price_wei, **inputs))
+                return
 
+            def work(token, progress):
+                gas_price_wei = core.current_gas_price(user_gas_wei, use_network_gas=use_net)
+                token.check()
+                return model.update(owner, refresh=True, gas_price=gas_price_wei, **inputs)
+
+            def done(s):
+                self._apply_precheck(s)
+                if self._precheck_dirty:
+                    self._precheck_dirty = False
+                    self.on_precheck(refresh=False)
+
+            self._precheck_dirty = False
+            self.commands.submit("precheck", work, done,
+                                 lambda e: self.ui_logger.write(f"❌ Ошибка предварительной проверки: {e}"),
+                                 self._cmd_progress)
         except Exception as e:
             self.ui_logger.write(f"❌ Ошибка предварительной проверки: {e}")
 
+    def _apply_precheck(self, s: dict):
+        """Отрисовка результата пред-проверки (GUI-поток)"""
+        # ✚ запоминаем последний результат и разрешаем экспорт
+        self._last_precheck = s
+        self.btn_precheck_copy.setEnabled(True)
+
+        # Обновляем чипы
+        self._set_chip(self.pf_net,   f"Сеть: {'OK' if s['network']['ok'] else s['network']['msg']}", "ok" if s['network']['ok'] else "err")
+        self.pf_net.setToolTip(self._fmt_precheck_timings(s))
+        bal_text = f"PLEX: {from_units(s['balance_plex']['have'],9)} / нужно {from_units(s['balance_plex']['need'],9)}"
+        self._set_chip(self.pf_bal,   bal_text, "ok" if s['balance_plex']['ok'] else "err")
+        alw_text = f"Allowance: {from_units(s['allowance']['have'],9)} / нужно {from_units(s['allowance']['need'],9)}"
+        self._set_chip(self.pf_allow, alw_text, "ok" if s['allowance']['ok'] else "warn")
+        gas_need = s['bnb_gas']['need']; gas_have = s['bnb_gas']['have']
+        gas_text = f"BNB на газ: {gas_have / (10**18):.6f} / нужно {gas_need / (10**18):.6f} (≈{s['bnb_gas']['est_units']}u)"
+        self._set_chip(self.pf_gas,   gas_text, "ok" if s['bnb_gas']['ok'] else "err")
+        mo = s['min_out']['min_out']; exp = s['min_out']['expected']
+        self._set_chip(self.pf_min,   f"Мин.выход: {from_units(mo,18)} (ожид. {from_units(exp,18)})", "ok" if s['min_out']['ok'] else "warn")
+        self._set_chip(self.pf_lim,   f"Лимиты: {s['limits']['msg']}", "ok" if s['limits']['ok'] else "err")
+        self._set_chip(self.pf_pair,  f"Пара: {s['pair_ok']['msg']}", "ok" if s['pair_ok']['ok'] else "err")
+        # Резервы с показом динамических порогов
+        rs = s.get('reserves', {})
+        if rs:
+            res_text = (f"Резервы: PLEX={rs.get('plex',0):.6f} (min {rs.get('min_plex',0):.6f}) | "
+                        f"USDT={rs.get('usdt',0):.6f} (min {rs.get('min_usdt',0):.6f})")
+            self._set_chip(self.pf_res, res_text, "ok" if rs.get('ok') else "err")
+        # ✚ Обновляем подсказки у кнопок действий
+        self._update_action_hints(s)
+
+    @staticmethod
+    def _fmt_precheck_timings(s: dict) -> str:
+        t = s.get('timings') or {}
+        names = (('state_ms', 'данные'), ('gas_swap_ms', 'газ swap'), ('gas_approve_ms', 'газ approve'), ('total_ms', 'итого'))
+        return "Тайминги: " + ", ".join(f"{label} {t[k]:.0f} мс" for k, label in names if k in t)
+
     # ---------- Экспорт результата пред-проверки ----------
     def _precheck_to_text(self, s: dict) -> str:
         def yn(ok): return "OK" if ok else "FAIL"
@@ -4099,6 +7495,7 @@ class MainWindow(QtWidgets.QMainWindow):
         lines.append(f"Мин.выход: {from_units(s['min_out']['min_out'],18)} (ожид. {from_units(s['min_out']['expected'],18)}) — {yn(s['min_out']['ok'])}")
         lines.append(f"Лимиты: {s['limits']['msg']} — {yn(s['limits']['ok'])}")
         lines.append(f"Пара: {s['pair_ok']['msg']} — {yn(s['pair_ok']['ok'])}")
+        lines.append(self._fmt_precheck_timings(s))
         # Общий вердикт
         blockers = []
         if not s['network']['ok']: blockers.append("сеть")
@@ -4140,6 +7537,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.amount_per_sell.setValue(1.0)
             self.max_sells.setValue(0)
             self.catch_up.setChecked(False)
+            self.pipelined_sell.setChecked(False)
             self.ui_logger.write("↩ Параметры сброшены к безопасным значениям")
         except Exception as e:
             self.ui_logger.write(f"⚠️ Не удалось сбросить параметры: {e}")
@@ -4151,7 +7549,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.slippage_pct, self.use_network_gas, self.target_price,
             self.price_check_interval_sec, self.cooldown_between_sales_sec,
             self.use_target_price, self.interval_sec, self.amount_per_sell,
-            self.max_sells, self.catch_up, self.btn_precheck, self.btn_trade_reset
+            self.max_sells, self.catch_up, self.pipelined_sell, self.btn_precheck, self.btn_trade_reset
         ]
         for w in widgets:
             w.setEnabled(not disabled)
@@ -4190,8 +7588,9 @@ class MainWindow(QtWidgets.QMainWindow):
     def _auto_precheck(self):
         """Выполняет тихую автопроверку без модалок"""
         try:
-            # используем уже существующий on_precheck (он не показывает модалки)
-            self.on_precheck()
+            # используем уже существующий on_precheck (он не показывает модалки);
+            # изменение полей — локальный пересчёт по графу зависимостей
+            self.on_precheck(refresh=False)
         except Exception:
             pass
 
@@ -4361,25 +7760,44 @@ class MainWindow(QtWidgets.QMainWindow):
 
     # ---- P0: Self-test соединения ----
     def on_self_test(self):
-        try:
+        mode = "Hybrid" if self.mode_hybrid.isChecked() else "Proxy" if self.mode_proxy.isChecked() else "Node"
+        core = self.core
+        prov = self._proxy_provider() if mode == "Proxy" or (mode == "Hybrid" and core and core.proxy) else "-"
+        addr = self.addr
+
+        def work(token, progress):
             t0 = time.time()
-            mode = "Node" if self.mode_node.isChecked() else "Proxy"
             # chainId + ping
-            if mode == "Node":
-                cid = self.core.node_w3.eth.chain_id
+            if mode in ("Node", "Hybrid"):
+                cid = core.node_w3.eth.chain_id
             else:
-                self.core._proxy_sleep_before_call()
-                cid_hex = self.core.proxy.eth_chainId()
+                cid_hex = core.proxy.eth_chainId()
                 cid = int(cid_hex, 16) if (isinstance(cid_hex, str) and cid_hex.startswith('0x')) else int(cid_hex)
             t_ping = (time.time() - t0) * 1000.0
+            token.check()
             # decimals
-            plex_dec = self.core.get_decimals(PLEX)
-            usdt_dec = self.core.get_decimals(USDT)
+            plex_dec = core.get_decimals(PLEX)
+            usdt_dec = core.get_decimals(USDT)
             # резервы/цена
-            price, rplex, rusdt, _ = self.core.get_price_and_reserves()
-            ok = (cid == 56) and plex_dec == 9 and usdt_dec == 18 and rplex > 0 and rusdt > 0
+            price, rplex, rusdt, _ = core.get_price_and_reserves()
+            token.check()
+            # сверка локальной котировки с getAmountsOut (1 PLEX, тот же блок)
+            qc = core.quotes.self_check(to_units(Decimal(1), 9), [PLEX, USDT])
+            # предвычисленный кодек calldata против web3/eth_abi (offline)
+            cc = codec_self_check()
+            routes = []
+            if mode == "Hybrid" and core.routes:
+                # прогоняем классы операций, ещё не затронутые выше: read/head, gas, nonce
+                token.check()
+                core.get_block_number()
+                core.current_gas_price(to_wei_gwei(DEFAULT_LIMITS['min_gas_gwei']))
+                if addr:
+                    core.get_nonce(addr)
+                routes = [f"  {cls}: " + " → ".join(f"{r['src']} {r['ms']:.0f} мс/ош. {r['err'] * 100:.0f}%/{r['calls']}"
+                                                     for r in rows)
+                          for cls, rows in core.routes.snapshot().items()]
+            ok = (cid == 56) and plex_dec == 9 and usdt_dec == 18 and rplex > 0 and rusdt > 0 and qc['ok'] and cc['ok']
             verdict = "OK" if ok else "⚠️ Проверьте сеть/пару/decimals"
-            prov = self._proxy_provider() if mode == "Proxy" else "-"
             text = [
                 f"Режим: {mode}",
                 f"Provider: {prov}",
@@ -4388,12 +7806,19 @@ class MainWindow(QtWidgets.QMainWindow):
                 f"decimals: PLEX={plex_dec}, USDT={usdt_dec}",
                 f"Резервы: PLEX={from_units(rplex,9)}, USDT={from_units(rusdt,18)}",
                 f"Цена: {fmt_price(price)} USDT / 1 PLEX",
+                f"Котировка: локально {qc['local']} / on-chain {qc['onchain']} — {'OK' if qc['ok'] else 'РАСХОЖДЕНИЕ'}",
+                f"Кодек calldata: {cc['checked']} векторов — {'OK' if cc['ok'] else 'РАСХОЖДЕНИЕ'}",
+                *(["Маршруты (send — во все каналы):", *routes] if routes else []),
                 f"\nВердикт: {verdict}"
             ]
-            lvl = "ok" if ok else "warn"
-            self._show_small_modal("Тест связи", "\n".join(text))
+            return verdict, "\n".join(text)
+
+        def done(res):
+            verdict, text = res
+            self._show_small_modal("Тест связи", text)
             self.status_bar.showMessage(f"🧪 Self-test: {verdict}", 2000)
-        except Exception as e:
+
+        def failed(e):
             msg = str(e)
             if "Proxy auth error" in msg or "Invalid API Key" in msg:
                 try:
@@ -4403,7 +7828,43 @@ class MainWindow(QtWidgets.QMainWindow):
                     pass
             self._show_small_modal("Тест связи", f"⛔ Ошибка: {msg}")
 
+        self.status_bar.showMessage("🧪 Self-test…", 2000)
+        self.commands.submit("self_test", work, done, failed)
+
+def _cli_bench(argv: list[str]) -> bool:
+    """--bench-rpc [URL|offline] [N] — печатает результаты и возвращает True"""
+    if '--bench-rpc' not in argv:
+        return False
+    args = argv[argv.index('--bench-rpc') + 1:]
+    url = args[0] if args and not args[0].isdigit() else None
+    n = int(next((a for a in args if a.isdigit()), 200))
+    res = bench_rpc(url, n)
+    print(f"📊 eth_call getReserves × {res['n']} — {res['url']} (JSON: {res['json']})")
+    for name in ('web3', 'raw'):
+        r = res[name]
+        print(f"  {name:5s} p50 {r['p50_ms']:7.3f} мс · p95 {r['p95_ms']:7.3f} мс · среднее {r['mean_ms']:7.3f} мс")
+    print(f"  выигрыш p50: {res['web3']['p50_ms'] - res['raw']['p50_ms']:.3f} мс/вызов")
+    return True
+
+
+def _cli_bench_codec(argv: list[str]) -> bool:
+    """--bench-codec [N] — сверка кодека с eth_abi и мкс/вызов до/после"""
+    if '--bench-codec' not in argv:
+        return False
+    args = argv[argv.index('--bench-codec') + 1:]
+    n = int(args[0]) if args and args[0].isdigit() else 20000
+    chk = codec_self_check()
+    print(f"{'✅' if chk['ok'] else '❌'} Сверка с web3/eth_abi: {chk['checked']} векторов")
+    for line in chk['mismatch']:
+        print("  ", line)
+    for name, r in bench_codec(n).items():
+        print(f"  {name:36s} до {r['before_us']:9.2f} мкс · после {r['after_us']:6.2f} мкс · ×{r['before_us'] / r['after_us']:.0f}")
+    return True
+
+
 def main():
+    if _cli_bench(sys.argv[1:]) or _cli_bench_codec(sys.argv[1:]):
+        return
     # Включаем поддержку HiDPI
     QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling, True)
     QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps, True)